@@ -1,17 +1,200 @@
--- Membuat Database
-CREATE DATABASE IF NOT EXISTS db_arsip;
-USE db_arsip;
+-- =====================================================================
+-- Skema Database LENTERA (SQLite) - REFERENSI
+-- ---------------------------------------------------------------------
+-- File ini hanya dokumentasi. Skema yang sebenarnya dibuat & di-upgrade
+-- otomatis oleh src/migrations.py saat aplikasi start; versi skema
+-- tersimpan di PRAGMA user_version.
+--
+-- Versi skema: 12
+-- =====================================================================
 
--- Membuat Tabel Surat
+-- Tabel Surat (surat masuk, surat keluar & dokumen)
 CREATE TABLE IF NOT EXISTS surat (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    nomor_surat VARCHAR(100),          -- Nomor resmi dari surat
-    judul_surat VARCHAR(255) NOT NULL, -- Perihal / Judul
-    kategori ENUM('masuk', 'keluar', 'dokumen') NOT NULL,
-    asal_surat VARCHAR(255),           -- Pengirim (jika masuk) atau Tujuan (jika keluar)
-    penerima VARCHAR(255),             -- Penerima internal
-    tanggal DATE NOT NULL,             -- Tanggal surat masuk/keluar
-    file_path VARCHAR(255) NOT NULL,   -- Lokasi file di folder uploads
-    keterangan TEXT,                   -- Catatan tambahan
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
\ No newline at end of file
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nomor_surat TEXT,
+    judul_surat TEXT,            -- Perihal / Nama dokumen
+    asal_surat TEXT,             -- Pengirim (masuk) / Tujuan (keluar) / Kategori (dokumen)
+    kategori TEXT,               -- 'masuk', 'keluar', 'dokumen'
+    tanggal TEXT,                -- Tanggal Terima/Kirim (yyyy-MM-dd)
+    tanggal_surat TEXT,          -- Tanggal asli di Fisik Surat (yyyy-MM-dd)
+    keterangan TEXT,
+    file_path TEXT,              -- File (surat) atau folder (dokumen)
+    -- v4: diturunkan dari tanggal, tidak disimpan (VIRTUAL) tetapi bisa diindeks
+    tahun INTEGER GENERATED ALWAYS AS (
+        CASE WHEN tanggal GLOB '[0-9][0-9][0-9][0-9]-*' THEN CAST(substr(tanggal, 1, 4) AS INTEGER) END
+    ) VIRTUAL,
+    bulan INTEGER GENERATED ALWAYS AS (
+        CASE WHEN tanggal GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]*' THEN CAST(substr(tanggal, 6, 2) AS INTEGER) END
+    ) VIRTUAL,
+    -- v6: nomor hari (hari sejak 1970-01-01) untuk filter rentang & sorting tanggal
+    tanggal_hari INTEGER GENERATED ALWAYS AS (
+        CASE WHEN tanggal GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+             THEN CAST(julianday(substr(tanggal, 1, 10)) - 2440587.5 AS INTEGER) END
+    ) VIRTUAL,
+    tanggal_surat_hari INTEGER GENERATED ALWAYS AS (
+        CASE WHEN tanggal_surat GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+             THEN CAST(julianday(substr(tanggal_surat, 1, 10)) - 2440587.5 AS INTEGER) END
+    ) VIRTUAL,
+    -- v7: hapus lunak, waktu ditandai terhapus (yyyy-MM-dd HH:mm:ss), NULL = aktif
+    dihapus_pada TEXT
+);
+
+-- Tabel Kode Surat / Klasifikasi
+CREATE TABLE IF NOT EXISTS kode_surat (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kode TEXT NOT NULL,
+    keterangan TEXT NOT NULL UNIQUE
+);
+
+-- Indeks (migrasi v2; indeks surat diganti partial index di v7)
+CREATE INDEX IF NOT EXISTS idx_kode_surat_kode ON kode_surat (kode);
+
+-- Indeks full-text kode surat untuk pencarian global (migrasi v12)
+CREATE VIRTUAL TABLE IF NOT EXISTS kode_surat_fts USING fts5(
+    kode, keterangan,
+    content='kode_surat', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS kode_surat_fts_ai AFTER INSERT ON kode_surat BEGIN
+    INSERT INTO kode_surat_fts (rowid, kode, keterangan) VALUES (new.id, new.kode, new.keterangan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS kode_surat_fts_ad AFTER DELETE ON kode_surat BEGIN
+    INSERT INTO kode_surat_fts (kode_surat_fts, rowid, kode, keterangan)
+    VALUES ('delete', old.id, old.kode, old.keterangan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS kode_surat_fts_au AFTER UPDATE OF kode, keterangan ON kode_surat BEGIN
+    INSERT INTO kode_surat_fts (kode_surat_fts, rowid, kode, keterangan)
+    VALUES ('delete', old.id, old.kode, old.keterangan);
+    INSERT INTO kode_surat_fts (rowid, kode, keterangan) VALUES (new.id, new.kode, new.keterangan);
+END;
+
+-- Indeks full-text untuk pencarian (migrasi v3), disinkronkan oleh trigger
+CREATE VIRTUAL TABLE IF NOT EXISTS surat_fts USING fts5(
+    asal_surat, nomor_surat, judul_surat, keterangan,
+    content='surat', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS surat_fts_ai AFTER INSERT ON surat BEGIN
+    INSERT INTO surat_fts (rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+    VALUES (new.id, new.asal_surat, new.nomor_surat, new.judul_surat, new.keterangan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS surat_fts_ad AFTER DELETE ON surat BEGIN
+    INSERT INTO surat_fts (surat_fts, rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+    VALUES ('delete', old.id, old.asal_surat, old.nomor_surat, old.judul_surat, old.keterangan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS surat_fts_au
+AFTER UPDATE OF asal_surat, nomor_surat, judul_surat, keterangan ON surat BEGIN
+    INSERT INTO surat_fts (surat_fts, rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+    VALUES ('delete', old.id, old.asal_surat, old.nomor_surat, old.judul_surat, old.keterangan);
+    INSERT INTO surat_fts (rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+    VALUES (new.id, new.asal_surat, new.nomor_surat, new.judul_surat, new.keterangan);
+END;
+
+-- Indeks trigram untuk pencarian substring (migrasi v9, butuh SQLite 3.34+),
+-- disinkronkan oleh trigger seperti surat_fts. Kata kunci cocok jika cocok
+-- di surat_fts (awalan kata) ATAU di surat_trigram (substring).
+CREATE VIRTUAL TABLE IF NOT EXISTS surat_trigram USING fts5(
+    asal_surat, nomor_surat, judul_surat, keterangan,
+    content='surat', content_rowid='id',
+    tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS surat_trigram_ai AFTER INSERT ON surat BEGIN
+    INSERT INTO surat_trigram (rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+    VALUES (new.id, new.asal_surat, new.nomor_surat, new.judul_surat, new.keterangan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS surat_trigram_ad AFTER DELETE ON surat BEGIN
+    INSERT INTO surat_trigram (surat_trigram, rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+    VALUES ('delete', old.id, old.asal_surat, old.nomor_surat, old.judul_surat, old.keterangan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS surat_trigram_au
+AFTER UPDATE OF asal_surat, nomor_surat, judul_surat, keterangan ON surat BEGIN
+    INSERT INTO surat_trigram (surat_trigram, rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+    VALUES ('delete', old.id, old.asal_surat, old.nomor_surat, old.judul_surat, old.keterangan);
+    INSERT INTO surat_trigram (rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+    VALUES (new.id, new.asal_surat, new.nomor_surat, new.judul_surat, new.keterangan);
+END;
+
+-- Indeks surat AKTIF (migrasi v7, menggantikan indeks v2/v4/v6): query daftar
+-- wajib memuat "dihapus_pada IS NULL" agar partial index ini terpakai
+CREATE INDEX IF NOT EXISTS idx_surat_aktif_kategori_id ON surat (kategori, id DESC) WHERE dihapus_pada IS NULL;
+CREATE INDEX IF NOT EXISTS idx_surat_aktif_kategori_tahun ON surat (kategori, tahun) WHERE dihapus_pada IS NULL;
+CREATE INDEX IF NOT EXISTS idx_surat_aktif_kategori_tanggal_hari ON surat (kategori, tanggal_hari) WHERE dihapus_pada IS NULL;
+-- Rentang tanggal surat (migrasi v11)
+CREATE INDEX IF NOT EXISTS idx_surat_aktif_kategori_tanggal_surat_hari ON surat (kategori, tanggal_surat_hari) WHERE dihapus_pada IS NULL;
+-- Antrean pembersihan permanen (trash_worker.py)
+CREATE INDEX IF NOT EXISTS idx_surat_terhapus ON surat (id, dihapus_pada) WHERE dihapus_pada IS NOT NULL;
+
+-- Counter jumlah surat AKTIF untuk Dashboard (migrasi v5, v7), dijaga oleh trigger
+-- statistik_surat_ai / _ad / _au di tabel surat (lihat migrations.py)
+--   (kategori, 0, 0) = total, (kategori, tahun, 0) = per tahun,
+--   (kategori, tahun, bulan) = per bulan
+CREATE TABLE IF NOT EXISTS statistik_surat (
+    kategori TEXT NOT NULL,
+    tahun INTEGER NOT NULL,
+    bulan INTEGER NOT NULL,
+    jumlah INTEGER NOT NULL,
+    PRIMARY KEY (kategori, tahun, bulan)
+) WITHOUT ROWID;
+
+-- Riwayat perubahan data (migrasi v8), append-only: UPDATE & DELETE ditolak
+-- trigger. Ditulis per batch oleh src/audit_log.py (bukan satu commit per aksi).
+CREATE TABLE IF NOT EXISTS audit_log (
+    id INTEGER PRIMARY KEY,
+    waktu TEXT NOT NULL,        -- yyyy-MM-dd HH:mm:ss.ffffff
+    pengguna TEXT,
+    aksi TEXT NOT NULL,         -- tambah, ubah, hapus, pulihkan, hapus_permanen
+    tabel TEXT NOT NULL,        -- surat / kode_surat
+    id_rekaman INTEGER,
+    keterangan TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_audit_log_rekaman ON audit_log (tabel, id_rekaman, waktu);
+CREATE INDEX IF NOT EXISTS idx_audit_log_waktu ON audit_log (waktu);
+CREATE TRIGGER IF NOT EXISTS audit_log_tolak_ubah BEFORE UPDATE ON audit_log BEGIN
+    SELECT RAISE(ABORT, 'audit_log hanya boleh ditambah');
+END;
+CREATE TRIGGER IF NOT EXISTS audit_log_tolak_hapus BEFORE DELETE ON audit_log BEGIN
+    SELECT RAISE(ABORT, 'audit_log hanya boleh ditambah');
+END;
+
+-- Kosakata pengirim & perihal untuk pencarian mirip (migrasi v10, butuh SQLite 3.34+):
+-- nilai unik lower(trim(asal_surat / judul_surat)) surat AKTIF per kategori beserta
+-- jumlah suratnya, dijaga trigger kosakata_surat_ai / _ad / _au di tabel surat
+-- (lihat migrations.py). Kandidat nilai yang mirip dicari lewat kosakata_trigram.
+CREATE TABLE IF NOT EXISTS kosakata_surat (
+    id INTEGER PRIMARY KEY,
+    kategori TEXT NOT NULL,
+    kolom TEXT NOT NULL,        -- asal_surat / judul_surat
+    nilai TEXT NOT NULL,        -- lower(trim(...))
+    jumlah INTEGER NOT NULL,
+    UNIQUE (kategori, kolom, nilai)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS kosakata_trigram USING fts5(
+    nilai, kategori UNINDEXED, kolom UNINDEXED,
+    content='kosakata_surat', content_rowid='id',
+    tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS kosakata_trigram_ai AFTER INSERT ON kosakata_surat BEGIN
+    INSERT INTO kosakata_trigram (rowid, nilai, kategori, kolom) VALUES (new.id, new.nilai, new.kategori, new.kolom);
+END;
+CREATE TRIGGER IF NOT EXISTS kosakata_trigram_ad AFTER DELETE ON kosakata_surat BEGIN
+    INSERT INTO kosakata_trigram (kosakata_trigram, rowid, nilai, kategori, kolom)
+    VALUES ('delete', old.id, old.nilai, old.kategori, old.kolom);
+END;
+-- Jumlah nilai per trigram: trigram paling jarang dipakai lebih dulu saat mencari kandidat
+CREATE VIRTUAL TABLE IF NOT EXISTS kosakata_trigram_vocab USING fts5vocab(kosakata_trigram, 'row');
+-- Surat dengan nilai terpilih diambil lewat indeks ekspresi (ekspresinya sama dengan trigger)
+CREATE INDEX IF NOT EXISTS idx_surat_aktif_asal_surat_normal
+    ON surat (kategori, lower(trim(asal_surat))) WHERE dihapus_pada IS NULL;
+CREATE INDEX IF NOT EXISTS idx_surat_aktif_judul_surat_normal
+    ON surat (kategori, lower(trim(judul_surat))) WHERE dihapus_pada IS NULL;
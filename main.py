@@ -7,8 +7,13 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont, QIcon
 
 # Import komponen dari folder src
-from src import connect_db, Dashboard, SuratMasuk, SuratKeluar, KelolaDokumen
+from src import init_db, close_connection, Dashboard, SuratMasuk, SuratKeluar, KelolaDokumen
 from src.kode_surat import ManajemenKodeSurat 
+from src.pencarian_global import PencarianGlobal
+from src.query_worker import tunggu_selesai
+from src.trash_worker import antrean_sampah
+from src.audit_log import pencatat_audit
+from src.settings import get_server_url
 
 class AplikasiUtama(QMainWindow):
     def __init__(self):
@@ -26,15 +31,18 @@ class AplikasiUtama(QMainWindow):
         # Ukuran default (fallback)
         self.resize(1200, 800)
 
-        # Cek Koneksi Database (SQLite)
-        db = connect_db()
-        if not db:
+        # Siapkan Database (SQLite) sekali di awal, koneksi dipakai ulang oleh semua halaman
+        if not init_db():
             QMessageBox.critical(self, "Error Database", "Gagal menginisialisasi database lokal!")
             sys.exit()
-        db.close() 
 
         self.setup_ui()
 
+        # Surat yang dihapus dibersihkan permanen secara berkala di background
+        # (mode server: dijalankan oleh server arsip, bukan oleh setiap komputer)
+        if not get_server_url():
+            antrean_sampah().mulai_pembersihan_berkala()
+
     def setup_ui(self):
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
@@ -73,6 +81,7 @@ class AplikasiUtama(QMainWindow):
         # Daftar Menu Navigasi
         self.menus = [
             ("🏠   Dashboard", 0),
+            ("🔍   Pencarian Global", 5),
             ("📥   Surat Masuk", 1),
             ("📤   Surat Keluar", 2),
             ("📁   Kelola Dokumen", 3),
@@ -126,6 +135,9 @@ class AplikasiUtama(QMainWindow):
         self.halaman_konten.addWidget(SuratKeluar())        # Index 2
         self.halaman_konten.addWidget(KelolaDokumen())      # Index 3
         self.halaman_konten.addWidget(ManajemenKodeSurat()) # Index 4
+        self.pencarian_global = PencarianGlobal()
+        self.pencarian_global.buka_rekaman.connect(self.buka_rekaman)
+        self.halaman_konten.addWidget(self.pencarian_global) # Index 5
 
     def ganti_halaman(self, index):
         self.halaman_konten.setCurrentIndex(index)
@@ -136,13 +148,39 @@ class AplikasiUtama(QMainWindow):
         if btn:
             btn.setChecked(True)
         
-        # Trigger refresh data saat halaman dibuka
+        # Trigger refresh data saat halaman dibuka (query berjalan di background,
+        # tabel/grafik diisi setelah hasil tiba sehingga GUI tetap responsif).
+        # Halaman yang datanya belum berubah sejak terakhir dimuat tidak dimuat ulang.
+        if hasattr(current_widget, 'muat_jika_berubah'):
+            current_widget.muat_jika_berubah()
+            return
+
         if hasattr(current_widget, 'load_data'):
             current_widget.load_data()
             
         if hasattr(current_widget, 'refresh_data'):
             current_widget.refresh_data()
 
+    def buka_rekaman(self, sumber, id_rekaman):
+        """Hasil pencarian global dipilih: pindah ke halamannya lalu tampilkan rekaman itu."""
+        index = {"masuk": 1, "keluar": 2, "dokumen": 3, "kode_surat": 4}[sumber]
+        self.halaman_konten.setCurrentIndex(index)
+        btn = self.nav_group.button(index)
+        if btn:
+            btn.setChecked(True)
+        # Halaman memuat ulang datanya sendiri dengan filter dikosongkan (tanpa muat_jika_berubah)
+        self.halaman_konten.currentWidget().tampilkan_rekaman(id_rekaman)
+
+    def closeEvent(self, event):
+        # Tunggu query background selesai sebelum koneksi database ditutup
+        tunggu_selesai()
+        # Beri kesempatan antrean Recycle Bin menyelesaikan berkas yang tersisa
+        antrean_sampah().tunggu_selesai(timeout=5)
+        # Sisa catatan audit di buffer ditulis sebelum koneksi ditutup
+        pencatat_audit().flush()
+        close_connection()
+        super().closeEvent(event)
+
     def get_menu_style(self, is_exit=False):
         bg_hover = "#e74c3c" if is_exit else "#34495e"
         
@@ -0,0 +1,138 @@
+import atexit
+import getpass
+import socket
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from .db_manager import db_transaction, close_connection
+
+# =====================================================================
+# AUDIT LOG (RIWAYAT PERUBAHAN DATA)
+# ---------------------------------------------------------------------
+# Setiap tambah / ubah / hapus surat & kode surat dicatat ke tabel
+# audit_log (append-only, lihat migrasi v8). Agar aksi pengguna tidak
+# bertambah satu commit lagi, catatan dikumpulkan dulu di buffer memori
+# lalu ditulis per batch dalam SATU transaksi oleh thread "audit-log":
+#   - setiap INTERVAL_FLUSH detik, atau
+#   - segera jika buffer sudah berisi UKURAN_BUFFER catatan.
+# Sisa buffer ditulis saat aplikasi ditutup (flush() / atexit). Jika
+# aplikasi mati mendadak, catatan beberapa detik terakhir bisa hilang.
+#
+# Query riwayat: AuditLogRepository (repository.py).
+# =====================================================================
+
+UKURAN_BUFFER = 200
+INTERVAL_FLUSH = 2.0    # detik
+
+_local = threading.local()
+
+
+def pengguna_lokal():
+    """Nama pengguna di komputer ini, mis. 'staf_tu@PC-ARSIP'."""
+    try:
+        nama = getpass.getuser()
+    except Exception:
+        nama = "?"
+    return f"{nama}@{socket.gethostname()}"
+
+
+@contextmanager
+def atas_nama(pengguna):
+    """Aksi di dalam blok ini (thread yang sama) dicatat atas nama `pengguna`."""
+    lama = getattr(_local, "pengguna", None)
+    _local.pengguna = pengguna
+    try:
+        yield
+    finally:
+        _local.pengguna = lama
+
+
+class PencatatAudit:
+    """Buffer catatan audit + thread penulis. Gunakan pencatat_audit() untuk mengambilnya."""
+
+    def __init__(self, ukuran_buffer=UKURAN_BUFFER, interval=INTERVAL_FLUSH):
+        self.ukuran_buffer = ukuran_buffer
+        self.interval = interval
+        self._buffer = []
+        self._lock = threading.Lock()           # Menjaga _buffer
+        self._flush_lock = threading.Lock()     # Satu flush dalam satu waktu
+        self._penuh = threading.Event()
+        self._pengguna = pengguna_lokal()
+        self._thread = threading.Thread(target=self._loop, name="audit-log", daemon=True)
+        self._thread.start()
+
+    def catat(self, aksi, tabel, ids, keterangan=""):
+        """
+        Menambah catatan ke buffer (tanpa menyentuh database).
+        aksi: 'tambah', 'ubah', 'hapus', 'pulihkan', 'hapus_permanen'.
+        ids: id rekaman yang terkena aksi (satu catatan per id).
+        """
+        waktu = datetime.now().isoformat(" ", "microseconds")
+        pengguna = getattr(_local, "pengguna", None) or self._pengguna
+        with self._lock:
+            self._buffer.extend((waktu, pengguna, aksi, tabel, int(i), keterangan) for i in ids)
+            penuh = len(self._buffer) >= self.ukuran_buffer
+        if penuh:
+            self._penuh.set()
+
+    def flush(self):
+        """Menulis seluruh isi buffer dalam SATU transaksi. Mengembalikan jumlah catatan."""
+        with self._flush_lock:
+            with self._lock:
+                baris, self._buffer = self._buffer, []
+            if not baris:
+                return 0
+            try:
+                with db_transaction() as db:
+                    db.executemany("""
+                        INSERT INTO audit_log (waktu, pengguna, aksi, tabel, id_rekaman, keterangan)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, baris)
+            except Exception as e:
+                # Dikembalikan ke depan buffer, dicoba lagi pada flush berikutnya
+                with self._lock:
+                    self._buffer[:0] = baris
+                print(f"Error Audit Log: {e}")
+                return 0
+            return len(baris)
+
+    @contextmanager
+    def dijeda(self):
+        """
+        Menulis isi buffer, lalu menahan flush berikutnya selama blok berjalan
+        (mis. saat file database diganti oleh restore backup). Catatan baru
+        tetap masuk buffer dan ditulis setelah blok selesai.
+        """
+        self.flush()
+        with self._flush_lock:
+            yield
+
+    def _loop(self):
+        while True:
+            self._penuh.wait(self.interval)
+            self._penuh.clear()
+            try:
+                if self.flush():
+                    # Jangan menahan file database terbuka di antara flush (mis. saat restore backup)
+                    close_connection()
+            except Exception as e:
+                print(f"Error Audit Log: {e}")
+
+
+_pencatat = None
+_pencatat_lock = threading.Lock()
+
+
+def pencatat_audit():
+    global _pencatat
+    with _pencatat_lock:
+        if _pencatat is None:
+            _pencatat = PencatatAudit()
+            # Skrip di tools/ tidak punya closeEvent: sisa buffer ditulis saat proses selesai
+            atexit.register(_pencatat.flush)
+    return _pencatat
+
+
+def catat(aksi, tabel, ids, keterangan=""):
+    """Singkatan pencatat_audit().catat(...)."""
+    pencatat_audit().catat(aksi, tabel, ids, keterangan)
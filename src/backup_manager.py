@@ -1,24 +1,24 @@
 import os
 import shutil
-import sqlite3
 import zipfile
-import glob
+import tempfile
 from datetime import datetime
 from PyQt6.QtWidgets import (QFileDialog, QMessageBox, QDialog, QVBoxLayout, 
                              QHBoxLayout, QLabel, QPushButton) # [FIX] QHBoxLayout ditambahkan
 from PyQt6.QtCore import Qt
+from .db_manager import init_db, tutup_semua_koneksi, get_db_path, backup_ke_file
+from .audit_log import pencatat_audit
+from .repository import SuratRepository
+from .query_worker import tunggu_selesai
+from .trash_worker import antrean_sampah
 
 class BackupManager:
     def __init__(self, parent_widget):
         self.parent = parent_widget
-        self.db_filename = "arsip_digital.db" 
+        # Lokasi database sama dengan yang dipakai aplikasi (bukan relatif ke folder kerja)
+        self.db_filename = get_db_path()
         self.upload_folder_name = "uploads"
-
-        # Auto-detect nama DB jika berbeda
-        if not os.path.exists(self.db_filename):
-            found_dbs = glob.glob("*.db")
-            if found_dbs:
-                self.db_filename = found_dbs[0]
+        self.repo = SuratRepository()
 
     def create_backup(self):
         """Backup Pintar: Mendukung File Tunggal dan Folder Dokumen"""
@@ -32,16 +32,17 @@ class BackupManager:
         if not path_zip:
             return
 
-        conn = None
+        folder_snapshot = tempfile.mkdtemp()
         try:
-            conn = sqlite3.connect(self.db_filename)
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, file_path FROM surat WHERE file_path IS NOT NULL AND file_path != ''")
-            rows = cursor.fetchall()
-            
+            rows = self.repo.list_file_paths()
+
+            # Snapshot konsisten dari database yang sedang dipakai (bukan menyalin file mentah)
+            path_snapshot = os.path.join(folder_snapshot, os.path.basename(self.db_filename))
+            backup_ke_file(path_snapshot)
+
             with zipfile.ZipFile(path_zip, 'w', zipfile.ZIP_DEFLATED) as zipf:
                 # 1. Backup Database
-                zipf.write(self.db_filename, arcname=self.db_filename)
+                zipf.write(path_snapshot, arcname=os.path.basename(self.db_filename))
                 
                 # 2. Backup File/Folder Fisik
                 item_count = 0
@@ -79,7 +80,7 @@ class BackupManager:
         except Exception as e:
             self.notifikasi_custom("Error Backup", str(e), QMessageBox.Icon.Critical)
         finally:
-            if conn: conn.close()
+            shutil.rmtree(folder_snapshot, ignore_errors=True)
 
     def restore_backup(self):
         """Restore Pintar: Menangani File & Folder, serta memperbaiki Path DB"""
@@ -94,7 +95,6 @@ class BackupManager:
         if os.path.exists(temp_dir): shutil.rmtree(temp_dir)
         os.makedirs(temp_dir)
 
-        conn = None
         try:
             # 1. Ekstrak ZIP
             with zipfile.ZipFile(path_zip, 'r') as zipf:
@@ -104,7 +104,7 @@ class BackupManager:
             found_db = None
             for root, dirs, files in os.walk(temp_dir):
                 for file in files:
-                    if file == self.db_filename or file.endswith(".db"):
+                    if file == os.path.basename(self.db_filename) or file.endswith(".db"):
                         found_db = os.path.join(root, file)
                         break
                 if found_db: break
@@ -113,19 +113,29 @@ class BackupManager:
                 raise Exception("Database tidak ditemukan dalam backup!")
 
             target_db = os.path.abspath(self.db_filename)
-            try:
-                if os.path.exists(target_db): os.remove(target_db)
-                shutil.move(found_db, target_db)
-            except PermissionError:
-                raise Exception("Database sedang digunakan! Tutup aplikasi lain.")
+            # Query background dihentikan; catatan audit milik database lama ditulis
+            # dulu, lalu audit log & antrean sampah dijeda selama file diganti
+            tunggu_selesai()
+            with pencatat_audit().dijeda(), antrean_sampah().dijeda():
+                # Lepas koneksi SEMUA thread agar file database bisa diganti
+                tutup_semua_koneksi()
+                try:
+                    if os.path.exists(target_db): os.remove(target_db)
+                    # Buang sisa file WAL milik database lama agar tidak tercampur
+                    for sisa in (target_db + "-wal", target_db + "-shm"):
+                        if os.path.exists(sisa): os.remove(sisa)
+                    shutil.move(found_db, target_db)
+                except PermissionError:
+                    raise Exception("Database sedang digunakan! Tutup aplikasi lain.")
+
+                # Backup bisa berasal dari versi aplikasi lama: migrasi sebelum ada penulisan
+                if not init_db():
+                    raise Exception("Database hasil restore gagal dimigrasi ke versi terbaru!")
 
             # 3. Restore File & Folder ke 'uploads/'
             dest_base = os.path.abspath(self.upload_folder_name)
             if not os.path.exists(dest_base): os.makedirs(dest_base)
 
-            # Koneksi ke DB baru untuk update path
-            conn = sqlite3.connect(target_db)
-            cursor = conn.cursor()
             updates = []
             
             # Cari folder 'files' hasil ekstrak
@@ -174,15 +184,14 @@ class BackupManager:
 
             # 4. Update Path di Database
             if updates:
-                cursor.executemany("UPDATE surat SET file_path = ? WHERE id = ?", updates)
-                conn.commit()
+                # Koneksi bersama dibuka ulang ke database hasil restore (sudah dimigrasi)
+                self.repo.update_file_paths(updates)
 
             self.notifikasi_custom("Sukses", "Data berhasil dipulihkan!\nSilakan RESTART APLIKASI.", QMessageBox.Icon.Information)
 
         except Exception as e:
             self.notifikasi_custom("Gagal Restore", str(e), QMessageBox.Icon.Critical)
         finally:
-            if conn: conn.close()
             if os.path.exists(temp_dir): 
                 try: shutil.rmtree(temp_dir)
                 except: pass
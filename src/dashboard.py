@@ -4,7 +4,9 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QGraphicsDropShadowEffect, QMessageBox, QSizePolicy)
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
-from .db_manager import connect_db
+from .repository_remote import surat_repository
+from .query_worker import QueryExecutor
+from .db_manager import versi_data
 from .backup_manager import BackupManager
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
@@ -13,23 +15,17 @@ class Dashboard(QWidget):
     def __init__(self):
         super().__init__()
         self.backup_mgr = BackupManager(self)
+        self.executor = QueryExecutor(self)
+        self._versi_tampil = None   # versi_data() saat halaman terakhir dimuat
         self.cards = []
         self.setup_ui()
         QTimer.singleShot(200, self.refresh_data)
 
     def get_stats(self):
-        stats = {'masuk': 0, 'keluar': 0, 'dokumen': 0}
         try:
-            db = connect_db()
-            if db:
-                cursor = db.cursor()
-                cursor.execute("SELECT kategori, COUNT(*) FROM surat GROUP BY kategori")
-                for kat, jml in cursor.fetchall():
-                    k = str(kat).lower()
-                    if k in stats: stats[k] = jml
-                db.close()
+            return surat_repository().stats()
         except Exception as e: print(f"Error DB: {e}")
-        return stats
+        return {'masuk': 0, 'keluar': 0, 'dokumen': 0}
 
     def setup_ui(self):
         self.main_layout = QVBoxLayout(self)
@@ -138,11 +134,10 @@ class Dashboard(QWidget):
         chart_container_layout.addWidget(self.chart_frame)
         self.main_layout.addWidget(chart_container, stretch=1)
 
-    def load_cards(self):
+    def load_cards(self, data):
         for card in self.cards: card.setParent(None)
         self.cards.clear()
 
-        data = self.get_stats()
         configs = [
             ("📨 SURAT MASUK", data['masuk'], "qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #667eea, stop:1 #764ba2)", "#5568d3"),
             ("📤 SURAT KELUAR", data['keluar'], "qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #f093fb, stop:1 #f5576c)", "#e54858"),
@@ -179,12 +174,11 @@ class Dashboard(QWidget):
             self.cards.append(card)
             self.card_layout.addWidget(card)
 
-    def update_chart(self):
+    def update_chart(self, data):
         while self.chart_vbox.count():
             child = self.chart_vbox.takeAt(0)
             if child.widget(): child.widget().deleteLater()
 
-        data = self.get_stats()
         sizes = [data['masuk'], data['keluar'], data['dokumen']]
         labels = ['Surat Masuk', 'Surat Keluar', 'Dokumen']
         
@@ -234,6 +228,17 @@ class Dashboard(QWidget):
         
         self.chart_vbox.addWidget(canvas)
 
+    def muat_jika_berubah(self):
+        """Dipanggil saat halaman dibuka dari sidebar: muat ulang hanya jika data sudah berubah."""
+        versi = versi_data()
+        if versi is None or versi != self._versi_tampil:
+            self.refresh_data()
+
     def refresh_data(self):
-        self.load_cards()
-        self.update_chart()
\ No newline at end of file
+        # Statistik dihitung di background, kartu & grafik digambar setelah hasil tiba
+        self._versi_tampil = versi_data()
+        self.executor.jalankan(self.get_stats, on_selesai=self.tampilkan_stats)
+
+    def tampilkan_stats(self, data):
+        self.load_cards(data)
+        self.update_chart(data)
\ No newline at end of file
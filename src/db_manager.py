@@ -1,51 +1,334 @@
+import ctypes
 import sqlite3
 import os
+import random
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from .migrations import jalankan_migrasi
+from .settings import get_db_profile, get_server_url
+
+# Satu koneksi per thread, dibuat sekali lalu dipakai ulang oleh semua halaman
+_local = threading.local()
+_init_lock = threading.Lock()
+# Koneksi bersama milik semua thread, agar bisa ditutup sekaligus (lihat tutup_semua_koneksi)
+_semua_koneksi = set()
+_koneksi_lock = threading.Lock()
+_schema_siap = False
+_db_path = None
+
+# Penanda perubahan data di proses ini (lihat versi_data)
+_versi_lokal = 0
+_versi_lock = threading.Lock()
+
+# Semua penulisan di proses ini lewat satu antrean (lihat db_transaction)
+_tulis_lock = threading.RLock()
+MAKS_PERCOBAAN_TULIS = 4
+JEDA_AWAL_TULIS = 0.05      # detik, digandakan setiap percobaan
+JEDA_MAKS_TULIS = 2.0
+
+# Jumlah prepared statement yang disimpan per koneksi (default sqlite3: 128).
+# Query repository.py dibuat dengan string SQL yang tetap sehingga bisa dipakai ulang.
+CACHED_STATEMENTS = 256
+
+
+def get_db_path():
+    """Lokasi arsip_digital.db, selalu di samping file utama aplikasi."""
+    if _db_path:
+        return _db_path
+
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+        # Jika file ini ada di dalam folder 'src', naik satu tingkat
+        if os.path.basename(base_path) == 'src':
+            base_path = os.path.dirname(base_path)
+
+    return os.path.join(base_path, "arsip_digital.db")
+
+
+def set_db_path(path):
+    """Mengarahkan aplikasi ke file database lain (dipakai oleh tools/skrip)."""
+    global _db_path, _schema_siap
+    close_connection()
+    _db_path = path
+    _schema_siap = False
+    tandai_berubah()
+
+
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_TEMP_STORE = {"DEFAULT", "FILE", "MEMORY"}
+_DRIVE_REMOTE = 4   # GetDriveTypeW: drive jaringan yang dipetakan
+
+
+def _pilihan(nilai, pilihan, default):
+    nilai = str(nilai).upper()
+    return nilai if nilai in pilihan else default
+
+
+def _di_network_share(db_path):
+    """True jika file database ada di network share: path UNC atau drive yang dipetakan (Z:\\)."""
+    path = os.path.abspath(db_path).replace("/", "\\")
+    if path.startswith("\\\\"):
+        return True
+    if sys.platform == "win32" and path[1:2] == ":":
+        try:
+            return ctypes.windll.kernel32.GetDriveTypeW(path[:2] + "\\") == _DRIVE_REMOTE
+        except Exception:
+            # Tidak bisa dipastikan: anggap network share (pilihan yang aman)
+            return True
+    return False
+
+
+def _journal_mode(profile, db_path):
+    mode = _pilihan(profile.get("journal_mode"), _JOURNAL_MODES, "DELETE")
+    # WAL butuh shared memory di komputer yang sama: tidak aman untuk file
+    # database yang dibuka beberapa komputer lewat network share, jadi kembali ke DELETE
+    if mode == "WAL" and _di_network_share(db_path):
+        mode = "DELETE"
+    return mode
+
+
+def _terapkan_profil(conn, profile):
+    """Menerapkan PRAGMA per-koneksi dari profil performa (settings.py)."""
+    synchronous = _pilihan(profile.get("synchronous"), _SYNCHRONOUS, "FULL")
+    # synchronous=NORMAL hanya aman dengan WAL; dengan rollback journal (DELETE dll.)
+    # file database bisa rusak jika listrik mati, jadi minimal FULL
+    mode = conn.execute("PRAGMA journal_mode").fetchone()[0].upper()
+    if mode != "WAL" and synchronous != "EXTRA":
+        synchronous = "FULL"
+    conn.execute(f"PRAGMA synchronous = {synchronous}")
+    conn.execute(f"PRAGMA temp_store = {_pilihan(profile.get('temp_store'), _TEMP_STORE, 'DEFAULT')}")
+    conn.execute(f"PRAGMA cache_size = {int(profile.get('cache_size', -2000))}")
+    conn.execute(f"PRAGMA mmap_size = {int(profile.get('mmap_size', 0))}")
+    conn.execute(f"PRAGMA busy_timeout = {int(profile.get('busy_timeout', 5000))}")
+
+
+def init_db():
+    """
+    Menyiapkan skema database SEKALI saat aplikasi start dengan menjalankan
+    migrasi yang belum diterapkan (lihat migrations.py).
+    Pemanggilan berikutnya langsung kembali tanpa menyentuh database.
+    """
+    global _schema_siap
+    if _schema_siap:
+        return True
+
+    with _init_lock:
+        if _schema_siap:
+            return True
+        try:
+            db_path = get_db_path()
+            conn = sqlite3.connect(db_path)
+            try:
+                # journal_mode tersimpan permanen di file database, cukup diatur sekali
+                mode = _journal_mode(get_db_profile(), db_path)
+                conn.execute(f"PRAGMA journal_mode = {mode}")
+                jalankan_migrasi(conn)
+            finally:
+                conn.close()
+            _schema_siap = True
+        except Exception as e:
+            print(f"Error Database SQLite: {e}")
+            return False
+    return True
+
 
 def connect_db():
+    """
+    Membuka koneksi BARU ke database (skema sudah dipastikan siap) dan
+    menerapkan profil performa dari settings.get_db_profile().
+    Pemanggil bertanggung jawab menutup koneksi ini sendiri.
+    Untuk pemakaian sehari-hari gunakan db_session() / db_transaction().
+    """
     try:
-        # Menentukan lokasi database agar selalu di samping file utama aplikasi
-        if getattr(sys, 'frozen', False):
-            base_path = os.path.dirname(sys.executable)
-        else:
-            base_path = os.path.dirname(os.path.abspath(__file__))
-            # Jika file ini ada di dalam folder 'src', naik satu tingkat
-            if os.path.basename(base_path) == 'src':
-                base_path = os.path.dirname(base_path)
-
-        db_path = os.path.join(base_path, "arsip_digital.db")
-        
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # --- PERBAIKAN DI SINI ---
-        
-        # 1. Buat Tabel Surat (Eksekusi Sendiri)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS surat (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nomor_surat TEXT,
-                judul_surat TEXT,
-                asal_surat TEXT,
-                kategori TEXT,
-                tanggal TEXT,        -- Tanggal Terima/Kirim
-                tanggal_surat TEXT,  -- Tanggal asli di Fisik Surat
-                keterangan TEXT,
-                file_path TEXT
-            )
-        """)
-
-        # 2. Buat Tabel Kode Surat (Eksekusi Sendiri)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS kode_surat (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                kode TEXT NOT NULL,
-                keterangan TEXT NOT NULL UNIQUE
-            )
-        """)
-        
-        conn.commit()
+        if not init_db():
+            return None
+        profile = get_db_profile()
+        # check_same_thread=False: tutup_semua_koneksi() menutup koneksi thread lain
+        conn = sqlite3.connect(get_db_path(), timeout=int(profile.get("busy_timeout", 5000)) / 1000,
+                               cached_statements=CACHED_STATEMENTS, check_same_thread=False)
+        _terapkan_profil(conn, profile)
         return conn
     except Exception as e:
         print(f"Error Database SQLite: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def get_connection():
+    """Koneksi milik thread saat ini, dibuka sekali lalu dipakai ulang."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and conn not in _semua_koneksi:
+        # Sudah ditutup oleh tutup_semua_koneksi(), buka ulang
+        conn = None
+    if conn is None:
+        conn = connect_db()
+        if conn is None:
+            raise sqlite3.OperationalError("Gagal membuka database lokal!")
+        _local.conn = conn
+        with _koneksi_lock:
+            _semua_koneksi.add(conn)
+    return conn
+
+
+def close_connection():
+    """
+    Menutup koneksi milik thread saat ini (misalnya saat aplikasi ditutup).
+    Tidak menandai data berubah: pemanggil yang mengganti isi/file database
+    (set_db_path, restore backup) memanggil tandai_berubah() sendiri.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        with _koneksi_lock:
+            _semua_koneksi.discard(conn)
+        try: conn.close()
+        except Exception: pass
+        _local.conn = None
+
+
+def tutup_semua_koneksi():
+    """
+    Menutup koneksi bersama milik SEMUA thread dan menandai skema belum siap,
+    sehingga koneksi berikutnya menjalankan migrasi lagi (dipakai saat file
+    database diganti, mis. restore backup). Pastikan tidak ada thread yang
+    sedang memakai database (query worker, audit log, antrean sampah).
+    """
+    global _schema_siap
+    with _koneksi_lock:
+        semua = list(_semua_koneksi)
+        _semua_koneksi.clear()
+    for conn in semua:
+        try: conn.close()
+        except Exception: pass
+    with _init_lock:
+        _schema_siap = False
+    tandai_berubah()
+
+
+def tandai_berubah():
+    """
+    Menaikkan versi lokal; dipanggil setiap ada commit dari proses ini dan
+    saat file database diganti (data_version koneksi baru tidak bisa
+    dibandingkan dengan yang lama).
+    """
+    global _versi_lokal
+    with _versi_lock:
+        _versi_lokal += 1
+
+
+def versi_data():
+    """
+    Penanda versi isi database, dipakai halaman untuk melewati muat ulang
+    jika data belum berubah sejak terakhir ditampilkan.
+
+    PRAGMA data_version hanya berubah jika ADA KONEKSI LAIN yang commit
+    (thread lain / proses lain, mis. tools/impor_massal.py), sedangkan commit
+    lewat koneksi sendiri dicatat oleh _versi_lokal (lihat db_transaction).
+    Mengembalikan None jika database tidak bisa dibaca atau data dibaca lewat
+    server arsip (anggap selalu berubah).
+    """
+    if get_server_url():
+        return None
+    try:
+        data_version = get_connection().execute("PRAGMA data_version").fetchone()[0]
+    except sqlite3.Error:
+        return None
+    return (_versi_lokal, data_version)
+
+
+def backup_ke_file(tujuan, halaman_per_langkah=256, jeda=0.005):
+    """
+    Membuat salinan database yang konsisten (termasuk isi WAL) ke file `tujuan`
+    memakai sqlite3 backup API. Disalin bertahap per `halaman_per_langkah` halaman
+    dengan jeda di antaranya, sehingga database tidak terkunci selama proses backup.
+    Jika ada penulisan dari koneksi lain di tengah jalan, SQLite mengulang otomatis.
+    """
+    sumber = connect_db()
+    if sumber is None:
+        raise sqlite3.OperationalError("Gagal membuka database lokal!")
+    salinan = sqlite3.connect(tujuan)
+    try:
+        sumber.backup(salinan, pages=halaman_per_langkah, sleep=jeda)
+        # Hasil backup berupa satu file mandiri (tanpa -wal/-shm)
+        salinan.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        salinan.close()
+        sumber.close()
+
+
+@contextmanager
+def db_session():
+    """
+    Context manager untuk operasi baca:
+
+        with db_session() as db:
+            db.execute("SELECT ...")
+
+    Koneksi TIDAK ditutup setelah blok selesai.
+    """
+    yield get_connection()
+
+
+@contextmanager
+def db_transaction():
+    """
+    Context manager untuk operasi tulis: commit jika blok sukses,
+    rollback jika terjadi error (error tetap diteruskan ke pemanggil).
+
+    Penulisan dari semua thread di proses ini diantrekan satu per satu
+    (_tulis_lock), lalu transaksi dibuka dengan BEGIN IMMEDIATE sehingga kunci
+    tulis diambil di awal (tidak gagal di tengah jalan saat komputer lain
+    sedang menulis ke database yang sama di network share).
+    Blok db_transaction() bersarang ikut transaksi terluar.
+    """
+    conn = get_connection()
+    with _tulis_lock:
+        if getattr(_local, "kedalaman_tulis", 0):
+            _local.kedalaman_tulis += 1
+            try:
+                yield conn
+            finally:
+                _local.kedalaman_tulis -= 1
+            return
+
+        _dengan_backoff(lambda: conn.execute("BEGIN IMMEDIATE"))
+        _local.kedalaman_tulis = 1
+        try:
+            yield conn
+            _dengan_backoff(conn.commit)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            _local.kedalaman_tulis = 0
+        # Hanya commit yang berhasil yang mengubah data
+        tandai_berubah()
+
+
+def _terkunci(e):
+    pesan = str(e).lower()
+    return "locked" in pesan or "busy" in pesan
+
+
+def _dengan_backoff(aksi):
+    """
+    Menjalankan aksi (BEGIN IMMEDIATE / COMMIT), mengulang dengan jeda
+    eksponensial + acak jika database dikunci komputer lain. busy_timeout
+    SQLite sudah menunggu di dalam setiap percobaan; di sini ditambah
+    beberapa percobaan lagi sebelum menyerah.
+    """
+    jeda = JEDA_AWAL_TULIS
+    for percobaan in range(1, MAKS_PERCOBAAN_TULIS + 1):
+        try:
+            return aksi()
+        except sqlite3.OperationalError as e:
+            if not _terkunci(e):
+                raise
+            if percobaan == MAKS_PERCOBAAN_TULIS:
+                raise sqlite3.OperationalError(
+                    "Database sedang dipakai komputer lain terlalu lama, silakan coba lagi.") from e
+            time.sleep(jeda * random.uniform(0.5, 1.5))
+            jeda = min(jeda * 2, JEDA_MAKS_TULIS)
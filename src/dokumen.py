@@ -6,11 +6,15 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QFrame, QTableWidget, QTableWidgetItem, QHeaderView,
                              QListWidget, QListWidgetItem, QAbstractItemView, QDialog, 
                              QStyledItemDelegate, QStyleOptionViewItem, QComboBox, QCheckBox)
-from PyQt6.QtCore import Qt, QSize, QDate
+from PyQt6.QtCore import Qt, QSize
 from PyQt6.QtGui import QIcon, QPainter, QColor
-from .db_manager import connect_db
+from .repository import FilterSurat
+from .repository_remote import surat_repository
+from .query_worker import QueryExecutor, PencarianTertunda
+from .pencarian import muat_awal, urai_query, BANTUAN_SINTAKS
+from .db_manager import versi_data
+from .trash_worker import antrean_sampah
 from .settings import get_folder_path, set_folder_path
-from send2trash import send2trash
 
 # --- 1. HELPER CLASSES ---
 
@@ -31,12 +35,15 @@ class NumericTableWidgetItem(QTableWidgetItem):
         except ValueError: return super().__lt__(other)
 
 class DateTableWidgetItem(QTableWidgetItem):
+    # Sorting memakai nomor hari dari database, tanpa parse teks tanggal di setiap perbandingan
+    def __init__(self, teks, hari=None):
+        super().__init__(teks)
+        self.hari = hari
+
     def __lt__(self, other):
-        try:
-            d1 = QDate.fromString(self.text(), "dd/MM/yyyy")
-            d2 = QDate.fromString(other.text(), "dd/MM/yyyy")
-            return d1 < d2
-        except: return super().__lt__(other)
+        hari_lain = getattr(other, "hari", None)
+        if self.hari is None or hari_lain is None: return super().__lt__(other)
+        return self.hari < hari_lain
 
 class FileCountItem(QTableWidgetItem):
     def __lt__(self, other):
@@ -134,8 +141,15 @@ class DropListWidget(QListWidget):
 class KelolaDokumen(QWidget):
     def __init__(self):
         super().__init__()
-        self.all_data = []      
-        self.filtered_data = [] 
+        self.repo = surat_repository()
+        self.executor = QueryExecutor(self)
+        self._versi_tampil = None   # versi_data() saat halaman terakhir dimuat
+        self._kandidat = None       # Hasil pencarian terakhir, untuk dipersempit (pencarian.py)
+        self._dituju = None         # id surat dari pencarian global, dicari halamannya saat filter_data
+        antrean_sampah().laporan.connect(self.laporan_sampah)
+        self.page_data = []     # Hanya baris halaman yang sedang tampil
+        self.page_anchors = [None]
+        self.total_rows = 0
         self.current_page = 1
         self.rows_per_page = 10
         self.create_check_icon()
@@ -244,7 +258,21 @@ class KelolaDokumen(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("🔍 Cari dokumen...")
         self.search_input.setStyleSheet("padding: 10px; border-radius: 20px; border: 1px solid #bdc3c7; background: white; color: black;")
-        self.search_input.textChanged.connect(self.filter_data)
+        self.search_input.setToolTip(BANTUAN_SINTAKS)
+        # Query dijalankan setelah berhenti mengetik; query lama dibatalkan di setiap ketukan
+        self.pencarian = PencarianTertunda(self.search_input, self.filter_data,
+                                           batalkan=lambda: self.executor.batalkan("data"))
+        # Pencarian mirip: pengirim & perihal, toleran salah ketik (pencarian.py)
+        self.chk_mirip = QCheckBox("Mirip")
+        self.chk_mirip.setToolTip("Cari pengirim / perihal yang mirip, toleran salah ketik\n"
+                                  "(mis. 'pendidkan' atau singkatan 'disdik')")
+        self.chk_mirip.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.chk_mirip.setStyleSheet(f"""
+            QCheckBox {{ color: #2c3e50; font-size: 13px; spacing: 6px; }}
+            QCheckBox::indicator {{ width: 18px; height: 18px; border: 1px solid #bdc3c7; background-color: white; border-radius: 3px; }}
+            QCheckBox::indicator:checked {{ background-color: #27ae60; border: 1px solid #27ae60; image: url({self.check_icon_path}); }}
+        """)
+        self.chk_mirip.toggled.connect(lambda *args: self.pencarian.jalankan_sekarang())
         
         self.combo_tahun = QComboBox()
         self.combo_tahun.addItem("Semua Tahun")
@@ -276,9 +304,17 @@ class KelolaDokumen(QWidget):
         self.combo_tahun.currentTextChanged.connect(self.filter_data)
 
         search_layout.addWidget(self.search_input)
+        search_layout.addWidget(self.chk_mirip)
         search_layout.addWidget(self.combo_tahun)
         self.main_layout.addLayout(search_layout)
 
+        # Nilai pengirim / perihal yang cocok saat pencarian mirip aktif
+        self.lbl_mirip = QLabel()
+        self.lbl_mirip.setStyleSheet("color: #7f8c8d; font-style: italic;")
+        self.lbl_mirip.setWordWrap(True)
+        self.lbl_mirip.hide()
+        self.main_layout.addWidget(self.lbl_mirip)
+
         # --- TABLE ---
         self.table = QTableWidget()
         self.table.setColumnCount(8)
@@ -314,6 +350,10 @@ class KelolaDokumen(QWidget):
         # [UI FIX] Pagination Label
         self.label_page = QLabel("Halaman 1 of 1")
         self.label_page.setStyleSheet("color: black; font-weight: bold; font-size: 13px;") 
+        self.lbl_memuat = QLabel("⏳ Memuat data...")
+        self.lbl_memuat.setStyleSheet("color: #7f8c8d; font-style: italic;")
+        self.lbl_memuat.hide()
+        self.executor.sedang_memuat.connect(self.set_memuat)
         
         self.btn_next = QPushButton("▶"); self.btn_next.clicked.connect(self.next_page)
         
@@ -327,6 +367,7 @@ class KelolaDokumen(QWidget):
         
         bottom_layout.addWidget(self.btn_delete)
         bottom_layout.addStretch()
+        bottom_layout.addWidget(self.lbl_memuat)
         bottom_layout.addWidget(self.btn_prev)
         bottom_layout.addWidget(self.label_page)
         bottom_layout.addWidget(self.btn_next)
@@ -344,27 +385,21 @@ class KelolaDokumen(QWidget):
             self.update_label_folder()
             self.notifikasi_custom("Sukses", "Lokasi penyimpanan Dokumen berhasil diubah!", QMessageBox.Icon.Information)
 
+    def muat_jika_berubah(self):
+        """Dipanggil saat halaman dibuka dari sidebar: muat ulang hanya jika data sudah berubah."""
+        versi = versi_data()
+        if versi is None or versi != self._versi_tampil:
+            self.load_data()
+
     def load_data(self):
-        try:
-            db = connect_db()
-            cursor = db.cursor()
-            cursor.execute("SELECT id, tanggal, judul_surat, asal_surat, keterangan, file_path FROM surat WHERE kategori='dokumen' ORDER BY id DESC")
-            self.all_data = cursor.fetchall()
-            self.populate_tahun_filter()
-            self.current_page = 1
-            self.filter_data() 
-            db.close()
-        except Exception as e: print(f"Error Load: {e}")
-
-    def populate_tahun_filter(self):
+        # Semua pembacaan database berjalan di background (query_worker.py)
+        self._versi_tampil = versi_data()
+        # Data mungkin sudah berubah: pencarian berikutnya dibaca ulang dari database
+        self._kandidat = None
+        self.executor.jalankan(self.repo.list_tahun, 'dokumen', on_selesai=self.populate_tahun_filter, kanal="tahun")
+
+    def populate_tahun_filter(self, list_tahun):
         current_selection = self.combo_tahun.currentText()
-        tahun_set = set()
-        for row in self.all_data:
-            val_tgl = str(row[1]) if row[1] else ""
-            if val_tgl and "-" in val_tgl:
-                try: tahun_set.add(val_tgl.split("-")[0])
-                except: pass
-        list_tahun = sorted(list(tahun_set), reverse=True)
         self.combo_tahun.blockSignals(True)
         self.combo_tahun.clear()
         self.combo_tahun.addItem("Semua Tahun")
@@ -373,57 +408,134 @@ class KelolaDokumen(QWidget):
         if idx >= 0: self.combo_tahun.setCurrentIndex(idx)
         else: self.combo_tahun.setCurrentIndex(0)
         self.combo_tahun.blockSignals(False)
+        self.filter_data()
 
-    def filter_data(self, *args):
-        keyword = self.search_input.text().lower()
+    def buat_filter(self):
+        """Filter sesuai kata kunci & tahun yang sedang dipilih."""
         selected_tahun = self.combo_tahun.currentText()
-        self.filtered_data = []
-        for row in self.all_data:
-            text_data = f"{row[2]} {row[3]} {row[4]}".lower() 
-            row_tahun = ""
-            val_tgl = str(row[1]) if row[1] else ""
-            if val_tgl and "-" in val_tgl:
-                try: row_tahun = val_tgl.split("-")[0]
-                except: pass
-            if (keyword in text_data) and ((selected_tahun == "Semua Tahun") or (selected_tahun == row_tahun)):
-                self.filtered_data.append(row)
+        return FilterSurat('dokumen', self.search_input.text().strip(),
+                           None if selected_tahun == "Semua Tahun" else int(selected_tahun),
+                           mirip=self.chk_mirip.isChecked())
+
+    def muat_halaman(self):
+        """
+        Keyset pagination: hanya membaca baris halaman aktif.
+        page_anchors[n] = id terakhir di halaman n (batas awal halaman n+1).
+        """
+        after_id = self.page_anchors[self.current_page - 1]
+        self.executor.jalankan(self.repo.list_page, self.buat_filter(), after_id, self.rows_per_page,
+                               on_selesai=self.display_data, kanal="data")
+
+    def filter_data(self, *args):
         self.current_page = 1
-        self.display_data(self.filtered_data)
+        self.page_anchors = [None]
+        dituju, self._dituju = self._dituju, None
+        if dituju is not None:
+            # Dari pencarian global: langsung ke halaman yang memuat surat itu
+            self.executor.jalankan(self.repo.lokasi, self.buat_filter(), dituju, self.rows_per_page,
+                                   on_selesai=lambda hasil: self.buka_lokasi(dituju, hasil), kanal="data")
+            return
+        # Jumlah baris + halaman pertama; kata kunci lanjutan cukup disaring dari hasil sebelumnya
+        self.executor.jalankan(muat_awal, self.repo, self.buat_filter(), self.rows_per_page, self._kandidat,
+                               on_selesai=self.tampilkan_awal, kanal="data")
+
+    def tampilkan_awal(self, hasil):
+        self.total_rows, data, self._kandidat, mirip = hasil
+        self.tampilkan_mirip(mirip)
+        self.display_data(data)
+
+    def tampilkan_rekaman(self, id_surat):
+        """Dipanggil pencarian global: filter dikosongkan, lalu buka halaman yang memuat surat `id_surat`."""
+        widget = [self.search_input, self.chk_mirip, self.combo_tahun]
+        for w in widget: w.blockSignals(True)
+        self.search_input.clear()
+        self.chk_mirip.setChecked(False)
+        self.combo_tahun.setCurrentIndex(0)
+        for w in widget: w.blockSignals(False)
+        self._dituju = id_surat
+        # Daftar tahun ikut dimuat ulang; filter_data setelahnya mencari halaman surat itu
+        self.load_data()
+
+    def buka_lokasi(self, id_surat, hasil):
+        if hasil is None:
+            self.notifikasi_custom("Info", "Surat tidak ditemukan, mungkin sudah dihapus.", QMessageBox.Icon.Warning)
+            self.filter_data()
+            return
+        self.total_rows, self.current_page, anchors = hasil
+        self.page_anchors = list(anchors)
+        self._kandidat = None
+        self.tampilkan_mirip(None)
+        self.executor.jalankan(self.repo.list_page, self.buat_filter(), self.page_anchors[-1], self.rows_per_page,
+                               on_selesai=lambda data: self.sorot_rekaman(id_surat, data), kanal="data")
+
+    def sorot_rekaman(self, id_surat, data):
+        self.display_data(data)
+        for i in range(self.table.rowCount()):
+            widget = self.table.cellWidget(i, 0)
+            chk = widget.findChild(QCheckBox) if widget else None
+            if chk and chk.property("db_id") == id_surat:
+                self.table.selectRow(i)
+                self.table.scrollToItem(self.table.item(i, 1))
+                break
+
+    def tampilkan_mirip(self, mirip):
+        """Pengirim / perihal yang cocok pada pencarian mirip, paling mirip dulu."""
+        teks_cari = self.search_input.text().strip()
+        if mirip is None:
+            # Bukan pencarian mirip: tampilkan bagian sintaks pencarian yang diabaikan
+            peringatan = urai_query(teks_cari).peringatan
+            self.lbl_mirip.setText("⚠ " + "; ".join(peringatan) if peringatan else "")
+            self.lbl_mirip.setVisible(bool(peringatan))
+            return
+        if not teks_cari:
+            self.lbl_mirip.hide()
+            return
+        if mirip:
+            teks = ", ".join(f"{m.nilai} ({m.jumlah})" for m in mirip[:5])
+            lainnya = f" dan {len(mirip) - 5} lainnya" if len(mirip) > 5 else ""
+            self.lbl_mirip.setText(f"≈ Mirip dengan: {teks}{lainnya}")
+        else:
+            self.lbl_mirip.setText("≈ Tidak ada pengirim / perihal yang mirip")
+        self.lbl_mirip.show()
+
+    def set_memuat(self, memuat):
+        """Indikator loading; navigasi halaman dikunci selama query berjalan."""
+        self.lbl_memuat.setVisible(memuat)
+        total_pages = max(1, (self.total_rows + self.rows_per_page - 1) // self.rows_per_page)
+        self.btn_prev.setEnabled(not memuat and self.current_page > 1)
+        self.btn_next.setEnabled(not memuat and self.current_page < total_pages)
 
     def display_data(self, data):
+        self.page_data = data
         self.table.setSortingEnabled(False)
         self.table.setRowCount(0)
         start_idx = (self.current_page - 1) * self.rows_per_page
-        page_data = data[start_idx : start_idx + self.rows_per_page]
-        total_pages = max(1, (len(data) + self.rows_per_page - 1) // self.rows_per_page)
+        total_pages = max(1, (self.total_rows + self.rows_per_page - 1) // self.rows_per_page)
         self.label_page.setText(f"Halaman {self.current_page} dari {total_pages}")
         self.btn_prev.setEnabled(self.current_page > 1)
         self.btn_next.setEnabled(self.current_page < total_pages)
 
-        for i, row in enumerate(page_data):
+        for i, row in enumerate(data):
             self.table.insertRow(i)
             
             # Checkbox
             chk_container = QWidget(); chk_container.setStyleSheet("background: transparent;") 
             chk_layout = QHBoxLayout(chk_container); chk_layout.setAlignment(Qt.AlignmentFlag.AlignCenter); chk_layout.setContentsMargins(0,0,0,0)
-            chk_box = QCheckBox(); chk_box.setProperty("db_id", row[0]); chk_box.setCursor(Qt.CursorShape.PointingHandCursor)
+            chk_box = QCheckBox(); chk_box.setProperty("db_id", row.id); chk_box.setCursor(Qt.CursorShape.PointingHandCursor)
             chk_box.setStyleSheet(f"QCheckBox::indicator {{ width: 18px; height: 18px; border: 1px solid #bdc3c7; background: white; border-radius: 3px; }} QCheckBox::indicator:checked {{ background: #27ae60; border: 1px solid #27ae60; image: url({self.check_icon_path}); }}")
             chk_layout.addWidget(chk_box)
             self.table.setCellWidget(i, 0, chk_container)
 
             self.table.setItem(i, 1, NumericTableWidgetItem(str(start_idx + i + 1))) # No
             
-            val_tgl = str(row[1])
-            try: d = QDate.fromString(val_tgl, "yyyy-MM-dd"); val_tgl = d.toString("dd/MM/yyyy")
-            except: pass
-            self.table.setItem(i, 2, DateTableWidgetItem(val_tgl))
+            self.table.setItem(i, 2, DateTableWidgetItem(row.tanggal_tampil, row.tanggal_hari))
 
-            self.table.setItem(i, 3, QTableWidgetItem(str(row[2]))) # Nama
-            self.table.setItem(i, 4, QTableWidgetItem(str(row[3]))) # Kategori
-            self.table.setItem(i, 5, QTableWidgetItem(str(row[4]))) # Ket
+            self.table.setItem(i, 3, QTableWidgetItem(str(row.judul_surat))) # Nama
+            self.table.setItem(i, 4, QTableWidgetItem(str(row.asal_surat))) # Kategori
+            self.table.setItem(i, 5, QTableWidgetItem(str(row.keterangan))) # Ket
 
             # Hitung File
-            path_folder = row[5]
+            path_folder = row.file_path
             file_count = 0
             if path_folder and os.path.exists(path_folder) and os.path.isdir(path_folder):
                 try: file_count = len([f for f in os.listdir(path_folder) if os.path.isfile(os.path.join(path_folder, f))])
@@ -458,13 +570,15 @@ class KelolaDokumen(QWidget):
     def prev_page(self):
         if self.current_page > 1:
             self.current_page -= 1
-            self.display_data(self.filtered_data)
+            self.muat_halaman()
 
     def next_page(self):
-        total_pages = (len(self.filtered_data) + self.rows_per_page - 1) // self.rows_per_page
-        if self.current_page < total_pages:
+        total_pages = (self.total_rows + self.rows_per_page - 1) // self.rows_per_page
+        if self.current_page < total_pages and self.page_data:
+            # Simpan id terakhir halaman ini sebagai batas awal halaman berikutnya
+            self.page_anchors[self.current_page:] = [self.page_data[-1].id]
             self.current_page += 1
-            self.display_data(self.filtered_data)
+            self.muat_halaman()
 
     # --- CRUD ---
     def pilih_file(self):
@@ -498,10 +612,8 @@ class KelolaDokumen(QWidget):
             for f in files:
                 if os.path.exists(f): shutil.copy(f, dest_dir)
 
-            db = connect_db()
-            db.execute("INSERT INTO surat (judul_surat, asal_surat, kategori, tanggal, keterangan, file_path) VALUES (?, ?, 'dokumen', ?, ?, ?)",
-                       (judul, self.ent_kategori.text(), datetime.now().strftime('%Y-%m-%d'), self.ent_ket.text(), dest_dir))
-            db.commit(); db.close()
+            self.repo.insert('dokumen', tanggal=datetime.now().strftime('%Y-%m-%d'), asal_surat=self.ent_kategori.text(),
+                             judul_surat=judul, keterangan=self.ent_ket.text(), file_path=dest_dir)
             
             self.notifikasi_custom("Berhasil", "Dokumen Tersimpan!", QMessageBox.Icon.Information)
             self.ent_judul.clear(); self.ent_kategori.clear(); self.ent_ket.clear(); self.list_files.clear()
@@ -524,9 +636,9 @@ class KelolaDokumen(QWidget):
         """)
         layout = QVBoxLayout(dialog)
         
-        inp_nama = QLineEdit(str(data[2]))
-        inp_kategori = QLineEdit(str(data[3]))
-        inp_ket = QLineEdit(str(data[4]))
+        inp_nama = QLineEdit(str(data.judul_surat))
+        inp_kategori = QLineEdit(str(data.asal_surat))
+        inp_ket = QLineEdit(str(data.keterangan))
         
         layout.addWidget(QLabel("Nama Dokumen:")); layout.addWidget(inp_nama)
         layout.addWidget(QLabel("Kategori:")); layout.addWidget(inp_kategori)
@@ -540,10 +652,7 @@ class KelolaDokumen(QWidget):
         
         if dialog.exec():
             try:
-                db = connect_db()
-                db.execute("UPDATE surat SET judul_surat=?, asal_surat=?, keterangan=? WHERE id=?", 
-                           (inp_nama.text(), inp_kategori.text(), inp_ket.text(), data[0]))
-                db.commit(); db.close()
+                self.repo.update(data.id, judul_surat=inp_nama.text(), asal_surat=inp_kategori.text(), keterangan=inp_ket.text())
                 self.load_data()
                 self.notifikasi_custom("Sukses", "Data diperbarui!", QMessageBox.Icon.Information)
             except Exception as e: self.notifikasi_custom("Error", str(e), QMessageBox.Icon.Critical)
@@ -582,7 +691,7 @@ class KelolaDokumen(QWidget):
         lbl_judul.setStyleSheet("font-size: 22px; font-weight: 900; color: #c0392b; border: none; background: transparent; margin-top: 5px;")
         layout.addWidget(lbl_judul)
         
-        lbl_pesan = QLabel(f"Anda akan menghapus <b>{len(ids_to_delete)} dokumen</b> terpilih.<br>Folder fisik akan dipindahkan ke Recycle Bin.")
+        lbl_pesan = QLabel(f"Anda akan menghapus <b>{len(ids_to_delete)} dokumen</b> terpilih.<br>Data masih bisa diurungkan, lalu folder fisik dipindahkan ke Recycle Bin beberapa menit kemudian.")
         lbl_pesan.setAlignment(Qt.AlignmentFlag.AlignCenter)
         lbl_pesan.setWordWrap(True)
         lbl_pesan.setStyleSheet("font-size: 14px; color: #57606f; line-height: 1.4; border: none; background: transparent;")
@@ -610,75 +719,28 @@ class KelolaDokumen(QWidget):
 
         if dialog.exec(): 
             try:
-                db = connect_db()
-                cursor = db.cursor()
-                deleted_count = 0
-                locked_items = [] # Menyimpan nama folder yang gagal dihapus
-
-                for db_id in ids_to_delete:
-                    cursor.execute("SELECT judul_surat, file_path FROM surat WHERE id=?", (db_id,))
-                    row = cursor.fetchone()
-                    
-                    if not row: continue
-                    
-                    judul_doc = row[0]
-                    raw_path = row[1]
-                    delete_success = False
-
-                    # Normalisasi Path
-                    if raw_path and raw_path.startswith("\\\\?\\"): raw_path = raw_path[4:]
-                    path_folder = os.path.normpath(raw_path) if raw_path else None
-                    
-                    # Logika Hapus Fisik
-                    if path_folder and os.path.exists(path_folder):
-                        try:
-                            # 1. Coba pindahkan ke Recycle Bin
-                            send2trash(path_folder)
-                            delete_success = True
-                        except OSError as e:
-                            # 2. Cek apakah terkunci (WinError 32 = File used by another process)
-                            if hasattr(e, 'winerror') and e.winerror == 32:
-                                locked_items.append(f"{judul_doc} (Sedang dibuka)")
-                                continue # Skip, jangan hapus dari DB
-                            elif hasattr(e, 'winerror') and e.winerror == 13: # Permission denied
-                                locked_items.append(f"{judul_doc} (Akses ditolak)")
-                                continue
-                            else:
-                                # 3. Jika gagal karena alasan lain, coba paksa hapus
-                                try:
-                                    shutil.rmtree(path_folder, ignore_errors=False)
-                                    delete_success = True
-                                except Exception as e_force:
-                                    # Jika masih gagal juga, laporkan
-                                    locked_items.append(f"{judul_doc} (Error: {str(e_force)})")
-                                    continue
-                    else:
-                        # Folder fisik sudah tidak ada, anggap sukses dihapus
-                        delete_success = True
-
-                    # Hapus dari DB hanya jika fisik berhasil dihapus
-                    if delete_success:
-                        cursor.execute("DELETE FROM surat WHERE id=?", (db_id,))
-                        deleted_count += 1
-
-                db.commit()
-                db.close()
+                # Hapus lunak: baris hanya ditandai, berkas dibuang belakangan oleh
+                # pembersihan berkala (trash_worker.py) sehingga masih bisa diurungkan
+                deleted_count = self.repo.tandai_dihapus(ids_to_delete)
                 self.load_data()
-                
-                # --- Tampilkan Notifikasi Hasil ---
-                if locked_items:
-                    # Jika ada file yang terkunci
-                    msg = "<b>Beberapa dokumen tidak bisa dihapus karena sedang digunakan:</b><br><br>"
-                    msg += "<br>".join([f"• {item}" for item in locked_items])
-                    msg += "<br><br>Mohon tutup file/folder tersebut dan coba lagi."
-                    self.notifikasi_custom("Gagal Menghapus Sebagian", msg, QMessageBox.Icon.Warning)
-                elif deleted_count > 0:
-                    self.notifikasi_custom("Berhasil", f"{deleted_count} dokumen berhasil dihapus!", QMessageBox.Icon.Information)
+
+                if deleted_count > 0:
+                    if self.notifikasi_custom("Berhasil", f"{deleted_count} dokumen berhasil dihapus.", QMessageBox.Icon.Information, urungkan=True):
+                        self.repo.pulihkan(ids_to_delete)
+                        self.load_data()
 
             except Exception as e:
                 self.notifikasi_custom("Error Sistem", str(e), QMessageBox.Icon.Critical)
 
-    def notifikasi_custom(self, judul, pesan, ikon):
+    def laporan_sampah(self, sumber, jumlah_berhasil, gagal):
+        """Hasil antrean Recycle Bin (trash_worker.py): laporkan folder yang gagal dibuang."""
+        if sumber != 'dokumen' or not gagal: return
+        msg = "<b>Data sudah dihapus, tetapi beberapa folder tidak bisa dipindahkan karena sedang digunakan:</b><br><br>"
+        msg += "<br>".join([f"• {item}" for item in gagal])
+        msg += "<br><br>Mohon tutup file/folder tersebut lalu hapus secara manual."
+        self.notifikasi_custom("Gagal Menghapus Sebagian", msg, QMessageBox.Icon.Warning)
+
+    def notifikasi_custom(self, judul, pesan, ikon, urungkan=False):
         dialog = QDialog(self)
         dialog.setWindowTitle("Pemberitahuan")
         dialog.setWindowFlags(Qt.WindowType.Dialog | Qt.WindowType.CustomizeWindowHint | Qt.WindowType.WindowTitleHint)
@@ -713,6 +775,17 @@ class KelolaDokumen(QWidget):
         btn = QPushButton("OK")
         btn.clicked.connect(dialog.accept)
         btn.setStyleSheet("QPushButton { background-color: #34495e; color: white; border: none; border-radius: 6px; font-weight: bold; font-size: 14px; height: 45px; } QPushButton:hover { background-color: #2c3e50; }")
-        layout.addWidget(btn)
-        
-        dialog.exec()
\ No newline at end of file
+        if urungkan:
+            # Tombol kedua untuk membatalkan aksi barusan (mis. hapus)
+            btn_urungkan = QPushButton("↩ Urungkan")
+            btn_urungkan.setCursor(Qt.CursorShape.PointingHandCursor)
+            btn_urungkan.clicked.connect(lambda: dialog.done(2))
+            btn_urungkan.setStyleSheet("QPushButton { background-color: #ecf0f1; color: #2c3e50; border: 1px solid #bdc3c7; border-radius: 6px; font-weight: bold; font-size: 14px; height: 45px; } QPushButton:hover { background-color: #dfe6e9; }")
+            baris_tombol = QHBoxLayout()
+            baris_tombol.addWidget(btn_urungkan)
+            baris_tombol.addWidget(btn)
+            layout.addLayout(baris_tombol)
+        else:
+            layout.addWidget(btn)
+        
+        return dialog.exec() == 2
\ No newline at end of file
@@ -5,7 +5,7 @@ from PyQt6.QtWidgets import (QDialog, QFormLayout, QLineEdit, QPushButton,
                              QDateEdit, QComboBox, QCompleter, QGroupBox, QFrame)
 from PyQt6.QtCore import Qt, QDate
 from PyQt6.QtGui import QIcon
-from .db_manager import connect_db
+from .repository_remote import kode_surat_repository
 
 class FormTambahSurat(QDialog):
     def __init__(self, parent=None, kategori="Keluar"):
@@ -335,12 +335,8 @@ class FormTambahSurat(QDialog):
         try:
             self.ent_perihal.clear()
             self.ent_perihal.addItem("") 
-            db = connect_db()
-            cursor = db.cursor()
-            cursor.execute("SELECT kode, keterangan FROM kode_surat ORDER BY keterangan ASC")
-            for kode, ket in cursor.fetchall():
-                self.ent_perihal.addItem(f"{ket} - {kode}")
-            db.close()
+            for row in kode_surat_repository().list_all(urut="keterangan"):
+                self.ent_perihal.addItem(f"{row.keterangan} - {row.kode}")
         except Exception as e: print(e)
 
     def otomatis_isi_kode(self, text):
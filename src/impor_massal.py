@@ -0,0 +1,142 @@
+import os
+import shutil
+from datetime import datetime
+from typing import NamedTuple, Optional
+from .repository import SuratRepository, KOLOM_TULIS
+from .migrations import FORMAT_TANGGAL_LAMA
+from .settings import get_folder_path
+
+# =====================================================================
+# IMPOR MASSAL SURAT
+# ---------------------------------------------------------------------
+# Untuk digitalisasi arsip lama (ribuan surat hasil scan sekaligus):
+#   1. validasi setiap item,
+#   2. salin berkas ke folder penyimpanan kategori,
+#   3. tulis SEMUA baris dalam SATU transaksi (executemany).
+# Jika penulisan database gagal, transaksi di-rollback dan berkas yang
+# sudah disalin dihapus lagi, sehingga tidak ada data setengah jadi.
+# =====================================================================
+
+# Awalan nama berkas, sama dengan aksi_tambah di halaman masing-masing
+PREFIX_BERKAS = {"masuk": "IN_", "keluar": "OUT_"}
+
+
+class ItemImpor(NamedTuple):
+    kategori: str               # 'masuk' / 'keluar'
+    nomor_surat: str
+    file_sumber: str            # Berkas hasil scan yang akan disalin
+    tanggal: str = ""           # Tgl terima/kirim (yyyy-MM-dd, juga dd/MM/yyyy), kosong = hari ini
+    asal_surat: str = ""
+    tanggal_surat: str = ""
+    judul_surat: str = ""
+    keterangan: str = ""
+
+
+class HasilImpor(NamedTuple):
+    indeks: int                 # Posisi item di daftar masukan
+    sukses: bool
+    id: Optional[int] = None    # id surat baru jika sukses
+    file_path: str = ""
+    pesan: str = ""
+
+
+def _tanggal_iso(teks):
+    """
+    Tanggal -> 'yyyy-MM-dd' (format yang dikenali sama dengan migrasi v6), None
+    jika tidak dikenali. Format lain membuat kolom tahun / tanggal_hari NULL
+    sehingga surat hilang dari filter tahun, rentang tanggal & statistik.
+    """
+    for fmt in FORMAT_TANGGAL_LAMA:
+        try:
+            return datetime.strptime(str(teks).strip(), fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def _validasi(item):
+    if item.kategori not in PREFIX_BERKAS:
+        return f"Kategori '{item.kategori}' tidak didukung"
+    if not str(item.nomor_surat or "").strip():
+        return "Nomor surat wajib diisi"
+    for nama, teks in (("Tanggal", item.tanggal), ("Tanggal surat", item.tanggal_surat)):
+        if str(teks or "").strip() and _tanggal_iso(teks) is None:
+            return f"{nama} '{teks}' tidak dikenali (gunakan yyyy-MM-dd)"
+    if not item.file_sumber or not os.path.isfile(item.file_sumber):
+        return f"Berkas tidak ditemukan: {item.file_sumber}"
+    return None
+
+
+def impor_surat(items, batal_jika_ada_gagal=False):
+    """
+    Mengimpor banyak surat sekaligus. Mengembalikan list HasilImpor, satu
+    untuk setiap item (urutan sama dengan `items`).
+
+    batal_jika_ada_gagal=True: jika satu item saja gagal validasi/salin,
+    tidak ada yang disimpan (semua berkas yang sudah disalin dihapus).
+    """
+    items = list(items)
+    hasil = [None] * len(items)
+    siap = []               # (indeks, baris_db, path_tujuan)
+    disalin = []            # Berkas yang harus dihapus lagi jika rollback
+    stempel = datetime.now().strftime('%Y%m%d_%H%M%S')
+    hari_ini = datetime.now().strftime('%Y-%m-%d')
+
+    for i, item in enumerate(items):
+        pesan = _validasi(item)
+        if pesan:
+            hasil[i] = HasilImpor(i, False, pesan=pesan)
+            continue
+        try:
+            up_dir = get_folder_path(item.kategori)
+            os.makedirs(up_dir, exist_ok=True)
+            ext = os.path.splitext(item.file_sumber)[1]
+            path_dest = _nama_unik(up_dir, f"{PREFIX_BERKAS[item.kategori]}{stempel}_{i:05d}", ext)
+            shutil.copy(item.file_sumber, path_dest)
+            disalin.append(path_dest)
+        except Exception as e:
+            hasil[i] = HasilImpor(i, False, pesan=f"Gagal menyalin berkas: {e}")
+            continue
+
+        tanggal = _tanggal_iso(item.tanggal) if str(item.tanggal or "").strip() else hari_ini
+        tanggal_surat = _tanggal_iso(item.tanggal_surat) if str(item.tanggal_surat or "").strip() else None
+        baris = dict(kategori=item.kategori, tanggal=tanggal, asal_surat=item.asal_surat,
+                     nomor_surat=item.nomor_surat.strip(), tanggal_surat=tanggal_surat,
+                     judul_surat=item.judul_surat, keterangan=item.keterangan, file_path=path_dest)
+        siap.append((i, tuple(baris[k] for k in KOLOM_TULIS), path_dest))
+
+    ada_gagal = any(h is not None for h in hasil)
+    if ada_gagal and batal_jika_ada_gagal:
+        _hapus_berkas(disalin)
+        for i, _, _ in siap:
+            hasil[i] = HasilImpor(i, False, pesan="Dibatalkan karena ada item lain yang gagal")
+        return hasil
+
+    try:
+        ids = SuratRepository().insert_many(baris for _, baris, _ in siap)
+    except Exception as e:
+        # Transaksi sudah di-rollback oleh db_transaction, bersihkan berkas salinan
+        _hapus_berkas(disalin)
+        for i, _, _ in siap:
+            hasil[i] = HasilImpor(i, False, pesan=f"Gagal menyimpan ke database: {e}")
+        return hasil
+
+    for (i, _, path_dest), id_baru in zip(siap, ids):
+        hasil[i] = HasilImpor(i, True, id=id_baru, file_path=path_dest)
+    return hasil
+
+
+def _nama_unik(folder, nama, ext):
+    """Nomor urut + akhiran agar tidak menimpa berkas lain (satu batch bisa selesai dalam detik yang sama)."""
+    path = os.path.join(folder, f"{nama}{ext}")
+    ke = 1
+    while os.path.exists(path):
+        path = os.path.join(folder, f"{nama}_{ke}{ext}")
+        ke += 1
+    return path
+
+
+def _hapus_berkas(daftar):
+    for path in daftar:
+        try: os.remove(path)
+        except OSError as e: print(f"Gagal menghapus berkas salinan {path}: {e}")
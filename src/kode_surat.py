@@ -4,7 +4,9 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QHeaderView, QMessageBox, QFrame, QAbstractItemView, QDialog, 
                              QStyledItemDelegate, QStyleOptionViewItem)
 from PyQt6.QtCore import Qt
-from .db_manager import connect_db
+from .repository_remote import kode_surat_repository
+from .query_worker import QueryExecutor, PencarianTertunda
+from .db_manager import versi_data
 
 # --- DELEGATE KHUSUS ---
 class PaddedItemDelegate(QStyledItemDelegate):
@@ -27,6 +29,12 @@ class PaddedItemDelegate(QStyledItemDelegate):
 class ManajemenKodeSurat(QWidget):
     def __init__(self):
         super().__init__()
+        self.repo = kode_surat_repository()
+        self.executor = QueryExecutor(self)
+        self._versi_tampil = None   # versi_data() saat halaman terakhir dimuat
+        self._semua_rows = []       # Hasil load_data terakhir, disaring di memori saat mencari
+        self._saringan = ("", [])   # (kata kunci, baris hasil saringan) terakhir
+        self._dituju = None         # id kode dari pencarian global, disorot setelah data tiba
         self.selected_id = None 
         self.setup_ui()
         self.load_data()
@@ -99,7 +107,8 @@ class ManajemenKodeSurat(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("🔍 Cari Kode atau Keterangan...")
         self.search_input.setStyleSheet("padding: 8px; border: 1px solid #bdc3c7; border-radius: 20px; background: white; color: black;")
-        self.search_input.textChanged.connect(self.load_data)
+        # Pencarian hanya menyaring data yang sudah dimuat (tanpa query), setelah berhenti mengetik
+        self.pencarian = PencarianTertunda(self.search_input, self.saring_data)
         self.main_layout.addWidget(self.search_input)
 
         # --- TABEL DATA ---
@@ -170,50 +179,70 @@ class ManajemenKodeSurat(QWidget):
             return
 
         try:
-            db = connect_db()
-            cursor = db.cursor()
-            
             # --- [LOGIKA BARU: VALIDASI UNIK PADA KETERANGAN, BUKAN KODE] ---
-            if self.selected_id:
-                # Mode Update: Cek keterangan duplikat di ID lain
-                cursor.execute("SELECT id FROM kode_surat WHERE keterangan=? AND id!=?", (ket, self.selected_id))
-            else:
-                # Mode Insert: Cek keterangan duplikat di semua data
-                cursor.execute("SELECT id FROM kode_surat WHERE keterangan=?", (ket,))
-
-            if cursor.fetchone():
+            # Mode Update: abaikan ID yang sedang diedit
+            if self.repo.keterangan_dipakai(ket, kecuali_id=self.selected_id):
                 self.notifikasi_custom("Gagal", f"Keterangan '{ket}' sudah ada! Mohon gunakan deskripsi lain.", QMessageBox.Icon.Warning)
-                db.close()
                 return
             # ----------------------------------------------------------------
 
             # EKSEKUSI SIMPAN
             if self.selected_id: # UPDATE
-                cursor.execute("UPDATE kode_surat SET kode=?, keterangan=? WHERE id=?", (kode, ket, self.selected_id))
-                self.notifikasi_custom("Sukses", "Data berhasil diperbarui!", QMessageBox.Icon.Information)
+                self.repo.update(self.selected_id, kode, ket)
+                pesan = "Data berhasil diperbarui!"
             else: # INSERT
-                cursor.execute("INSERT INTO kode_surat (kode, keterangan) VALUES (?, ?)", (kode, ket))
-                self.notifikasi_custom("Sukses", "Kode baru berhasil disimpan!", QMessageBox.Icon.Information)
+                self.repo.insert(kode, ket)
+                pesan = "Kode baru berhasil disimpan!"
+            self.notifikasi_custom("Sukses", pesan, QMessageBox.Icon.Information)
             
-            db.commit()
-            db.close()
             self.reset_form()
             self.load_data()
             
         except Exception as e:
             self.notifikasi_custom("Error", str(e), QMessageBox.Icon.Critical)
 
+    def muat_jika_berubah(self):
+        """Dipanggil saat halaman dibuka dari sidebar: muat ulang hanya jika data sudah berubah."""
+        versi = versi_data()
+        if versi is None or versi != self._versi_tampil:
+            self.load_data()
+
     def load_data(self):
-        keyword = self.search_input.text().lower()
-        try:
-            db = connect_db()
-            cursor = db.cursor()
-            cursor.execute("SELECT id, kode, keterangan FROM kode_surat ORDER BY kode ASC")
-            rows = cursor.fetchall()
-            db.close()
+        # Data dibaca di background, penyaringan kata kunci dilakukan setelah hasil tiba
+        self._versi_tampil = versi_data()
+        self.executor.jalankan(self.repo.list_all, on_selesai=self.terima_data)
 
-            filtered_rows = [r for r in rows if keyword in r[1].lower() or keyword in r[2].lower()]
+    def terima_data(self, rows):
+        self._semua_rows = rows
+        self._saringan = ("", rows)
+        self.saring_data()
+        dituju, self._dituju = self._dituju, None
+        ids = [r.id for r in self._saringan[1]]
+        if dituju in ids:
+            i = ids.index(dituju)
+            self.table.selectRow(i)
+            self.table.scrollToItem(self.table.item(i, 0))
 
+    def tampilkan_rekaman(self, id_kode):
+        """Dipanggil pencarian global: tampilkan semua kode lalu sorot kode `id_kode`."""
+        self.search_input.blockSignals(True)
+        self.search_input.clear()
+        self.search_input.blockSignals(False)
+        self._dituju = id_kode
+        self.load_data()
+
+    def saring_data(self):
+        """Saring kata kunci; jika kata kunci hanya bertambah, cukup saring hasil saringan sebelumnya."""
+        keyword = self.search_input.text().lower()
+        keyword_lama, rows = self._saringan
+        if not keyword.startswith(keyword_lama):
+            rows = self._semua_rows
+        rows = [r for r in rows if keyword in r.kode.lower() or keyword in r.keterangan.lower()]
+        self._saringan = (keyword, rows)
+        self.tampilkan_data(rows)
+
+    def tampilkan_data(self, filtered_rows):
+        try:
             self.table.setRowCount(0)
             for i, row in enumerate(filtered_rows):
                 self.table.insertRow(i)
@@ -225,11 +254,11 @@ class ManajemenKodeSurat(QWidget):
                 self.table.setItem(i, 0, item_no)
                 
                 # KOLOM 1: KODE
-                lbl_kode = self.create_copyable_label(row[1])
+                lbl_kode = self.create_copyable_label(row.kode)
                 self.table.setCellWidget(i, 1, lbl_kode)
                 
                 # KOLOM 2: KETERANGAN
-                lbl_ket = self.create_copyable_label(row[2])
+                lbl_ket = self.create_copyable_label(row.keterangan)
                 self.table.setCellWidget(i, 2, lbl_ket)
                 
                 # KOLOM 3: AKSI
@@ -257,7 +286,7 @@ class ManajemenKodeSurat(QWidget):
                     QPushButton { background: #ff7675; border: none; border-radius: 4px; padding: 9px; color: white; font-weight: bold; }
                     QPushButton:hover { background: #d63031; }
                 """)
-                btn_hapus.clicked.connect(lambda _, id_k=row[0]: self.hapus_data(id_k))
+                btn_hapus.clicked.connect(lambda _, id_k=row.id: self.hapus_data(id_k))
                 
                 btn_layout.addWidget(btn_edit)
                 btn_layout.addWidget(btn_hapus)
@@ -271,9 +300,9 @@ class ManajemenKodeSurat(QWidget):
             print(f"Error load data: {e}")
 
     def isi_form_edit(self, row_data):
-        self.selected_id = row_data[0]
-        self.ent_kode.setText(row_data[1])
-        self.ent_ket.setText(row_data[2])
+        self.selected_id = row_data.id
+        self.ent_kode.setText(row_data.kode)
+        self.ent_ket.setText(row_data.keterangan)
         self.btn_simpan.setText("Update Data")
         self.btn_simpan.setStyleSheet("""
             QPushButton { background-color: #e67e22; color: white; font-weight: bold; padding: 6px 15px; border-radius: 4px; border: none; }
@@ -326,11 +355,7 @@ class ManajemenKodeSurat(QWidget):
         
         if dialog.exec():
             try:
-                db = connect_db()
-                cursor = db.cursor()
-                cursor.execute("DELETE FROM kode_surat WHERE id=?", (id_kode,))
-                db.commit()
-                db.close()
+                self.repo.delete(id_kode)
                 self.load_data()
                 self.reset_form()
                 self.notifikasi_custom("Berhasil", "Kode berhasil dihapus!", QMessageBox.Icon.Information)
@@ -0,0 +1,522 @@
+import sqlite3
+from datetime import datetime
+
+# =====================================================================
+# MIGRASI SKEMA DATABASE
+# ---------------------------------------------------------------------
+# Versi skema disimpan di PRAGMA user_version. Setiap migrasi punya
+# nomor urut dan hanya dijalankan SEKALI, di dalam satu transaksi,
+# sehingga database lama di komputer lain bisa di-upgrade otomatis.
+#
+# Aturan menambah migrasi baru:
+#   1. Tambahkan fungsi _vN_xxx(conn) di bawah.
+#   2. Daftarkan (N, "keterangan", _vN_xxx) di akhir MIGRATIONS.
+#   3. JANGAN mengubah migrasi yang sudah dirilis.
+# =====================================================================
+
+
+def kolom_ada(conn, tabel, kolom):
+    """Cek apakah kolom sudah ada di tabel (untuk migrasi kolom baru)."""
+    return any(row[1] == kolom for row in conn.execute(f"PRAGMA table_info({tabel})"))
+
+
+def tambah_kolom(conn, tabel, kolom, definisi):
+    """ALTER TABLE ADD COLUMN yang aman dijalankan ulang."""
+    if not kolom_ada(conn, tabel, kolom):
+        conn.execute(f"ALTER TABLE {tabel} ADD COLUMN {kolom} {definisi}")
+
+
+# --- DAFTAR MIGRASI ---
+
+def _v1_skema_awal(conn):
+    # Skema asli aplikasi (sebelumnya dibuat ulang oleh connect_db setiap kali dipanggil)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS surat (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nomor_surat TEXT,
+            judul_surat TEXT,
+            asal_surat TEXT,
+            kategori TEXT,
+            tanggal TEXT,        -- Tanggal Terima/Kirim
+            tanggal_surat TEXT,  -- Tanggal asli di Fisik Surat
+            keterangan TEXT,
+            file_path TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS kode_surat (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kode TEXT NOT NULL,
+            keterangan TEXT NOT NULL UNIQUE
+        )
+    """)
+
+
+def _v2_indeks_surat(conn):
+    # Daftar surat per halaman: WHERE kategori=? ORDER BY id DESC
+    # (juga menjadi covering index untuk COUNT(*) ... GROUP BY kategori di Dashboard)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_surat_kategori_id ON surat (kategori, id DESC)")
+    # Filter tahun / rentang tanggal per kategori
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_surat_kategori_tanggal ON surat (kategori, tanggal)")
+    # Referensi kode surat diurutkan berdasarkan kode (keterangan sudah punya indeks UNIQUE)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_kode_surat_kode ON kode_surat (kode)")
+
+
+def _v3_fts_surat(conn):
+    # Indeks full-text (FTS5) untuk kotak pencarian. Memakai external content
+    # (content='surat') sehingga teks tidak disimpan dua kali; trigger di bawah
+    # menjaga indeks tetap sinkron dengan tabel surat.
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS surat_fts USING fts5(
+            asal_surat, nomor_surat, judul_surat, keterangan,
+            content='surat', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS surat_fts_ai AFTER INSERT ON surat BEGIN
+            INSERT INTO surat_fts (rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+            VALUES (new.id, new.asal_surat, new.nomor_surat, new.judul_surat, new.keterangan);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS surat_fts_ad AFTER DELETE ON surat BEGIN
+            INSERT INTO surat_fts (surat_fts, rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+            VALUES ('delete', old.id, old.asal_surat, old.nomor_surat, old.judul_surat, old.keterangan);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS surat_fts_au
+        AFTER UPDATE OF asal_surat, nomor_surat, judul_surat, keterangan ON surat BEGIN
+            INSERT INTO surat_fts (surat_fts, rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+            VALUES ('delete', old.id, old.asal_surat, old.nomor_surat, old.judul_surat, old.keterangan);
+            INSERT INTO surat_fts (rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+            VALUES (new.id, new.asal_surat, new.nomor_surat, new.judul_surat, new.keterangan);
+        END
+    """)
+    # Isi indeks dari data yang sudah ada
+    conn.execute("INSERT INTO surat_fts (surat_fts) VALUES ('rebuild')")
+
+
+def _v4_kolom_tahun_bulan(conn):
+    # Tahun & bulan dari kolom tanggal (yyyy-MM-dd) sebagai generated column
+    # VIRTUAL: tidak memakan tempat dan selalu sinkron, tetapi bisa diindeks.
+    # Tanggal yang formatnya tidak valid menghasilkan NULL.
+    tambah_kolom(conn, "surat", "tahun", """INTEGER GENERATED ALWAYS AS (
+        CASE WHEN tanggal GLOB '[0-9][0-9][0-9][0-9]-*' THEN CAST(substr(tanggal, 1, 4) AS INTEGER) END
+    ) VIRTUAL""")
+    tambah_kolom(conn, "surat", "bulan", """INTEGER GENERATED ALWAYS AS (
+        CASE WHEN tanggal GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]*' THEN CAST(substr(tanggal, 6, 2) AS INTEGER) END
+    ) VIRTUAL""")
+    # Dropdown tahun (SELECT DISTINCT tahun) & filter tahun per kategori
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_surat_kategori_tahun ON surat (kategori, tahun)")
+
+
+# --- STATISTIK (dipakai migrasi v5 & rebuild) ---
+# Baris statistik_surat per kategori:
+#   (kategori, 0, 0)          -> total semua surat
+#   (kategori, tahun, 0)      -> total per tahun
+#   (kategori, tahun, bulan)  -> total per bulan
+
+def _sql_statistik(alias, delta, hanya_aktif=False):
+    """
+    Statement trigger untuk menambah (+1) / mengurangi (-1) counter baris `alias` (new/old).
+    hanya_aktif=True (v7): surat yang sudah ditandai terhapus tidak dihitung.
+    """
+    kat = f"ifnull({alias}.kategori, '')"
+    aktif = f"{alias}.dihapus_pada IS NULL AND " if hanya_aktif else ""
+    baris = [
+        (f"{kat}, 0, 0", f"{aktif}1"),
+        (f"{kat}, {alias}.tahun, 0", f"{aktif}{alias}.tahun IS NOT NULL"),
+        (f"{kat}, {alias}.tahun, {alias}.bulan", f"{aktif}{alias}.tahun IS NOT NULL AND {alias}.bulan IS NOT NULL"),
+    ]
+    # WHERE wajib ada agar ON CONFLICT tidak terbaca sebagai bagian dari SELECT
+    sql = [f"INSERT INTO statistik_surat (kategori, tahun, bulan, jumlah) SELECT {kunci}, {delta} WHERE {syarat}\n"
+           f"                ON CONFLICT (kategori, tahun, bulan) DO UPDATE SET jumlah = jumlah + excluded.jumlah;"
+           for kunci, syarat in baris]
+    if delta < 0:
+        sql.append(f"DELETE FROM statistik_surat WHERE kategori = {kat} AND jumlah <= 0;")
+    return "\n            ".join(sql)
+
+
+def rebuild_statistik(conn):
+    """Menghitung ulang statistik_surat dari tabel surat (jika counter tidak sinkron)."""
+    # Sejak v7 surat yang ditandai terhapus tidak dihitung (migrasi v5 belum punya kolomnya)
+    aktif = "dihapus_pada IS NULL" if kolom_ada(conn, "surat", "dihapus_pada") else "1"
+    conn.execute("DELETE FROM statistik_surat")
+    conn.execute(f"""
+        INSERT INTO statistik_surat (kategori, tahun, bulan, jumlah)
+        SELECT ifnull(kategori, ''), 0, 0, COUNT(*) FROM surat WHERE {aktif} GROUP BY 1
+        UNION ALL
+        SELECT ifnull(kategori, ''), tahun, 0, COUNT(*) FROM surat WHERE {aktif} AND tahun IS NOT NULL GROUP BY 1, 2
+        UNION ALL
+        SELECT ifnull(kategori, ''), tahun, bulan, COUNT(*) FROM surat
+        WHERE {aktif} AND tahun IS NOT NULL AND bulan IS NOT NULL GROUP BY 1, 2, 3
+    """)
+
+
+def _v5_statistik_surat(conn):
+    # Counter jumlah surat untuk Dashboard, dijaga oleh trigger sehingga
+    # statistik dibaca dari beberapa baris saja tanpa COUNT(*) seluruh tabel
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS statistik_surat (
+            kategori TEXT NOT NULL,
+            tahun INTEGER NOT NULL,     -- 0 = semua tahun
+            bulan INTEGER NOT NULL,     -- 0 = semua bulan
+            jumlah INTEGER NOT NULL,
+            PRIMARY KEY (kategori, tahun, bulan)
+        ) WITHOUT ROWID
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS statistik_surat_ai AFTER INSERT ON surat BEGIN
+            {_sql_statistik("new", 1)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS statistik_surat_ad AFTER DELETE ON surat BEGIN
+            {_sql_statistik("old", -1)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS statistik_surat_au AFTER UPDATE OF kategori, tanggal ON surat BEGIN
+            {_sql_statistik("old", -1)}
+            {_sql_statistik("new", 1)}
+        END
+    """)
+    rebuild_statistik(conn)
+
+
+def _v6_kolom_nomor_hari(conn):
+    # Tanggal sebagai nomor hari (integer, hari sejak 1970-01-01) untuk filter
+    # rentang tanggal & sorting: perbandingan integer lewat indeks, tanpa parse
+    # teks. Teks yyyy-MM-dd tetap sumber data (untuk tampilan & kompatibilitas),
+    # kolom ini generated VIRTUAL seperti v4 sehingga baris lama ikut terisi.
+    for kolom, sumber in [("tanggal_hari", "tanggal"), ("tanggal_surat_hari", "tanggal_surat")]:
+        tambah_kolom(conn, "surat", kolom, f"""INTEGER GENERATED ALWAYS AS (
+            CASE WHEN {sumber} GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+                 THEN CAST(julianday(substr({sumber}, 1, 10)) - 2440587.5 AS INTEGER) END
+        ) VIRTUAL""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_surat_kategori_tanggal_hari ON surat (kategori, tanggal_hari)")
+    _normalisasi_tanggal(conn, "tanggal")
+    _normalisasi_tanggal(conn, "tanggal_surat")
+
+
+# Format tanggal lama yang masih bisa dikenali (selain yyyy-MM-dd)
+FORMAT_TANGGAL_LAMA = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d")
+
+
+def _normalisasi_tanggal(conn, kolom):
+    """Tanggal dengan format lain (mis. 2024-3-5, 05/03/2024) diubah ke yyyy-MM-dd."""
+    rows = conn.execute(f"""
+        SELECT id, {kolom} FROM surat
+        WHERE {kolom} IS NOT NULL AND {kolom} != '' AND {kolom}_hari IS NULL
+    """).fetchall()
+    for id_surat, teks in rows:
+        for fmt in FORMAT_TANGGAL_LAMA:
+            try:
+                baru = datetime.strptime(teks.strip(), fmt).strftime("%Y-%m-%d")
+            except ValueError:
+                continue
+            conn.execute(f"UPDATE surat SET {kolom} = ? WHERE id = ?", (baru, id_surat))
+            break
+
+
+def _v7_hapus_lunak(conn):
+    # Hapus lunak: surat hanya ditandai waktu hapusnya (bisa diurungkan), lalu
+    # dihapus permanen beserta berkasnya oleh pembersihan berkala (trash_worker.py)
+    tambah_kolom(conn, "surat", "dihapus_pada", "TEXT")     # yyyy-MM-dd HH:mm:ss, NULL = aktif
+
+    # Indeks daftar surat diganti partial index yang hanya memuat surat aktif
+    for nama in ["idx_surat_kategori_id", "idx_surat_kategori_tanggal",
+                 "idx_surat_kategori_tahun", "idx_surat_kategori_tanggal_hari"]:
+        conn.execute(f"DROP INDEX IF EXISTS {nama}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_surat_aktif_kategori_id ON surat (kategori, id DESC) WHERE dihapus_pada IS NULL")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_surat_aktif_kategori_tahun ON surat (kategori, tahun) WHERE dihapus_pada IS NULL")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_surat_aktif_kategori_tanggal_hari ON surat (kategori, tanggal_hari) WHERE dihapus_pada IS NULL")
+    # Antrean pembersihan: hanya memuat surat yang ditandai terhapus
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_surat_terhapus ON surat (id, dihapus_pada) WHERE dihapus_pada IS NOT NULL")
+
+    # Counter statistik hanya menghitung surat aktif
+    for nama in ["statistik_surat_ai", "statistik_surat_ad", "statistik_surat_au"]:
+        conn.execute(f"DROP TRIGGER IF EXISTS {nama}")
+    conn.execute(f"""
+        CREATE TRIGGER statistik_surat_ai AFTER INSERT ON surat BEGIN
+            {_sql_statistik("new", 1, hanya_aktif=True)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER statistik_surat_ad AFTER DELETE ON surat BEGIN
+            {_sql_statistik("old", -1, hanya_aktif=True)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER statistik_surat_au AFTER UPDATE OF kategori, tanggal, dihapus_pada ON surat BEGIN
+            {_sql_statistik("old", -1, hanya_aktif=True)}
+            {_sql_statistik("new", 1, hanya_aktif=True)}
+        END
+    """)
+
+
+def _v8_audit_log(conn):
+    # Riwayat siapa menambah / mengubah / menghapus data. Hanya boleh ditambah:
+    # UPDATE & DELETE ditolak trigger. Ditulis per batch oleh audit_log.py.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS audit_log (
+            id INTEGER PRIMARY KEY,
+            waktu TEXT NOT NULL,        -- yyyy-MM-dd HH:mm:ss.ffffff
+            pengguna TEXT,
+            aksi TEXT NOT NULL,         -- tambah, ubah, hapus, pulihkan, hapus_permanen
+            tabel TEXT NOT NULL,        -- surat / kode_surat
+            id_rekaman INTEGER,
+            keterangan TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_log_rekaman ON audit_log (tabel, id_rekaman, waktu)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_log_waktu ON audit_log (waktu)")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS audit_log_tolak_ubah BEFORE UPDATE ON audit_log BEGIN
+            SELECT RAISE(ABORT, 'audit_log hanya boleh ditambah');
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS audit_log_tolak_hapus BEFORE DELETE ON audit_log BEGIN
+            SELECT RAISE(ABORT, 'audit_log hanya boleh ditambah');
+        END
+    """)
+
+
+def _v9_trigram_surat(conn):
+    # Indeks trigram untuk pencarian SUBSTRING (mis. "/III/2025" atau potongan
+    # nama pengirim) yang tidak bisa dilayani tokenizer kata surat_fts. Seperti
+    # v3: external content + trigger, jadi indeks dibangun sekali di sini lalu
+    # diperbarui per baris saat surat ditambah / diedit / dihapus.
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS surat_trigram USING fts5(
+                asal_surat, nomor_surat, judul_surat, keterangan,
+                content='surat', content_rowid='id',
+                tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        # Tokenizer trigram butuh SQLite 3.34+; tanpa indeks ini pencarian tetap memakai surat_fts
+        print(f"Indeks trigram dilewati: {e}")
+        return
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS surat_trigram_ai AFTER INSERT ON surat BEGIN
+            INSERT INTO surat_trigram (rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+            VALUES (new.id, new.asal_surat, new.nomor_surat, new.judul_surat, new.keterangan);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS surat_trigram_ad AFTER DELETE ON surat BEGIN
+            INSERT INTO surat_trigram (surat_trigram, rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+            VALUES ('delete', old.id, old.asal_surat, old.nomor_surat, old.judul_surat, old.keterangan);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS surat_trigram_au
+        AFTER UPDATE OF asal_surat, nomor_surat, judul_surat, keterangan ON surat BEGIN
+            INSERT INTO surat_trigram (surat_trigram, rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+            VALUES ('delete', old.id, old.asal_surat, old.nomor_surat, old.judul_surat, old.keterangan);
+            INSERT INTO surat_trigram (rowid, asal_surat, nomor_surat, judul_surat, keterangan)
+            VALUES (new.id, new.asal_surat, new.nomor_surat, new.judul_surat, new.keterangan);
+        END
+    """)
+    conn.execute("INSERT INTO surat_trigram (surat_trigram) VALUES ('rebuild')")
+
+
+# Kolom yang nilai uniknya dikumpulkan di kosakata_surat (pencarian mirip)
+KOLOM_KOSAKATA = ("asal_surat", "judul_surat")
+
+
+def _sql_kosakata(alias, delta):
+    """
+    Statement trigger untuk menambah (+1) / mengurangi (-1) jumlah surat per nilai
+    asal_surat & judul_surat baris `alias` (new/old). Hanya surat aktif yang dihitung,
+    nilai yang jumlahnya habis dihapus dari kosakata.
+    """
+    kat = f"ifnull({alias}.kategori, '')"
+    sql = []
+    for kolom in KOLOM_KOSAKATA:
+        nilai = f"lower(trim({alias}.{kolom}))"
+        sql.append(f"INSERT INTO kosakata_surat (kategori, kolom, nilai, jumlah) SELECT {kat}, '{kolom}', {nilai}, {delta}\n"
+                   f"                WHERE {alias}.dihapus_pada IS NULL AND {nilai} != ''\n"
+                   f"                ON CONFLICT (kategori, kolom, nilai) DO UPDATE SET jumlah = jumlah + excluded.jumlah;")
+        if delta < 0:
+            sql.append(f"DELETE FROM kosakata_surat WHERE kategori = {kat} AND kolom = '{kolom}' AND nilai = {nilai} AND jumlah <= 0;")
+    return "\n            ".join(sql)
+
+
+def _v10_kosakata_surat(conn):
+    # Pencarian mirip (toleran salah ketik) pengirim & perihal, lihat pencarian.py.
+    # kosakata_surat menyimpan nilai UNIK (huruf kecil, tanpa spasi di tepi) per
+    # kategori beserta jumlah suratnya, dijaga trigger seperti statistik_surat;
+    # jumlah barisnya jauh lebih kecil dari tabel surat. Kandidat nilai yang mirip
+    # dicari lewat indeks trigram kosakata_trigram.
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS kosakata_trigram USING fts5(
+                nilai, kategori UNINDEXED, kolom UNINDEXED,
+                content='kosakata_surat', content_rowid='id',
+                tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        # Sama seperti v9: tanpa tokenizer trigram (SQLite < 3.34) pencarian mirip tidak tersedia
+        print(f"Indeks pencarian mirip dilewati: {e}")
+        return
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS kosakata_surat (
+            id INTEGER PRIMARY KEY,
+            kategori TEXT NOT NULL,
+            kolom TEXT NOT NULL,        -- asal_surat / judul_surat
+            nilai TEXT NOT NULL,        -- lower(trim(...))
+            jumlah INTEGER NOT NULL,
+            UNIQUE (kategori, kolom, nilai)
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS kosakata_trigram_ai AFTER INSERT ON kosakata_surat BEGIN
+            INSERT INTO kosakata_trigram (rowid, nilai, kategori, kolom) VALUES (new.id, new.nilai, new.kategori, new.kolom);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS kosakata_trigram_ad AFTER DELETE ON kosakata_surat BEGIN
+            INSERT INTO kosakata_trigram (kosakata_trigram, rowid, nilai, kategori, kolom)
+            VALUES ('delete', old.id, old.nilai, old.kategori, old.kolom);
+        END
+    """)
+    # Hanya kolom jumlah yang pernah di-UPDATE (upsert), isi indeks trigram tidak berubah
+    # Jumlah nilai per trigram: trigram paling jarang dipilih lebih dulu saat mencari kandidat
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS kosakata_trigram_vocab USING fts5vocab(kosakata_trigram, 'row')")
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS kosakata_surat_ai AFTER INSERT ON surat BEGIN
+            {_sql_kosakata("new", 1)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS kosakata_surat_ad AFTER DELETE ON surat BEGIN
+            {_sql_kosakata("old", -1)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS kosakata_surat_au
+        AFTER UPDATE OF kategori, asal_surat, judul_surat, dihapus_pada ON surat BEGIN
+            {_sql_kosakata("old", -1)}
+            {_sql_kosakata("new", 1)}
+        END
+    """)
+
+    for kolom in KOLOM_KOSAKATA:
+        conn.execute(f"""
+            INSERT INTO kosakata_surat (kategori, kolom, nilai, jumlah)
+            SELECT ifnull(kategori, ''), '{kolom}', lower(trim({kolom})), COUNT(*) FROM surat
+            WHERE dihapus_pada IS NULL AND lower(trim({kolom})) != '' GROUP BY 1, 3
+        """)
+        # Surat dengan nilai terpilih diambil lewat indeks ekspresi (sama persis dengan ekspresi di trigger)
+        conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_surat_aktif_{kolom}_normal
+            ON surat (kategori, lower(trim({kolom}))) WHERE dihapus_pada IS NULL
+        """)
+
+
+def _v11_indeks_tanggal_surat(conn):
+    # Filter rentang tanggal surat (FilterSurat.tanggal_surat_dari / _sampai, sintaks tglsurat:)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_surat_aktif_kategori_tanggal_surat_hari
+        ON surat (kategori, tanggal_surat_hari) WHERE dihapus_pada IS NULL
+    """)
+
+
+def _v12_fts_kode_surat(conn):
+    # Indeks full-text kode surat untuk pencarian global (pencarian_global.py),
+    # external content seperti surat_fts (v3)
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS kode_surat_fts USING fts5(
+            kode, keterangan,
+            content='kode_surat', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS kode_surat_fts_ai AFTER INSERT ON kode_surat BEGIN
+            INSERT INTO kode_surat_fts (rowid, kode, keterangan) VALUES (new.id, new.kode, new.keterangan);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS kode_surat_fts_ad AFTER DELETE ON kode_surat BEGIN
+            INSERT INTO kode_surat_fts (kode_surat_fts, rowid, kode, keterangan)
+            VALUES ('delete', old.id, old.kode, old.keterangan);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS kode_surat_fts_au AFTER UPDATE OF kode, keterangan ON kode_surat BEGIN
+            INSERT INTO kode_surat_fts (kode_surat_fts, rowid, kode, keterangan)
+            VALUES ('delete', old.id, old.kode, old.keterangan);
+            INSERT INTO kode_surat_fts (rowid, kode, keterangan) VALUES (new.id, new.kode, new.keterangan);
+        END
+    """)
+    conn.execute("INSERT INTO kode_surat_fts (kode_surat_fts) VALUES ('rebuild')")
+
+
+MIGRATIONS = [
+    (1, "Skema awal tabel surat & kode_surat", _v1_skema_awal),
+    (2, "Indeks komposit tabel surat & kode_surat", _v2_indeks_surat),
+    (3, "Indeks full-text (FTS5) tabel surat", _v3_fts_surat),
+    (4, "Kolom tahun & bulan (generated) tabel surat", _v4_kolom_tahun_bulan),
+    (5, "Tabel statistik_surat + trigger", _v5_statistik_surat),
+    (6, "Kolom nomor hari (generated) tabel surat", _v6_kolom_nomor_hari),
+    (7, "Hapus lunak (dihapus_pada) + partial index surat aktif", _v7_hapus_lunak),
+    (8, "Tabel audit_log (append-only)", _v8_audit_log),
+    (9, "Indeks trigram (FTS5) tabel surat", _v9_trigram_surat),
+    (10, "Kosakata pengirim & perihal untuk pencarian mirip", _v10_kosakata_surat),
+    (11, "Indeks rentang tanggal surat", _v11_indeks_tanggal_surat),
+    (12, "Indeks full-text (FTS5) tabel kode_surat", _v12_fts_kode_surat),
+]
+
+VERSI_TERBARU = MIGRATIONS[-1][0]
+
+
+def get_versi(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def jalankan_migrasi(conn):
+    """
+    Menjalankan semua migrasi yang belum diterapkan, berurutan.
+    Mengembalikan daftar versi yang baru saja diterapkan.
+    """
+    versi_sekarang = get_versi(conn)
+    if versi_sekarang > VERSI_TERBARU:
+        raise sqlite3.DatabaseError(
+            f"Versi database ({versi_sekarang}) lebih baru dari aplikasi ({VERSI_TERBARU}). "
+            "Mohon perbarui aplikasi LENTERA."
+        )
+
+    diterapkan = []
+    isolation_lama = conn.isolation_level
+    conn.isolation_level = None  # Transaksi dikendalikan manual
+    try:
+        for versi, keterangan, fungsi in MIGRATIONS:
+            if versi <= versi_sekarang:
+                continue
+            conn.execute("BEGIN IMMEDIATE")
+            # Cek ulang di dalam transaksi: komputer lain mungkin sudah menjalankannya
+            if get_versi(conn) >= versi:
+                conn.execute("COMMIT")
+                continue
+            try:
+                fungsi(conn)
+                conn.execute(f"PRAGMA user_version = {int(versi)}")
+                conn.execute("COMMIT")
+            except Exception as e:
+                conn.execute("ROLLBACK")
+                raise sqlite3.DatabaseError(f"Migrasi v{versi} ({keterangan}) gagal: {e}") from e
+            diterapkan.append(versi)
+    finally:
+        conn.isolation_level = isolation_lama
+    return diterapkan
@@ -0,0 +1,559 @@
+import calendar
+import re
+import threading
+import unicodedata
+from datetime import date
+from typing import NamedTuple, Optional
+from .db_manager import db_session, get_db_path
+
+# Bobot bm25 per kolom surat_fts: asal_surat, nomor_surat, judul_surat, keterangan
+BOBOT_BM25 = (2.0, 3.0, 3.0, 1.0)
+# Bobot bm25 per kolom kode_surat_fts: kode, keterangan
+BOBOT_BM25_KODE = (2.0, 1.0)
+
+# Pencarian global: jumlah hasil teratas yang ditampilkan per sumber
+BATAS_HASIL_GLOBAL = 10
+
+_POLA_KATA = re.compile(r"\w+", re.UNICODE)
+# Token versi tokenizer unicode61: huruf & angka saja ('_' termasuk pemisah)
+_POLA_TOKEN = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Hasil pencarian disimpan sebagai kandidat untuk mempersempit pencarian
+# berikutnya hanya jika jumlahnya tidak lebih dari ini
+BATAS_KANDIDAT = 2000
+
+# Potongan kata kunci sependek ini tidak bisa dicari lewat indeks trigram
+PANJANG_MIN_TRIGRAM = 3
+
+# Pencarian mirip: kandidat dari indeks trigram yang diperiksa jarak editnya,
+# dan anggaran jarak edit maksimal (lihat anggaran_jarak)
+BATAS_KANDIDAT_MIRIP = 200
+JARAK_MAKS = 3
+# Trigram kata kunci yang dipakai mencari kandidat: yang paling jarang dulu,
+# minimal MIN_TRIGRAM_MIRIP, lalu ditambah selama total nilai yang memuatnya
+# tidak melewati BATAS_POSTING_MIRIP (trigram umum seperti "an " mahal & tidak membedakan)
+MIN_TRIGRAM_MIRIP = 4
+BATAS_POSTING_MIRIP = 20000
+# Nilai mirip yang dipakai untuk memfilter daftar surat
+BATAS_NILAI_MIRIP = 50
+
+_tabel_ada = {}     # (path database, nama tabel) -> tabel ada?
+_tabel_lock = threading.Lock()
+
+
+def buat_query_fts(keyword):
+    """
+    Mengubah teks dari kotak pencarian menjadi query FTS5.
+    Setiap kata dicari sebagai awalan (prefix) dan semua kata harus ada:
+        "rapat dinas"     -> "rapat"* AND "dinas"*
+        "005/III"         -> "005 iii"*   (frasa, cocok untuk nomor surat)
+    Mengembalikan None jika tidak ada kata yang bisa dicari.
+    """
+    bagian = []
+    for potongan in keyword.split():
+        kata = _POLA_KATA.findall(potongan.lower())
+        if not kata: continue
+        # Tanda kutip membuat FTS5 memperlakukan potongan sebagai frasa,
+        # sehingga karakter seperti '/', '.', '-' tidak merusak sintaks query
+        bagian.append('"' + " ".join(kata) + '"*')
+    return " AND ".join(bagian) if bagian else None
+
+
+def buat_query_trigram(keyword):
+    """
+    Query untuk indeks trigram surat_trigram (migrasi v9): setiap potongan
+    dicari sebagai SUBSTRING di posisi mana pun, tanpa memandang huruf besar/kecil:
+        "/III/2025"       -> "/III/2025"   (cocok dengan 005/III/2025)
+        "mad fau"         -> "mad" AND "fau"   (cocok dengan Ahmad Fauzi)
+    Mengembalikan None jika ada potongan yang lebih pendek dari PANJANG_MIN_TRIGRAM.
+    """
+    potongan = keyword.split()
+    if not potongan or any(len(p) < PANJANG_MIN_TRIGRAM for p in potongan):
+        return None
+    return " AND ".join('"' + p.replace('"', '""') + '"' for p in potongan)
+
+
+def _ada_tabel(nama):
+    kunci = (get_db_path(), nama)
+    with _tabel_lock:
+        if kunci not in _tabel_ada:
+            with db_session() as db:
+                _tabel_ada[kunci] = db.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (nama,)).fetchone() is not None
+        return _tabel_ada[kunci]
+
+
+def trigram_tersedia():
+    """
+    True jika database punya indeks surat_trigram. Tidak dibuat oleh migrasi v9
+    jika SQLite terlalu lama (tokenizer trigram butuh SQLite 3.34+).
+    """
+    return _ada_tabel("surat_trigram")
+
+
+def mirip_tersedia():
+    """True jika database punya indeks kosakata_trigram (migrasi v10, juga butuh SQLite 3.34+)."""
+    return _ada_tabel("kosakata_trigram")
+
+
+# =====================================================================
+# MEMPERSEMPIT PENCARIAN DI MEMORI
+# ---------------------------------------------------------------------
+# Saat pengguna mengetik "rap" lalu "rapat", hasil "rapat" pasti bagian
+# dari hasil "rap" (setiap kata adalah awalan / substring, dan semua kata
+# harus ada). Hasil pencarian sebelumnya (id + teks kolom yang dicari)
+# disimpan sebagai KandidatPencarian, lalu kata kunci lanjutannya cukup
+# disaring di memori dengan aturan yang sama seperti SuratRepository._where
+# (FTS5 ATAU trigram), tanpa query ke database.
+# =====================================================================
+
+def token_fts(teks):
+    """Memecah teks seperti tokenizer surat_fts (unicode61 remove_diacritics 2)."""
+    teks = unicodedata.normalize("NFD", (teks or "").lower())
+    teks = "".join(c for c in teks if not unicodedata.combining(c))
+    return _POLA_TOKEN.findall(teks)
+
+
+def _syarat(keyword, substring):
+    """
+    (frasa, potongan) sesuai query di SuratRepository._where:
+    frasa = list token per frasa buat_query_fts (None jika query FTS tidak ada),
+    potongan = substring buat_query_trigram, huruf kecil (None jika tidak dipakai).
+    """
+    frasa = []
+    for potongan in keyword.split():
+        kata = _POLA_KATA.findall(potongan.lower())
+        if kata: frasa.append(token_fts(" ".join(kata)))
+    potongan = None
+    if substring and buat_query_trigram(keyword):
+        potongan = [p.lower() for p in keyword.split()]
+    return frasa or None, potongan
+
+
+def _cocok_frasa(frasa, token_kolom):
+    """Frasa "a b"*: token berurutan dalam satu kolom, token terakhir cukup awalannya."""
+    n = len(frasa)
+    if not n: return False      # Frasa tanpa token (mis. "_") tidak cocok dengan apa pun di FTS5
+    for i in range(len(token_kolom) - n + 1):
+        if token_kolom[i:i + n - 1] == frasa[:-1] and token_kolom[i + n - 1].startswith(frasa[-1]):
+            return True
+    return False
+
+
+def _cocok(token, teks, frasa, potongan):
+    if frasa and all(any(_cocok_frasa(f, tk) for tk in token) for f in frasa):
+        return True
+    return bool(potongan) and all(any(p in t for t in teks) for p in potongan)
+
+
+class KandidatPencarian:
+    """
+    Hasil pencarian terakhir: list (id, token per kolom FTS, teks per kolom
+    huruf kecil), urut id terbaru dulu. substring: pencarian memakai trigram.
+    """
+
+    def __init__(self, filter_surat, baris, substring):
+        self.filter = filter_surat
+        self.baris = baris
+        self.substring = substring
+
+    @classmethod
+    def dari_rows(cls, filter_surat, rows, substring):
+        """rows: (id, asal_surat, nomor_surat, judul_surat, keterangan) dari list_kandidat()."""
+        baris = []
+        for row in rows:
+            kolom = [k or "" for k in row[1:]]
+            baris.append((row[0], tuple(token_fts(k) for k in kolom), tuple(k.lower() for k in kolom)))
+        return cls(filter_surat, baris, substring)
+
+    @property
+    def ids(self):
+        return [b[0] for b in self.baris]
+
+    def bisa_mempersempit(self, filter_baru):
+        """
+        True jika filter_baru hanya memperpanjang kata kunci (filter lain sama)
+        DAN setiap jenis pencarian yang dipakai kata kunci baru (FTS / substring)
+        juga dipakai kata kunci lama; hanya dengan begitu hasil baru pasti bagian
+        dari hasil lama.
+        """
+        lama = self.filter
+        if filter_baru._replace(keyword="") != lama._replace(keyword=""): return False
+        # Syarat kolom / pengecualian / frasa tidak disaring di memori
+        if not urai_query(filter_baru.keyword).sederhana: return False
+        if not filter_baru.keyword.lower().startswith(lama.keyword.lower()): return False
+        frasa_lama, potongan_lama = _syarat(lama.keyword, self.substring)
+        frasa_baru, potongan_baru = _syarat(filter_baru.keyword, self.substring)
+        # Frasa tanpa token (mis. "_") tidak cocok dengan apa pun, tetapi lanjutannya ("_a") bisa
+        if frasa_lama and not all(frasa_lama): return False
+        return (frasa_baru is None or frasa_lama is not None) and (potongan_baru is None or potongan_lama is not None)
+
+    def persempit(self, filter_baru):
+        frasa, potongan = _syarat(filter_baru.keyword, self.substring)
+        baris = [b for b in self.baris if _cocok(b[1], b[2], frasa, potongan)]
+        return KandidatPencarian(filter_baru, baris, self.substring)
+
+
+def muat_awal(repo, filter_surat, limit, kandidat=None):
+    """
+    Dijalankan di background: (jumlah, baris halaman pertama, kandidat baru,
+    nilai mirip). Kata kunci lanjutan dari `kandidat` disaring di memori; selain
+    itu jumlah & halaman pertama dibaca dari database, dan jika hasilnya tidak
+    terlalu banyak disimpan sebagai kandidat untuk ketikan berikutnya.
+    Nilai mirip: list NilaiMirip jika filter_surat.mirip (dan tersedia), selain itu None.
+    """
+    if filter_surat.mirip and repo.pakai_mirip():
+        # Hasil pencarian mirip bukan bagian dari hasil kata kunci sebelumnya: tidak dipersempit.
+        # cari_mirip() lebih dulu agar count() & list_page() memakai hasil yang sudah disimpan.
+        mirip = repo.cari_mirip(filter_surat.kategori, filter_surat.keyword) if filter_surat.keyword else []
+        return repo.count(filter_surat), repo.list_page(filter_surat, None, limit), None, mirip
+
+    if kandidat is not None and kandidat.bisa_mempersempit(filter_surat):
+        kandidat = kandidat.persempit(filter_surat)
+        rows = sorted(repo.get_many(kandidat.ids[:limit]), key=lambda r: r.id, reverse=True)
+        return len(kandidat.baris), rows, kandidat, None
+
+    jumlah = repo.count(filter_surat)
+    rows = repo.list_page(filter_surat, None, limit)
+    kandidat = None
+    substring = repo.pakai_trigram()
+    if (any(_syarat(filter_surat.keyword or "", substring)) and jumlah <= BATAS_KANDIDAT
+            and urai_query(filter_surat.keyword).sederhana):
+        kandidat = KandidatPencarian.dari_rows(filter_surat, repo.list_kandidat(filter_surat), substring)
+    return jumlah, rows, kandidat, None
+
+
+
+# =====================================================================
+# PENCARIAN MIRIP (TOLERAN SALAH KETIK)
+# ---------------------------------------------------------------------
+# Khusus pengirim (asal_surat) & perihal (judul_surat). Nilai unik kedua
+# kolom itu (huruf kecil) ada di tabel kosakata_surat (migrasi v10):
+#   1. kandidat = nilai yang punya trigram yang sama dengan kata kunci,
+#      diambil lewat indeks kosakata_trigram, urut bm25 (makin banyak
+#      trigram langka yang sama makin atas), maksimal BATAS_KANDIDAT_MIRIP;
+#   2. setiap kandidat diberi jarak edit ke bagian teksnya yang paling
+#      mirip (jarak_substring). Diterima jika jaraknya masih dalam
+#      anggaran_jarak(), atau jika kata kunci berupa singkatan nilai itu
+#      ("disdik" -> dinas pendidikan);
+#   3. urutan: jarak terkecil, lalu jumlah surat terbanyak.
+# Surat yang pengirim / perihalnya termasuk nilai terpilih lalu diambil
+# lewat indeks ekspresi lower(trim(...)) (SuratRepository._where).
+# =====================================================================
+
+class NilaiMirip(NamedTuple):
+    kolom: str          # asal_surat / judul_surat
+    nilai: str          # lower(trim(...)), sama dengan kosakata_surat.nilai
+    jumlah: int         # jumlah surat aktif dengan nilai ini
+    jarak: int          # jarak edit; singkatan = anggaran + 1
+
+
+def normalisasi_mirip(teks):
+    """Huruf kecil, spasi berlebih dibuang."""
+    return " ".join((teks or "").lower().split())
+
+
+def anggaran_jarak(kata):
+    """Jarak edit yang masih ditoleransi: 1 salah ketik per 4 huruf, maksimal JARAK_MAKS."""
+    return min(JARAK_MAKS, len(kata) // 4)
+
+
+def trigram_mirip(keyword):
+    """Trigram unik kata kunci (sudah dinormalisasi), urut kemunculan."""
+    kata = normalisasi_mirip(keyword)
+    return list(dict.fromkeys(kata[i:i + 3] for i in range(len(kata) - 2)))
+
+
+def buat_query_mirip(keyword, frekuensi=None):
+    """
+    Query kosakata_trigram: trigram kata kunci digabung OR, sehingga nilai yang
+    berbagi sebagian trigram saja (ada salah ketik) tetap terambil:
+        "pendidkan" -> "did" OR "kan" OR "end" OR "ndi" OR ...
+    frekuensi: {trigram: jumlah nilai yang memuatnya}. Jika diisi, trigram yang
+    tidak ada di kosakata (biasanya bagian yang salah ketik) dibuang dan hanya
+    trigram paling jarang yang dipakai (MIN_TRIGRAM_MIRIP, BATAS_POSTING_MIRIP).
+    Mengembalikan None jika tidak ada trigram yang bisa dicari.
+    """
+    trigram = trigram_mirip(keyword)
+    if frekuensi is not None:
+        ada = sorted((t for t in trigram if frekuensi.get(t)), key=lambda t: frekuensi[t])
+        trigram, total = [], 0
+        for t in ada:
+            total += frekuensi[t]
+            if len(trigram) >= MIN_TRIGRAM_MIRIP and total > BATAS_POSTING_MIRIP: break
+            trigram.append(t)
+    if not trigram:
+        return None
+    return " OR ".join('"' + t.replace('"', '""') + '"' for t in trigram)
+
+
+def jarak_substring(pola, teks):
+    """
+    Jarak edit (Levenshtein) terkecil antara `pola` dan potongan mana pun dari
+    `teks`: "pendidkan" vs "dinas pendidikan kota" -> 1. Algoritma bit-paralel
+    Myers: satu kolom tabel jarak edit dihitung sekaligus sebagai bit integer,
+    jadi cukup beberapa operasi per huruf `teks` (bukan per pasangan huruf).
+    """
+    m = len(pola)
+    if not m:
+        return 0
+    posisi = {}         # huruf -> bit posisinya di pola
+    for i, huruf in enumerate(pola):
+        posisi[huruf] = posisi.get(huruf, 0) | (1 << i)
+    penuh, atas = (1 << m) - 1, 1 << (m - 1)
+    naik, turun = penuh, 0      # Selisih vertikal +1 / -1 per baris
+    skor = terbaik = m
+    for huruf in teks:
+        sama = posisi.get(huruf, 0)
+        xv = sama | turun
+        xh = (((sama & naik) + naik) ^ naik) | sama
+        h_naik = turun | ~(xh | naik)
+        h_turun = naik & xh
+        if h_naik & atas: skor += 1
+        elif h_turun & atas: skor -= 1
+        # Tanpa carry dari baris 0: potongan boleh mulai di posisi mana pun
+        h_naik = (h_naik << 1) & penuh
+        h_turun = (h_turun << 1) & penuh
+        naik = (h_turun | ~(xv | h_naik)) & penuh
+        turun = h_naik & xv
+        if skor < terbaik: terbaik = skor
+    return terbaik
+
+
+def cocok_singkatan(kata, teks):
+    """
+    Singkatan gaya instansi: huruf `kata` muncul berurutan di `teks`, mulai dari
+    huruf pertamanya, dan tersebar di dua atau tiga kata pertama:
+        "disdik" -> dinas pendidikan, "kemenag" -> kementerian agama
+    """
+    if len(kata) < 4 or " " in kata or not teks.startswith(kata[0]):
+        return False
+    posisi = 0
+    for huruf in kata:
+        posisi = teks.find(huruf, posisi)
+        if posisi < 0:
+            return False
+        posisi += 1
+    return 1 <= teks[:posisi].count(" ") <= 2
+
+
+def urutkan_mirip(keyword, kandidat, limit=BATAS_NILAI_MIRIP):
+    """
+    kandidat: (kolom, nilai, jumlah) dari kosakata_surat. Mengembalikan list
+    NilaiMirip yang lolos anggaran jarak / singkatan, paling mirip dulu.
+    """
+    kata = normalisasi_mirip(keyword)
+    anggaran = anggaran_jarak(kata)
+    hasil = []
+    for kolom, nilai, jumlah in kandidat:
+        jarak = jarak_substring(kata, nilai)
+        if jarak > anggaran:
+            if not cocok_singkatan(kata, nilai): continue
+            jarak = anggaran + 1
+        hasil.append(NilaiMirip(kolom, nilai, jumlah, jarak))
+    hasil.sort(key=lambda h: (h.jarak, -h.jumlah, h.nilai))
+    return hasil[:limit]
+
+
+# =====================================================================
+# SINTAKS PENCARIAN
+# ---------------------------------------------------------------------
+# Selain kata bebas, kotak pencarian menerima syarat per kolom:
+#   dari:bupati nomor:005 tgl:2025-01..2025-03 kat:masuk ket:"rapat koordinasi"
+#     kolom:nilai       nilai dicari di kolom itu saja (awalan kata ATAU substring)
+#     kolom:a,b         salah satu nilai
+#     "dua kata"        frasa, spasinya ikut dicari
+#     -kata, -kolom:x   pengecualian
+#     tgl:2025-01..2025-03, tgl:2025, tgl:..2024-12-31, tgl:15/03/2025
+# Semua syarat harus terpenuhi. Teks diurai menjadi QueryPencarian (AST),
+# lalu kompilasi_query() mengubahnya menjadi potongan WHERE ber-parameter
+# yang dilayani indeks: surat_fts / surat_trigram dengan filter kolom,
+# tanggal_hari, tahun, kategori; nilai yang hanya berisi tanda baca dan
+# terlalu pendek untuk trigram (mis. "nomor:/") dicari dengan LIKE.
+# Nama kolom yang tidak dikenal (mis. "10:30") tetap dianggap kata bebas. Teks tanpa syarat sama sekali tetap dicari
+# seperti biasa (buat_query_fts / buat_query_trigram) dan bisa dipersempit.
+# =====================================================================
+
+NAMA_KOLOM = {
+    "dari": "asal_surat", "asal": "asal_surat", "pengirim": "asal_surat",
+    "kepada": "asal_surat", "tujuan": "asal_surat",
+    "nomor": "nomor_surat", "no": "nomor_surat",
+    "perihal": "judul_surat", "judul": "judul_surat", "nama": "judul_surat",
+    "ket": "keterangan", "keterangan": "keterangan",
+    "tgl": "tanggal_hari", "tanggal": "tanggal_hari", "tglsurat": "tanggal_surat_hari",
+    "kat": "kategori", "kategori": "kategori",
+    "tahun": "tahun",
+}
+KOLOM_TANGGAL = ("tanggal_hari", "tanggal_surat_hari")
+# Kolom yang dicari kata bebas (sama dengan kolom surat_fts / surat_trigram)
+KOLOM_TEKS = ("asal_surat", "nomor_surat", "judul_surat", "keterangan")
+
+# Tooltip kotak pencarian di halaman surat masuk / keluar / dokumen
+BANTUAN_SINTAKS = ("Kata bebas dicari di semua kolom. Syarat per kolom:\n"
+                   "  dari:bupati   nomor:005   perihal:undangan   ket:\"rapat dinas\"\n"
+                   "  tgl:2025-01..2025-03   tgl:2025   tahun:2024,2025   kat:masuk\n"
+                   "  \"frasa persis\"   -kata (kecuali)   nomor:005,006 (salah satu)")
+
+# [-][kolom:](nilai | "nilai dengan spasi")
+_POLA_SYARAT = re.compile(r'(-?)(?:([A-Za-z]+):)?("[^"]*"?|\S*)')
+_HARI_EPOCH = date(1970, 1, 1).toordinal()
+
+
+class SyaratQuery(NamedTuple):
+    kolom: Optional[str]    # Kolom tabel surat; None = kata bebas (semua kolom teks)
+    nilai: tuple            # Alternatif (salah satu cocok): teks, atau (dari, sampai) nomor hari untuk tanggal
+    negasi: bool = False
+    frasa: bool = False     # Ditulis dalam tanda kutip
+
+
+class QueryPencarian(NamedTuple):
+    syarat: tuple
+    peringatan: tuple       # Bagian yang diabaikan, untuk ditampilkan ke pengguna
+
+    @property
+    def sederhana(self):
+        """Hanya kata bebas (tanpa kolom, pengecualian, atau frasa): dicari dengan cara biasa."""
+        return not self.peringatan and all(s.kolom is None and not s.negasi and not s.frasa for s in self.syarat)
+
+
+def _periode(teks):
+    """'2025', '2025-03', '2025-03-15', '03/2025', '15/03/2025' -> (tanggal pertama, tanggal terakhir)."""
+    angka = [int(b) for b in re.split(r"[-/]", teks)]
+    if "/" in teks:
+        angka.reverse()     # dd/mm/yyyy -> yyyy, mm, dd
+    if len(angka) == 1:
+        return date(angka[0], 1, 1), date(angka[0], 12, 31)
+    if len(angka) == 2:
+        tahun, bulan = angka
+        return date(tahun, bulan, 1), date(tahun, bulan, calendar.monthrange(tahun, bulan)[1])
+    if len(angka) == 3:
+        hari = date(*angka)
+        return hari, hari
+    raise ValueError(teks)
+
+
+def _rentang_hari(teks):
+    """'a..b' / 'a..' / '..b' / 'a' -> (nomor hari dari, nomor hari sampai); None = tanpa batas."""
+    awal, pemisah, akhir = teks.partition("..")
+    if not pemisah:
+        akhir = awal
+    if not awal and not akhir:
+        raise ValueError(teks)
+    periode_awal = _periode(awal) if awal else None
+    periode_akhir = _periode(akhir) if akhir else None
+    if periode_awal and periode_akhir and periode_awal[0] > periode_akhir[0]:
+        periode_awal, periode_akhir = periode_akhir, periode_awal     # Ditulis terbalik
+    return (periode_awal[0].toordinal() - _HARI_EPOCH if periode_awal else None,
+            periode_akhir[1].toordinal() - _HARI_EPOCH if periode_akhir else None)
+
+
+def urai_query(teks):
+    """Mengurai teks kotak pencarian menjadi QueryPencarian (lihat SINTAKS PENCARIAN)."""
+    syarat, peringatan = [], []
+    for cocok in _POLA_SYARAT.finditer(teks or ""):
+        if not cocok.group(0): continue
+        negasi, nama, nilai = cocok.group(1) == "-", (cocok.group(2) or "").lower(), cocok.group(3)
+        frasa = nilai.startswith('"')
+        if frasa:
+            nilai = nilai.strip('"')
+        kolom = NAMA_KOLOM.get(nama)
+        if nama and kolom is None:
+            # Bukan nama kolom (mis. jam 10:30): seluruh potongan adalah kata bebas
+            nilai, frasa = f"{cocok.group(2)}:{cocok.group(3)}", False
+        if not nilai.strip():
+            if kolom: peringatan.append(f"{nama}: tanpa nilai diabaikan")
+            continue
+        if kolom is None:
+            syarat.append(SyaratQuery(None, (nilai,), negasi, frasa))
+            continue
+
+        alternatif = [a.strip() for a in (nilai.split(",") if not frasa else [nilai]) if a.strip()]
+        try:
+            if kolom in KOLOM_TANGGAL:
+                alternatif = [_rentang_hari(a) for a in alternatif]
+            elif kolom == "tahun":
+                alternatif = [int(a) for a in alternatif]
+            elif kolom == "kategori":
+                alternatif = [a.lower() for a in alternatif]
+        except ValueError:
+            contoh = "tahun:2025" if kolom == "tahun" else f"{nama}:2025-01..2025-03"
+            peringatan.append(f"{nama}:{nilai} tidak dikenali (contoh: {contoh})")
+            continue
+        syarat.append(SyaratQuery(kolom, tuple(alternatif), negasi, frasa))
+    return QueryPencarian(tuple(syarat), tuple(peringatan))
+
+
+def _query_teks(kolom, alternatif, frasa, trigram):
+    """
+    (query surat_fts, query surat_trigram, alternatif tanpa indeks) untuk satu
+    syarat teks. Alternatif tanpa indeks: hanya tanda baca dan terlalu pendek
+    untuk trigram (mis. "nomor:/"), dicari dengan LIKE oleh kompilasi_query.
+    """
+    bagian_fts, tanpa_indeks = [], []
+    for teks in alternatif:
+        # Tanpa kutip: setiap kata awalan; dengan kutip: satu frasa utuh, kata terakhir awalan
+        potongan = [teks] if frasa else teks.split()
+        frasa_fts = ['"' + " ".join(k) + '"*' for k in (_POLA_KATA.findall(p.lower()) for p in potongan) if k]
+        if frasa_fts:
+            bagian_fts.append(" AND ".join(frasa_fts))
+        elif not trigram or len(teks) < PANJANG_MIN_TRIGRAM:
+            tanpa_indeks.append(teks)
+    query_fts = " OR ".join(f"({b})" for b in bagian_fts) if len(bagian_fts) > 1 else (bagian_fts or [None])[0]
+
+    query_trigram = None
+    if trigram and all(len(t) >= PANJANG_MIN_TRIGRAM for t in alternatif):
+        query_trigram = " OR ".join('"' + t.replace('"', '""') + '"' for t in alternatif)
+
+    if kolom:
+        # Filter kolom FTS5: kolom : (ekspresi)
+        query_fts = f"{kolom} : ({query_fts})" if query_fts else None
+        query_trigram = f"{kolom} : ({query_trigram})" if query_trigram else None
+    return query_fts, query_trigram, tanpa_indeks
+
+
+def _pola_like(teks):
+    """Substring untuk LIKE ... ESCAPE '\\' (%, _ dan \\ dicari apa adanya)."""
+    return "%" + re.sub(r"([\\%_])", r"\\\1", teks) + "%"
+
+
+def kompilasi_query(query, trigram=True):
+    """
+    QueryPencarian -> list (potongan WHERE, params) untuk tabel surat, digabung
+    dengan AND oleh SuratRepository._where. trigram: indeks surat_trigram tersedia.
+    """
+    hasil = []
+    for s in query.syarat:
+        tidak = "NOT " if s.negasi else ""
+        if s.kolom in KOLOM_TANGGAL:
+            # Perbandingan integer lewat indeks (kategori, tanggal_hari)
+            bagian, params = [], []
+            for dari, sampai in s.nilai:
+                batas = []
+                if dari is not None: batas.append(f"{s.kolom} >= ?"); params.append(dari)
+                if sampai is not None: batas.append(f"{s.kolom} <= ?"); params.append(sampai)
+                bagian.append(" AND ".join(batas))
+            hasil.append((f"{tidak}({' OR '.join(bagian)})", params))
+        elif s.kolom in ("kategori", "tahun"):
+            hasil.append((f"{s.kolom} {tidak}IN ({','.join('?' * len(s.nilai))})", list(s.nilai)))
+        else:
+            query_fts, query_trigram, tanpa_indeks = _query_teks(s.kolom, s.nilai, s.frasa, trigram)
+            sumber, params = [], []
+            if query_fts:
+                sumber.append("SELECT rowid FROM surat_fts WHERE surat_fts MATCH ?")
+                params.append(query_fts)
+            if query_trigram:
+                sumber.append("SELECT rowid FROM surat_trigram WHERE surat_trigram MATCH ?")
+                params.append(query_trigram)
+            if not tanpa_indeks:
+                if sumber:
+                    hasil.append((f"id {tidak}IN ({' UNION '.join(sumber)})", params))
+                continue
+            # Nilai yang tidak terjangkau indeks tetap dicari (tidak diabaikan diam-diam),
+            # lewat LIKE di baris-baris kategori ini
+            bagian = [f"id IN ({' UNION '.join(sumber)})"] if sumber else []
+            for teks in tanpa_indeks:
+                for kolom in ([s.kolom] if s.kolom else KOLOM_TEKS):
+                    bagian.append(f"ifnull({kolom}, '') LIKE ? ESCAPE '\\'")
+                    params.append(_pola_like(teks))
+            hasil.append((f"{tidak}({' OR '.join(bagian)})", params))
+    return hasil
@@ -0,0 +1,148 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QLineEdit, QTreeWidget, QTreeWidgetItem,
+                             QHeaderView, QAbstractItemView)
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QFont
+from .repository_remote import surat_repository, kode_surat_repository
+from .query_worker import QueryExecutor, PencarianTertunda
+from .pencarian import BANTUAN_SINTAKS
+from .db_manager import versi_data
+
+# =====================================================================
+# PENCARIAN GLOBAL
+# ---------------------------------------------------------------------
+# Satu kotak pencarian untuk surat masuk, surat keluar, dokumen & kode
+# surat sekaligus. Setiap sumber dicari lewat indeksnya sendiri
+# (SuratRepository.cari_global / KodeSuratRepository.cari, urut bm25) di
+# kanal QueryExecutor terpisah, sehingga hasil tiap grup tampil begitu
+# sumbernya selesai tanpa menunggu sumber lain. Klik dua kali hasil untuk
+# membukanya di halamannya (sinyal buka_rekaman, diteruskan main.py).
+# =====================================================================
+
+# (sumber, judul grup); sumber = kategori surat atau "kode_surat"
+SUMBER = [("masuk", "📥 Surat Masuk"), ("keluar", "📤 Surat Keluar"),
+          ("dokumen", "📁 Dokumen"), ("kode_surat", "🔖 Kode Surat")]
+
+
+class PencarianGlobal(QWidget):
+    # (sumber, id rekaman)
+    buka_rekaman = pyqtSignal(str, int)
+
+    def __init__(self):
+        super().__init__()
+        self.repo = surat_repository()
+        self.repo_kode = kode_surat_repository()
+        self.executor = QueryExecutor(self)
+        self._versi_tampil = None   # versi_data() saat pencarian terakhir dijalankan
+        self.grup = {}              # sumber -> item grup di tree
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(25, 25, 25, 25)
+        self.main_layout.setSpacing(15)
+
+        # --- HEADER ---
+        title = QLabel("🔍 Pencarian Global")
+        title.setStyleSheet("font-size: 22px; font-weight: bold; color: #2d3436;")
+        self.main_layout.addWidget(title)
+
+        # --- SEARCH BAR ---
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("🔍 Cari di Surat Masuk, Surat Keluar, Dokumen, dan Kode Surat...")
+        self.search_input.setStyleSheet("padding: 12px; border: 1px solid #dcdde1; border-radius: 8px; background: white; color: black; font-size: 13px;")
+        self.search_input.setToolTip(BANTUAN_SINTAKS)
+        # Semua sumber dicari ulang setelah berhenti mengetik; pencarian lama dibatalkan di setiap ketukan
+        self.pencarian = PencarianTertunda(self.search_input, self.cari, batalkan=self.executor.batalkan_semua)
+        self.main_layout.addWidget(self.search_input)
+
+        self.lbl_info = QLabel("Ketik kata kunci, lalu klik dua kali hasil untuk membukanya di halamannya.")
+        self.lbl_info.setStyleSheet("color: #636e72; font-size: 12px; font-style: italic;")
+        self.main_layout.addWidget(self.lbl_info)
+
+        # --- HASIL, DIKELOMPOKKAN PER SUMBER ---
+        self.tree = QTreeWidget()
+        self.tree.setColumnCount(3)
+        self.tree.setHeaderLabels(["PERIHAL / KETERANGAN", "NOMOR / KODE", "TANGGAL"])
+        self.tree.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.tree.setRootIsDecorated(True)
+        header = self.tree.header()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Fixed)
+        header.setStretchLastSection(False)
+        self.tree.setColumnWidth(1, 220)
+        self.tree.setColumnWidth(2, 120)
+        self.tree.setStyleSheet("""
+            QTreeWidget { background-color: white; color: #000000; border: none; outline: none; font-size: 13px; }
+            QHeaderView::section { background-color: #7132CA; color: white; padding: 12px; font-weight: bold; border: none; }
+            QTreeWidget::item { padding: 6px; border-bottom: 1px solid #f1f2f6; }
+            QTreeWidget::item:selected { background-color: #d1ecf1; color: #000000; }
+        """)
+        font_grup = QFont()
+        font_grup.setBold(True)
+        for sumber, judul in SUMBER:
+            item = QTreeWidgetItem(self.tree, [judul])
+            item.setFont(0, font_grup)
+            item.setFirstColumnSpanned(True)
+            item.setHidden(True)
+            self.grup[sumber] = item
+        # Klik dua kali / Enter pada hasil
+        self.tree.itemActivated.connect(self.buka)
+        self.main_layout.addWidget(self.tree)
+
+    def muat_jika_berubah(self):
+        """Dipanggil saat halaman dibuka dari sidebar: cari ulang hanya jika data sudah berubah."""
+        versi = versi_data()
+        if self.search_input.text().strip() and (versi is None or versi != self._versi_tampil):
+            self.cari()
+
+    def cari(self):
+        keyword = self.search_input.text().strip()
+        self.executor.batalkan_semua()
+        self._versi_tampil = versi_data()
+        for sumber, judul in SUMBER:
+            item = self.grup[sumber]
+            item.takeChildren()
+            item.setText(0, f"{judul}  (memuat...)")
+            item.setHidden(not keyword)
+        if not keyword: return
+
+        # Setiap sumber di kanalnya sendiri: hasil tampil per grup begitu sumbernya selesai
+        for sumber, judul in SUMBER:
+            selesai = lambda hasil, s=sumber: self.tampilkan(s, hasil)
+            gagal = lambda pesan, s=sumber: self.tampilkan_gagal(s, pesan)
+            if sumber == "kode_surat":
+                self.executor.jalankan(self.repo_kode.cari, keyword, on_selesai=selesai, on_gagal=gagal, kanal=sumber)
+            else:
+                self.executor.jalankan(self.repo.cari_global, sumber, keyword,
+                                       on_selesai=selesai, on_gagal=gagal, kanal=sumber)
+
+    def tampilkan(self, sumber, hasil):
+        jumlah, rows = hasil
+        item = self.grup[sumber]
+        teratas = f", {len(rows)} teratas" if jumlah > len(rows) else ""
+        item.setText(0, f"{dict(SUMBER)[sumber]}  ({jumlah} hasil{teratas})")
+        for row in rows:
+            if sumber == "kode_surat":
+                kolom = [row.keterangan, row.kode, ""]
+            elif sumber == "dokumen":
+                # Dokumen: asal_surat berisi kategori dokumen
+                kolom = [f"{row.judul_surat} — {row.asal_surat}" if row.asal_surat else row.judul_surat,
+                         "", row.tanggal_tampil]
+            else:
+                kolom = [f"{row.judul_surat} — {row.asal_surat}" if row.asal_surat else row.judul_surat,
+                         row.nomor_surat, row.tanggal_tampil]
+            anak = QTreeWidgetItem(item, [str(k) if k else "" for k in kolom])
+            anak.setData(0, Qt.ItemDataRole.UserRole, row.id)
+            anak.setToolTip(0, anak.text(0))
+        item.setExpanded(bool(rows))
+
+    def tampilkan_gagal(self, sumber, pesan):
+        print(f"Error Pencarian Global ({sumber}): {pesan}")
+        self.grup[sumber].setText(0, f"{dict(SUMBER)[sumber]}  (gagal memuat)")
+
+    def buka(self, item, kolom=0):
+        grup = item.parent()
+        if grup is None: return     # Judul grup
+        sumber = next(s for s, g in self.grup.items() if g is grup)
+        self.buka_rekaman.emit(sumber, int(item.data(0, Qt.ItemDataRole.UserRole)))
@@ -0,0 +1,169 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from .db_manager import get_connection
+from .settings import get_server_url, get_jeda_pencarian
+
+# =====================================================================
+# EKSEKUTOR QUERY DI BACKGROUND
+# ---------------------------------------------------------------------
+# Query baca dijalankan di thread pool agar GUI tidak membeku (mis. saat
+# database ada di network share). Setiap thread pool memakai koneksi
+# SQLite miliknya sendiri (lihat db_manager.get_connection).
+#
+#     self.executor = QueryExecutor(self)
+#     self.executor.jalankan(self.repo.count, filter_surat,
+#                            on_selesai=self.tampilkan, kanal="data")
+#
+# Permintaan baru di kanal yang sama membatalkan permintaan sebelumnya:
+# yang belum mulai diambil dari antrean, yang sedang berjalan dihentikan
+# lewat sqlite3 Connection.interrupt(), dan hasilnya tidak pernah dikirim.
+#
+# Kotak pencarian memakai PencarianTertunda (debounce) agar query hanya
+# dijalankan setelah pengguna berhenti mengetik, bukan di setiap ketukan.
+# =====================================================================
+
+_pool = QThreadPool()
+_pool.setMaxThreadCount(2)
+
+
+def tunggu_selesai(timeout_ms=3000):
+    """Menunggu query background selesai (dipanggil saat aplikasi ditutup)."""
+    _pool.clear()
+    return _pool.waitForDone(timeout_ms)
+
+
+class _Sinyal(QObject):
+    selesai = pyqtSignal(str, int, object)
+    gagal = pyqtSignal(str, int, str)
+
+
+class _TugasQuery(QRunnable):
+    def __init__(self, kanal, token, fungsi, args, kwargs, sinyal):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.kanal = kanal
+        self.token = token
+        self.fungsi = fungsi
+        self.args = args
+        self.kwargs = kwargs
+        self.sinyal = sinyal
+        self.dibatalkan = False
+        self.conn = None
+
+    def batalkan(self):
+        self.dibatalkan = True
+        conn = self.conn
+        if conn is not None:
+            # Aman dipanggil dari thread lain: menghentikan query yang sedang berjalan
+            try: conn.interrupt()
+            except Exception: pass
+
+    def run(self):
+        if self.dibatalkan: return
+        try:
+            # Mode server: tidak ada koneksi SQLite lokal yang perlu dihentikan
+            if not get_server_url(): self.conn = get_connection()
+            hasil = self.fungsi(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self.dibatalkan:
+                self.sinyal.gagal.emit(self.kanal, self.token, str(e))
+            return
+        finally:
+            self.conn = None
+        if not self.dibatalkan:
+            self.sinyal.selesai.emit(self.kanal, self.token, hasil)
+
+
+class QueryExecutor(QObject):
+    """Menjalankan fungsi baca database di background, hasil dikirim ke thread GUI."""
+
+    # True saat ada permintaan yang sedang berjalan (untuk indikator "Memuat...")
+    sedang_memuat = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._token = 0
+        self._aktif = {}    # kanal -> (tugas, on_selesai, on_gagal)
+        self._sinyal = _Sinyal()
+        # Sinyal dipancarkan dari thread pool, slot dijalankan di thread GUI (queued)
+        self._sinyal.selesai.connect(self._on_selesai)
+        self._sinyal.gagal.connect(self._on_gagal)
+
+    def jalankan(self, fungsi, *args, on_selesai=None, on_gagal=None, kanal="default", **kwargs):
+        """
+        Menjalankan fungsi(*args, **kwargs) di thread pool.
+        `fungsi` TIDAK boleh menyentuh widget; ambil semua nilai dari UI sebelum memanggil.
+        """
+        self.batalkan(kanal, kirim_status=False)
+        self._token += 1
+        tugas = _TugasQuery(kanal, self._token, fungsi, args, kwargs, self._sinyal)
+        self._aktif[kanal] = (tugas, on_selesai, on_gagal)
+        _pool.start(tugas)
+        self.sedang_memuat.emit(True)
+        return self._token
+
+    def batalkan(self, kanal="default", kirim_status=True):
+        aktif = self._aktif.pop(kanal, None)
+        if aktif:
+            tugas = aktif[0]
+            if not _pool.tryTake(tugas):
+                tugas.batalkan()
+            if kirim_status and not self._aktif:
+                self.sedang_memuat.emit(False)
+
+    def batalkan_semua(self):
+        for kanal in list(self._aktif):
+            self.batalkan(kanal)
+
+    def _ambil(self, kanal, token):
+        aktif = self._aktif.get(kanal)
+        # Hasil permintaan yang sudah digantikan (basi) diabaikan
+        if not aktif or aktif[0].token != token:
+            return None
+        del self._aktif[kanal]
+        if not self._aktif:
+            self.sedang_memuat.emit(False)
+        return aktif
+
+    def _on_selesai(self, kanal, token, hasil):
+        aktif = self._ambil(kanal, token)
+        if aktif and aktif[1]:
+            aktif[1](hasil)
+
+    def _on_gagal(self, kanal, token, pesan):
+        aktif = self._ambil(kanal, token)
+        if not aktif: return
+        if aktif[2]: aktif[2](pesan)
+        else: print(f"Error Query: {pesan}")
+
+
+class PencarianTertunda(QObject):
+    """
+    Debounce kotak pencarian: `fungsi` dipanggil setelah teks tidak berubah
+    selama `jeda_ms` (default dari config.json, lihat get_jeda_pencarian).
+    Di setiap ketukan `batalkan` dipanggil untuk menghentikan query yang
+    masih berjalan, karena hasilnya pasti sudah basi. Enter = cari sekarang.
+    """
+
+    def __init__(self, line_edit, fungsi, batalkan=None, jeda_ms=None):
+        super().__init__(line_edit)
+        self._fungsi = fungsi
+        self._batalkan = batalkan
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(get_jeda_pencarian() if jeda_ms is None else int(jeda_ms))
+        self._timer.timeout.connect(self.jalankan_sekarang)
+        line_edit.textChanged.connect(self.tunda)
+        line_edit.returnPressed.connect(self._enter)
+
+    def tunda(self, *args):
+        """Teks (atau filter lain, mis. rentang tanggal) berubah: batalkan query lama, tunggu jeda."""
+        if self._batalkan: self._batalkan()
+        self._timer.start()
+
+    def _enter(self):
+        if self._timer.isActive():
+            self.jalankan_sekarang()
+
+    def jalankan_sekarang(self):
+        self._timer.stop()
+        self._fungsi()
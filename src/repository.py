@@ -0,0 +1,579 @@
+import threading
+import time
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+from .db_manager import db_session, db_transaction, versi_data, get_db_path
+from .pencarian import (buat_query_fts, buat_query_trigram, trigram_tersedia, buat_query_mirip, trigram_mirip,
+                        mirip_tersedia, normalisasi_mirip, urutkan_mirip, BATAS_KANDIDAT_MIRIP,
+                        urai_query, kompilasi_query, KOLOM_TANGGAL, BOBOT_BM25, BOBOT_BM25_KODE,
+                        BATAS_HASIL_GLOBAL)
+from .migrations import rebuild_statistik
+from .audit_log import catat, pencatat_audit
+
+# =====================================================================
+# LAPISAN AKSES DATA
+# ---------------------------------------------------------------------
+# Semua query ke tabel surat & kode_surat lewat modul ini. String SQL
+# dibuat sama persis untuk parameter yang sama, sehingga statement cache
+# sqlite3 (per koneksi) bisa dipakai ulang tanpa prepare ulang.
+# =====================================================================
+
+# Query yang lebih lambat dari ini dicatat ke console
+BATAS_LAMBAT_MS = 200
+
+# Jumlah maksimal parameter "?" per query WHERE id IN (...)
+# (SQLite lama membatasi 999 parameter per statement)
+UKURAN_POTONGAN = 500
+
+# Hasil cari_mirip() terakhir per thread; versi_data() hanya bisa dibandingkan
+# dengan koneksi (thread) yang sama
+_cache_mirip = threading.local()
+UKURAN_CACHE_MIRIP = 32
+
+# (path database, trigram) -> jumlah nilai kosakata yang memuatnya. Menghitungnya
+# berarti membaca seluruh posting list, jadi disimpan selama aplikasi berjalan:
+# angka yang sedikit usang hanya menggeser urutan trigram yang dipilih. Trigram
+# yang belum ada (0) tidak disimpan, agar nilai baru yang memuatnya tetap terambil.
+_frekuensi_trigram = {}
+UKURAN_CACHE_FREKUENSI = 20000
+
+
+class SuratRecord(NamedTuple):
+    id: int
+    kategori: str
+    tanggal: str
+    asal_surat: str
+    nomor_surat: str
+    tanggal_surat: str
+    judul_surat: str
+    keterangan: str
+    file_path: str
+    # Dihitung database sekali per baris (lihat KOLOM_SURAT), bukan saat menggambar tabel
+    tanggal_hari: Optional[int] = None          # Nomor hari, untuk sorting
+    tanggal_surat_hari: Optional[int] = None
+    tanggal_tampil: str = ""                    # dd/MM/yyyy
+    tanggal_surat_tampil: str = ""
+
+
+class KodeSuratRecord(NamedTuple):
+    id: int
+    kode: str
+    keterangan: str
+
+
+class AuditRecord(NamedTuple):
+    id: int
+    waktu: str
+    pengguna: str
+    aksi: str
+    tabel: str
+    id_rekaman: int
+    keterangan: str
+
+
+class FilterSurat(NamedTuple):
+    kategori: str
+    keyword: str = ""
+    tahun: Optional[int] = None      # None = Semua Tahun
+    tanggal_dari: Optional[str] = None      # yyyy-MM-dd, batas rentang tanggal terima (inklusif)
+    tanggal_sampai: Optional[str] = None
+    mirip: bool = False     # Kata kunci dicari sebagai pengirim / perihal yang mirip (toleran salah ketik)
+    tanggal_surat_dari: Optional[str] = None    # yyyy-MM-dd, batas rentang tanggal surat (inklusif)
+    tanggal_surat_sampai: Optional[str] = None
+
+
+KOLOM_SURAT = ("id, kategori, tanggal, asal_surat, nomor_surat, tanggal_surat, judul_surat, keterangan, file_path, "
+               "tanggal_hari, tanggal_surat_hari, "
+               "ifnull(strftime('%d/%m/%Y', tanggal), ifnull(tanggal, '')), "
+               "ifnull(strftime('%d/%m/%Y', tanggal_surat), ifnull(tanggal_surat, ''))")
+KOLOM_AUDIT = "id, waktu, pengguna, aksi, tabel, id_rekaman, keterangan"
+KOLOM_TULIS = ("kategori", "tanggal", "asal_surat", "nomor_surat", "tanggal_surat", "judul_surat", "keterangan", "file_path")
+
+
+def nomor_hari(tanggal):
+    """'yyyy-MM-dd' -> nomor hari (hari sejak 1970-01-01), sama dengan kolom tanggal_hari."""
+    return date.fromisoformat(str(tanggal)[:10]).toordinal() - 719163
+
+
+def _surat(cursor, row):
+    return SuratRecord(*row)
+
+
+def _kode_surat(cursor, row):
+    return KodeSuratRecord(*row)
+
+
+def _audit(cursor, row):
+    return AuditRecord(*row)
+
+
+def _potong(ids):
+    ids = list(ids)
+    for i in range(0, len(ids), UKURAN_POTONGAN):
+        yield ids[i:i + UKURAN_POTONGAN]
+
+
+def _jalankan(db, sql, params=(), row_factory=None):
+    """Satu pintu eksekusi query: tempat mengukur & mencatat query lambat."""
+    mulai = time.perf_counter()
+    cursor = db.cursor()
+    if row_factory: cursor.row_factory = row_factory
+    cursor.execute(sql, params)
+    durasi = (time.perf_counter() - mulai) * 1000
+    if durasi > BATAS_LAMBAT_MS:
+        print(f"[Query Lambat] {durasi:.0f} ms: {' '.join(sql.split())[:150]}")
+    return cursor
+
+
+class SuratRepository:
+    """Akses data tabel surat (surat masuk, surat keluar & dokumen)."""
+
+    def _where(self, filter_surat):
+        # "dihapus_pada IS NULL" wajib ada agar partial index surat aktif (v7) terpakai
+        where = ["kategori = ?", "dihapus_pada IS NULL"]
+        params = [filter_surat.kategori]
+        sumber = []
+        query = urai_query(filter_surat.keyword)
+        if filter_surat.mirip and self.pakai_mirip():
+            if (filter_surat.keyword or "").strip():
+                # Pengirim / perihal yang mirip, lewat indeks ekspresi lower(trim(...)) (v10)
+                hasil = self.cari_mirip(filter_surat.kategori, filter_surat.keyword)
+                for kolom in ("asal_surat", "judul_surat"):
+                    nilai = [h.nilai for h in hasil if h.kolom == kolom]
+                    if not nilai: continue
+                    sumber.append(f"SELECT id FROM surat WHERE kategori = ? AND dihapus_pada IS NULL "
+                                  f"AND lower(trim({kolom})) IN ({','.join('?' * len(nilai))})")
+                    params += [filter_surat.kategori] + nilai
+                if not sumber:
+                    where.append("0")
+        elif not query.sederhana:
+            # Sintaks pencarian (dari:, nomor:, tgl:, -kata, ...), lihat pencarian.py
+            for potongan, nilai in kompilasi_query(query, self.pakai_trigram()):
+                where.append(potongan)
+                params += nilai
+        else:
+            # Kata kunci cocok sebagai awalan kata (FTS5) ATAU sebagai substring di mana pun (trigram)
+            query_fts = buat_query_fts(filter_surat.keyword or "")
+            if query_fts:
+                sumber.append("SELECT rowid FROM surat_fts WHERE surat_fts MATCH ?")
+                params.append(query_fts)
+            query_trigram = buat_query_trigram(filter_surat.keyword or "") if self.pakai_trigram() else None
+            if query_trigram:
+                sumber.append("SELECT rowid FROM surat_trigram WHERE surat_trigram MATCH ?")
+                params.append(query_trigram)
+        if sumber:
+            where.append(f"id IN ({' UNION '.join(sumber)})")
+        if filter_surat.tahun:
+            # Kolom generated, memakai indeks (kategori, tahun)
+            where.append("tahun = ?")
+            params.append(int(filter_surat.tahun))
+        # Rentang tanggal: perbandingan integer lewat indeks (kategori, tanggal_hari) /
+        # (kategori, tanggal_surat_hari)
+        for kolom, dari, sampai in [("tanggal_hari", filter_surat.tanggal_dari, filter_surat.tanggal_sampai),
+                                    ("tanggal_surat_hari", filter_surat.tanggal_surat_dari,
+                                     filter_surat.tanggal_surat_sampai)]:
+            if dari:
+                where.append(f"{kolom} >= ?")
+                params.append(nomor_hari(dari))
+            if sampai:
+                where.append(f"{kolom} <= ?")
+                params.append(nomor_hari(sampai))
+        return " AND ".join(where), params
+
+    def pakai_trigram(self):
+        """True jika pencarian juga mencocokkan substring lewat indeks trigram."""
+        return trigram_tersedia()
+
+    def pakai_mirip(self):
+        """True jika pencarian mirip (FilterSurat.mirip) bisa dipakai."""
+        return mirip_tersedia()
+
+    def cari_mirip(self, kategori, keyword):
+        """
+        Pengirim / perihal yang mirip `keyword` (toleran salah ketik), paling mirip
+        dulu: list NilaiMirip (pencarian.py). Disimpan selama data belum berubah,
+        karena count() & list_page() untuk kata kunci yang sama memanggilnya lagi.
+        """
+        if not self.pakai_mirip() or not trigram_mirip(keyword):
+            return []
+        cache = getattr(_cache_mirip, "isi", None)
+        if cache is None:
+            cache = _cache_mirip.isi = {}
+        kunci, versi = (kategori, normalisasi_mirip(keyword)), versi_data()
+        if versi is not None and cache.get(kunci, (None,))[0] == versi:
+            return cache[kunci][1]
+        with db_session() as db:
+            query = buat_query_mirip(keyword, self._frekuensi(db, trigram_mirip(keyword)))
+            if not query:
+                return []
+            # Urut bm25 (rank): nilai dengan paling banyak trigram langka yang sama dulu
+            kandidat = _jalankan(db, """
+                SELECT k.kolom, k.nilai, k.jumlah FROM kosakata_trigram t
+                JOIN kosakata_surat k ON k.id = t.rowid
+                WHERE kosakata_trigram MATCH ? AND t.kategori = ?
+                ORDER BY t.rank LIMIT ?
+            """, (query, kategori, BATAS_KANDIDAT_MIRIP)).fetchall()
+        hasil = urutkan_mirip(keyword, kandidat)
+        if len(cache) >= UKURAN_CACHE_MIRIP: cache.clear()
+        cache[kunci] = (versi, hasil)
+        return hasil
+
+    def _frekuensi(self, db, daftar_trigram):
+        """{trigram: jumlah nilai kosakata yang memuatnya} lewat kosakata_trigram_vocab."""
+        db_path = get_db_path()
+        hasil = {}
+        for trigram in daftar_trigram:
+            jumlah = _frekuensi_trigram.get((db_path, trigram))
+            if jumlah is None:
+                row = _jalankan(db, "SELECT doc FROM kosakata_trigram_vocab WHERE term = ?", (trigram,)).fetchone()
+                jumlah = row[0] if row else 0
+                if jumlah:
+                    if len(_frekuensi_trigram) >= UKURAN_CACHE_FREKUENSI: _frekuensi_trigram.clear()
+                    _frekuensi_trigram[(db_path, trigram)] = jumlah
+            hasil[trigram] = jumlah
+        return hasil
+
+    def list_page(self, filter_surat, after_id=None, limit=10):
+        """
+        Keyset pagination: baris setelah `after_id` (urut id terbaru dulu).
+        Halaman pertama: after_id=None.
+        """
+        where, params = self._where(filter_surat)
+        urut = self._kolom_urut(filter_surat)
+        if after_id is not None:
+            where += f" AND {urut} < ?"
+            params.append(after_id)
+        with db_session() as db:
+            sql = f"SELECT {KOLOM_SURAT} FROM surat WHERE {where} ORDER BY {urut} DESC LIMIT ?"
+            return _jalankan(db, sql, params + [int(limit)], _surat).fetchall()
+
+    def list_all(self, filter_surat):
+        """Semua baris sesuai filter tanpa paging (untuk export)."""
+        where, params = self._where(filter_surat)
+        with db_session() as db:
+            sql = f"SELECT {KOLOM_SURAT} FROM surat WHERE {where} ORDER BY {self._kolom_urut(filter_surat)} DESC"
+            return _jalankan(db, sql, params, _surat).fetchall()
+
+    def _kolom_urut(self, filter_surat):
+        """
+        'id', atau '+id' jika ada rentang tanggal (filter atau sintaks tgl: / tglsurat:).
+        Tanpa statistik (ANALYZE), untuk halaman berikutnya ("id < ?") SQLite memilih
+        indeks (kategori, id) demi menghindari sorting, lalu menelusuri mundur surat
+        satu per satu sampai halaman penuh. Jika surat di rentang tersebar di seluruh
+        id (mis. arsip lama dari impor massal), itu bisa berarti seluruh tabel.
+        '+id' memaksa indeks rentang tanggal: biayanya sebanding dengan count()
+        untuk rentang yang sama.
+        """
+        rentang = (filter_surat.tanggal_dari or filter_surat.tanggal_sampai
+                   or filter_surat.tanggal_surat_dari or filter_surat.tanggal_surat_sampai)
+        if not rentang and not (filter_surat.mirip and self.pakai_mirip()):
+            # Pencarian mirip tidak memakai sintaks (lihat _where)
+            rentang = any(s.kolom in KOLOM_TANGGAL and not s.negasi for s in urai_query(filter_surat.keyword).syarat)
+        return "+id" if rentang else "id"
+
+    def count(self, filter_surat):
+        where, params = self._where(filter_surat)
+        with db_session() as db:
+            return _jalankan(db, f"SELECT COUNT(*) FROM surat WHERE {where}", params).fetchone()[0]
+
+    def cari_global(self, kategori, keyword, limit=BATAS_HASIL_GLOBAL):
+        """
+        Pencarian global (pencarian_global.py): (jumlah, baris teratas) satu kategori.
+        Kata kunci biasa diurutkan relevansi (bm25 surat_fts); surat yang hanya
+        cocok sebagai substring (trigram) atau lewat sintaks pencarian menyusul,
+        terbaru dulu.
+        """
+        if not (keyword or "").strip():
+            return 0, []
+        filter_surat = FilterSurat(kategori, keyword)
+        jumlah = self.count(filter_surat)
+        if not jumlah:
+            return 0, []
+        ids = []
+        query_fts = buat_query_fts(keyword) if urai_query(keyword).sederhana else None
+        if query_fts:
+            with db_session() as db:
+                ids = [row[0] for row in _jalankan(db, f"""
+                    SELECT s.id FROM surat_fts JOIN surat s ON s.id = surat_fts.rowid
+                    WHERE surat_fts MATCH ? AND s.kategori = ? AND s.dihapus_pada IS NULL
+                    ORDER BY bm25(surat_fts, {", ".join(str(b) for b in BOBOT_BM25)}) LIMIT ?
+                """, (query_fts, kategori, int(limit)))]
+        urutan = {id_surat: i for i, id_surat in enumerate(ids)}
+        rows = sorted(self.get_many(ids), key=lambda r: urutan[r.id])
+        if len(rows) < min(limit, jumlah):
+            # Sisanya dari halaman pertama biasa; limit ditambah agar baris yang sudah ada tidak mengurangi
+            rows += [r for r in self.list_page(filter_surat, None, limit + len(ids)) if r.id not in urutan]
+        return jumlah, rows[:limit]
+
+    def lokasi(self, filter_surat, id_surat, per_halaman=10):
+        """
+        Letak surat `id_surat` di daftar sesuai filter: (jumlah, nomor halaman,
+        page_anchors sampai halaman itu), atau None jika surat tidak termasuk filter.
+        Dihitung dari indeks tanpa memuat halaman-halaman sebelumnya.
+        """
+        where, params = self._where(filter_surat)
+        with db_session() as db:
+            if not _jalankan(db, f"SELECT 1 FROM surat WHERE {where} AND id = ?", params + [int(id_surat)]).fetchone():
+                return None
+            # id terakhir setiap halaman penuh sebelum surat itu (keyset, urut id terbaru dulu)
+            anchors = [row[0] for row in _jalankan(db, f"""
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (ORDER BY id DESC) AS n FROM surat WHERE {where} AND id > ?
+                ) WHERE n % ? = 0
+            """, params + [int(id_surat), int(per_halaman)])]
+        return self.count(filter_surat), len(anchors) + 1, [None] + anchors
+
+    def list_kandidat(self, filter_surat):
+        """
+        (id, asal_surat, nomor_surat, judul_surat, keterangan) semua baris sesuai
+        filter, terbaru dulu: kandidat untuk mempersempit pencarian di memori (pencarian.py).
+        """
+        where, params = self._where(filter_surat)
+        with db_session() as db:
+            # Diurutkan di Python: ORDER BY di sini membuat SQLite menyortir lewat temp b-tree
+            sql = f"SELECT id, asal_surat, nomor_surat, judul_surat, keterangan FROM surat WHERE {where}"
+            return sorted(_jalankan(db, sql, params).fetchall(), reverse=True)
+
+    def list_tahun(self, kategori):
+        """Daftar tahun (teks, terbaru dulu) untuk dropdown filter, dibaca dari indeks."""
+        with db_session() as db:
+            cursor = _jalankan(db, """
+                SELECT DISTINCT tahun FROM surat
+                WHERE kategori = ? AND dihapus_pada IS NULL AND tahun IS NOT NULL ORDER BY tahun DESC
+            """, (kategori,))
+            return [str(row[0]) for row in cursor.fetchall()]
+
+    def get_many(self, ids):
+        """Ambil beberapa surat sekaligus dengan satu query WHERE id IN (...)."""
+        hasil = []
+        with db_session() as db:
+            for potongan in _potong(ids):
+                sql = f"SELECT {KOLOM_SURAT} FROM surat WHERE id IN ({','.join('?' * len(potongan))})"
+                hasil += _jalankan(db, sql, potongan, _surat).fetchall()
+        return hasil
+
+    def berkas_lokal(self, id_surat, file_path):
+        """Path berkas yang bisa dibuka di komputer ini (database lokal: path aslinya)."""
+        return file_path
+
+    def list_file_paths(self):
+        """(id, file_path) semua surat yang punya berkas (untuk backup)."""
+        with db_session() as db:
+            return _jalankan(db, "SELECT id, file_path FROM surat WHERE file_path IS NOT NULL AND file_path != ''").fetchall()
+
+    def insert(self, kategori, tanggal, asal_surat="", nomor_surat="", tanggal_surat=None,
+               judul_surat="", keterangan="", file_path=""):
+        with db_transaction() as db:
+            cursor = _jalankan(db, f"INSERT INTO surat ({', '.join(KOLOM_TULIS)}) VALUES ({', '.join('?' * len(KOLOM_TULIS))})",
+                               (kategori, tanggal, asal_surat, nomor_surat, tanggal_surat, judul_surat, keterangan, file_path))
+        catat("tambah", "surat", [cursor.lastrowid], kategori)
+        return cursor.lastrowid
+
+    def insert_many(self, baris):
+        """
+        Insert banyak surat dalam SATU transaksi (executemany).
+        baris: list tuple dengan urutan KOLOM_TULIS. Mengembalikan list id baru
+        (urutan sama dengan `baris`). Jika gagal, semua baris di-rollback.
+        """
+        baris = list(baris)
+        if not baris: return []
+        with db_transaction() as db:
+            db.executemany(f"INSERT INTO surat ({', '.join(KOLOM_TULIS)}) VALUES ({', '.join('?' * len(KOLOM_TULIS))})", baris)
+            # Selama transaksi tulis masih terbuka tidak ada penulis lain, dan AUTOINCREMENT
+            # selalu memberi id terbesar + 1, sehingga id baris yang baru masuk berurutan
+            id_akhir = db.execute("SELECT last_insert_rowid()").fetchone()[0]
+        ids = list(range(id_akhir - len(baris) + 1, id_akhir + 1))
+        catat("tambah", "surat", ids, "impor massal")
+        return ids
+
+    def update(self, id_surat, **kolom):
+        """Update sebagian kolom, mis. update(5, judul_surat="...", keterangan="...")."""
+        kolom = {k: v for k, v in kolom.items() if k in KOLOM_TULIS}
+        if not kolom: return
+        # Urutan kolom dibuat tetap agar string SQL identik (statement cache)
+        nama = [k for k in KOLOM_TULIS if k in kolom]
+        with db_transaction() as db:
+            _jalankan(db, f"UPDATE surat SET {', '.join(f'{k}=?' for k in nama)} WHERE id=?",
+                      [kolom[k] for k in nama] + [id_surat])
+        catat("ubah", "surat", [id_surat], ", ".join(nama))
+
+    def update_file_paths(self, pasangan):
+        """pasangan: list (file_path_baru, id)."""
+        pasangan = list(pasangan)
+        with db_transaction() as db:
+            db.executemany("UPDATE surat SET file_path = ? WHERE id = ?", pasangan)
+        catat("ubah", "surat", [id_surat for _, id_surat in pasangan], "file_path")
+
+    def tandai_dihapus(self, ids):
+        """
+        Hapus lunak: surat disembunyikan dari semua daftar tetapi masih bisa
+        dipulihkan. Baris & berkasnya dihapus permanen oleh pembersihan berkala
+        (trash_worker.py). Mengembalikan jumlah surat yang ditandai.
+        """
+        waktu = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        ids = list(ids)
+        jumlah = 0
+        with db_transaction() as db:
+            for potongan in _potong(ids):
+                jumlah += _jalankan(db, f"UPDATE surat SET dihapus_pada = ? WHERE id IN ({','.join('?' * len(potongan))}) "
+                                        "AND dihapus_pada IS NULL", [waktu] + potongan).rowcount
+        catat("hapus", "surat", ids)
+        return jumlah
+
+    def pulihkan(self, ids):
+        """Urungkan hapus: surat yang belum dibersihkan kembali aktif."""
+        ids = list(ids)
+        jumlah = 0
+        with db_transaction() as db:
+            for potongan in _potong(ids):
+                jumlah += _jalankan(db, f"UPDATE surat SET dihapus_pada = NULL WHERE id IN ({','.join('?' * len(potongan))}) "
+                                        "AND dihapus_pada IS NOT NULL", potongan).rowcount
+        catat("pulihkan", "surat", ids)
+        return jumlah
+
+    def list_terhapus(self, sebelum, after_id=0, limit=UKURAN_POTONGAN):
+        """Surat yang ditandai terhapus sebelum waktu `sebelum` (yyyy-MM-dd HH:mm:ss), urut id."""
+        with db_session() as db:
+            sql = (f"SELECT {KOLOM_SURAT} FROM surat WHERE dihapus_pada IS NOT NULL AND dihapus_pada < ? "
+                   "AND id > ? ORDER BY id LIMIT ?")
+            return _jalankan(db, sql, (sebelum, int(after_id), int(limit)), _surat).fetchall()
+
+    def hapus_permanen(self, ids):
+        """Hapus permanen (SATU transaksi), hanya surat yang masih ditandai terhapus."""
+        ids = list(ids)
+        jumlah = 0
+        with db_transaction() as db:
+            for potongan in _potong(ids):
+                jumlah += _jalankan(db, f"DELETE FROM surat WHERE id IN ({','.join('?' * len(potongan))}) "
+                                        "AND dihapus_pada IS NOT NULL", potongan).rowcount
+        catat("hapus_permanen", "surat", ids)
+        return jumlah
+
+    def stats(self, tahun=0, bulan=0):
+        """
+        Jumlah surat per kategori, mis. {'masuk': 10, 'keluar': 4, 'dokumen': 2}.
+        Dibaca dari tabel counter statistik_surat (dijaga trigger), bukan COUNT(*).
+        tahun=0 -> semua tahun, bulan=0 -> semua bulan dalam tahun tsb.
+        """
+        stats = {'masuk': 0, 'keluar': 0, 'dokumen': 0}
+        with db_session() as db:
+            # kategori IN (...) agar pencarian memakai primary key (kategori, tahun, bulan)
+            cursor = _jalankan(db, "SELECT kategori, jumlah FROM statistik_surat WHERE kategori IN (?, ?, ?) AND tahun = ? AND bulan = ?",
+                               (*stats, int(tahun or 0), int(bulan or 0)))
+            for kat, jml in cursor.fetchall():
+                stats[kat] = jml
+        return stats
+
+    def cek_statistik(self):
+        """Daftar selisih (kategori, tahun, bulan, counter, sebenarnya) antara statistik_surat & tabel surat."""
+        with db_session() as db:
+            return _jalankan(db, """
+                WITH aktif AS (SELECT kategori, tahun, bulan FROM surat WHERE dihapus_pada IS NULL),
+                sebenarnya AS (
+                    SELECT ifnull(kategori, '') AS kategori, 0 AS tahun, 0 AS bulan, COUNT(*) AS jumlah FROM aktif GROUP BY 1
+                    UNION ALL
+                    SELECT ifnull(kategori, ''), tahun, 0, COUNT(*) FROM aktif WHERE tahun IS NOT NULL GROUP BY 1, 2
+                    UNION ALL
+                    SELECT ifnull(kategori, ''), tahun, bulan, COUNT(*) FROM aktif
+                    WHERE tahun IS NOT NULL AND bulan IS NOT NULL GROUP BY 1, 2, 3
+                ),
+                semua AS (
+                    SELECT kategori, tahun, bulan FROM sebenarnya
+                    UNION
+                    SELECT kategori, tahun, bulan FROM statistik_surat
+                )
+                SELECT a.kategori, a.tahun, a.bulan, ifnull(st.jumlah, 0), ifnull(sb.jumlah, 0)
+                FROM semua a
+                LEFT JOIN statistik_surat st USING (kategori, tahun, bulan)
+                LEFT JOIN sebenarnya sb ON sb.kategori = a.kategori AND sb.tahun = a.tahun AND sb.bulan = a.bulan
+                WHERE ifnull(st.jumlah, 0) != ifnull(sb.jumlah, 0)
+            """).fetchall()
+
+    def rebuild_statistik(self):
+        """Menghitung ulang seluruh counter statistik_surat dari tabel surat."""
+        with db_transaction() as db:
+            rebuild_statistik(db)
+
+
+class KodeSuratRepository:
+    """Akses data tabel kode_surat (referensi klasifikasi)."""
+
+    def list_all(self, urut="kode"):
+        kolom_urut = "keterangan" if urut == "keterangan" else "kode"
+        with db_session() as db:
+            sql = f"SELECT id, kode, keterangan FROM kode_surat ORDER BY {kolom_urut} ASC"
+            return _jalankan(db, sql, (), _kode_surat).fetchall()
+
+    def cari(self, keyword, limit=BATAS_HASIL_GLOBAL):
+        """
+        Pencarian global: (jumlah, baris teratas) kode surat yang kode / keterangannya
+        cocok `keyword`, lewat indeks kode_surat_fts (v12), paling relevan dulu.
+        """
+        query_fts = buat_query_fts(keyword or "")
+        if not query_fts or not urai_query(keyword).sederhana:
+            # Sintaks pencarian (dari:, nomor:, ...) hanya berlaku untuk surat
+            return 0, []
+        with db_session() as db:
+            jumlah = _jalankan(db, "SELECT COUNT(*) FROM kode_surat_fts WHERE kode_surat_fts MATCH ?",
+                               (query_fts,)).fetchone()[0]
+            rows = _jalankan(db, f"""
+                SELECT k.id, k.kode, k.keterangan FROM kode_surat_fts
+                JOIN kode_surat k ON k.id = kode_surat_fts.rowid
+                WHERE kode_surat_fts MATCH ?
+                ORDER BY bm25(kode_surat_fts, {", ".join(str(b) for b in BOBOT_BM25_KODE)}) LIMIT ?
+            """, (query_fts, int(limit)), _kode_surat).fetchall()
+        return jumlah, rows
+
+    def keterangan_dipakai(self, keterangan, kecuali_id=None):
+        """Cek keterangan duplikat (opsional: abaikan id yang sedang diedit)."""
+        with db_session() as db:
+            if kecuali_id:
+                cursor = _jalankan(db, "SELECT id FROM kode_surat WHERE keterangan=? AND id!=?", (keterangan, kecuali_id))
+            else:
+                cursor = _jalankan(db, "SELECT id FROM kode_surat WHERE keterangan=?", (keterangan,))
+            return cursor.fetchone() is not None
+
+    def insert(self, kode, keterangan):
+        with db_transaction() as db:
+            id_kode = _jalankan(db, "INSERT INTO kode_surat (kode, keterangan) VALUES (?, ?)", (kode, keterangan)).lastrowid
+        catat("tambah", "kode_surat", [id_kode], kode)
+        return id_kode
+
+    def update(self, id_kode, kode, keterangan):
+        with db_transaction() as db:
+            _jalankan(db, "UPDATE kode_surat SET kode=?, keterangan=? WHERE id=?", (kode, keterangan, id_kode))
+        catat("ubah", "kode_surat", [id_kode], kode)
+
+    def delete(self, id_kode):
+        with db_transaction() as db:
+            _jalankan(db, "DELETE FROM kode_surat WHERE id=?", (id_kode,))
+        catat("hapus", "kode_surat", [id_kode])
+
+
+class AuditLogRepository:
+    """Query riwayat perubahan (tabel audit_log, ditulis oleh audit_log.py)."""
+
+    def riwayat(self, id_rekaman, tabel="surat"):
+        """Semua catatan satu rekaman, urut waktu (indeks tabel, id_rekaman, waktu)."""
+        # Catatan yang masih di buffer ikut ditulis dulu agar riwayat lengkap
+        pencatat_audit().flush()
+        with db_session() as db:
+            sql = f"SELECT {KOLOM_AUDIT} FROM audit_log WHERE tabel = ? AND id_rekaman = ? ORDER BY waktu, id"
+            return _jalankan(db, sql, (tabel, int(id_rekaman)), _audit).fetchall()
+
+    def list_rentang(self, dari, sampai, setelah=None, limit=100):
+        """
+        Catatan dengan tanggal dari..sampai (yyyy-MM-dd, inklusif), terbaru dulu.
+        Keyset pagination lewat indeks waktu: halaman pertama setelah=None,
+        halaman berikutnya setelah = AuditRecord terakhir halaman sebelumnya.
+        """
+        pencatat_audit().flush()
+        batas_akhir = date.fromordinal(date.fromisoformat(str(sampai)[:10]).toordinal() + 1).isoformat()
+        where = "waktu >= ? AND waktu < ?"
+        params = [str(dari)[:10], batas_akhir]
+        if setelah is not None:
+            where += " AND (waktu, id) < (?, ?)"
+            params += [setelah.waktu, int(setelah.id)]
+        with db_session() as db:
+            sql = f"SELECT {KOLOM_AUDIT} FROM audit_log WHERE {where} ORDER BY waktu DESC, id DESC LIMIT ?"
+            return _jalankan(db, sql, params + [int(limit)], _audit).fetchall()
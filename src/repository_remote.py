@@ -0,0 +1,178 @@
+import json
+import os
+import shutil
+import tempfile
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, quote
+from urllib.request import Request, urlopen
+from .repository import SuratRepository, KodeSuratRepository, SuratRecord, KodeSuratRecord, KOLOM_TULIS
+from .pencarian import NilaiMirip, BATAS_HASIL_GLOBAL
+from .settings import get_server_url, get_server_token
+from .audit_log import pengguna_lokal
+
+# =====================================================================
+# REPOSITORY LEWAT SERVER ARSIP
+# ---------------------------------------------------------------------
+# Pengganti SuratRepository / KodeSuratRepository saat "server_url" diisi
+# di config.json. Method & nilai kembaliannya sama, jadi halaman tidak
+# perlu tahu data dibaca dari database lokal atau dari server_arsip.py.
+# Buat repository lewat surat_repository() / kode_surat_repository().
+# =====================================================================
+
+TIMEOUT_DETIK = 15
+
+
+def surat_repository():
+    url = get_server_url()
+    return SuratRepositoryRemote(url) if url else SuratRepository()
+
+
+def kode_surat_repository():
+    url = get_server_url()
+    return KodeSuratRepositoryRemote(url) if url else KodeSuratRepository()
+
+
+class _KlienApi:
+    def __init__(self, url, token=None):
+        self.url = url.rstrip("/")
+        self.token = get_server_token() if token is None else token
+        self.pengguna = pengguna_lokal()
+
+    def _buka(self, metode, path, params=None, data=None):
+        url = f"{self.url}/api/{path}"
+        if params:
+            url += "?" + urlencode([(k, v) for k, v in params if v is not None and v != ""])
+        badan = json.dumps(data).encode("utf-8") if data is not None else None
+        req = Request(url, data=badan, method=metode)
+        # Dicatat server di audit_log sebagai pelaku penulisan (header harus ASCII)
+        req.add_header("X-Pengguna", quote(self.pengguna))
+        req.add_header("Authorization", f"Bearer {self.token}")
+        if badan is not None:
+            req.add_header("Content-Type", "application/json; charset=utf-8")
+        try:
+            return urlopen(req, timeout=TIMEOUT_DETIK)
+        except HTTPError as e:
+            try:
+                pesan = json.loads(e.read().decode("utf-8")).get("error") or str(e)
+            except Exception:
+                pesan = str(e)
+            raise RuntimeError(f"Server arsip: {pesan}") from e
+        except URLError as e:
+            raise ConnectionError(f"Server arsip ({self.url}) tidak dapat dihubungi: {e.reason}") from e
+
+    def _minta(self, metode, path, params=None, data=None):
+        with self._buka(metode, path, params, data) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+
+
+def _params_filter(filter_surat):
+    return [("kategori", filter_surat.kategori), ("keyword", filter_surat.keyword),
+            ("tahun", filter_surat.tahun), ("dari", filter_surat.tanggal_dari),
+            ("sampai", filter_surat.tanggal_sampai), ("mirip", 1 if filter_surat.mirip else None),
+            ("surat_dari", filter_surat.tanggal_surat_dari), ("surat_sampai", filter_surat.tanggal_surat_sampai)]
+
+
+class SuratRepositoryRemote(_KlienApi):
+    """Sama seperti SuratRepository, tetapi lewat API server arsip."""
+
+    def list_page(self, filter_surat, after_id=None, limit=10):
+        rows = self._minta("GET", "surat", _params_filter(filter_surat) + [("after_id", after_id), ("limit", limit)])
+        return [SuratRecord(**r) for r in rows]
+
+    def list_all(self, filter_surat):
+        return [SuratRecord(**r) for r in self._minta("GET", "surat/semua", _params_filter(filter_surat))]
+
+    def count(self, filter_surat):
+        return self._minta("GET", "surat/jumlah", _params_filter(filter_surat))["jumlah"]
+
+    def _fitur(self):
+        # Ditanyakan sekali saja: fitur database server tidak berubah selama aplikasi berjalan
+        if getattr(self, "_fitur_server", None) is None:
+            self._fitur_server = self._minta("GET", "surat/fitur")
+        return self._fitur_server
+
+    def pakai_trigram(self):
+        return self._fitur()["trigram"]
+
+    def pakai_mirip(self):
+        return self._fitur().get("mirip", False)
+
+    def cari_mirip(self, kategori, keyword):
+        return [NilaiMirip(*r) for r in self._minta("GET", "surat/mirip", [("kategori", kategori), ("keyword", keyword)])]
+
+    def cari_global(self, kategori, keyword, limit=BATAS_HASIL_GLOBAL):
+        hasil = self._minta("GET", "surat/global", [("kategori", kategori), ("keyword", keyword), ("limit", limit)])
+        return hasil["jumlah"], [SuratRecord(**r) for r in hasil["rows"]]
+
+    def lokasi(self, filter_surat, id_surat, per_halaman=10):
+        hasil = self._minta("GET", "surat/lokasi", _params_filter(filter_surat)
+                            + [("id", id_surat), ("per_halaman", per_halaman)])
+        return tuple(hasil) if hasil else None
+
+    def list_kandidat(self, filter_surat):
+        return [tuple(r) for r in self._minta("GET", "surat/kandidat", _params_filter(filter_surat))]
+
+    def list_tahun(self, kategori):
+        return self._minta("GET", "surat/tahun", [("kategori", kategori)])
+
+    def get_many(self, ids):
+        ids = list(ids)
+        if not ids: return []
+        return [SuratRecord(**r) for r in self._minta("GET", "surat/ambil", [("id", i) for i in ids])]
+
+    def insert(self, kategori, tanggal, asal_surat="", nomor_surat="", tanggal_surat=None,
+               judul_surat="", keterangan="", file_path=""):
+        data = dict(zip(KOLOM_TULIS, (kategori, tanggal, asal_surat, nomor_surat, tanggal_surat,
+                                      judul_surat, keterangan, file_path)))
+        return self._minta("POST", "surat", data=data)["id"]
+
+    def update(self, id_surat, **kolom):
+        kolom = {k: v for k, v in kolom.items() if k in KOLOM_TULIS}
+        if not kolom: return
+        self._minta("PATCH", f"surat/{int(id_surat)}", data=kolom)
+
+    def tandai_dihapus(self, ids):
+        return self._minta("POST", "surat/hapus", data={"ids": [int(i) for i in ids]})["jumlah"]
+
+    def pulihkan(self, ids):
+        return self._minta("POST", "surat/pulihkan", data={"ids": [int(i) for i in ids]})["jumlah"]
+
+    def stats(self, tahun=0, bulan=0):
+        return self._minta("GET", "statistik", [("tahun", tahun), ("bulan", bulan)])
+
+    def berkas_lokal(self, id_surat, file_path):
+        """
+        Path berkas yang bisa dibuka di komputer ini: path aslinya jika terjangkau
+        (mis. folder upload di network share), jika tidak diunduh dari server.
+        """
+        if file_path and os.path.exists(file_path):
+            return file_path
+        folder = os.path.join(tempfile.gettempdir(), "arsip_unduhan")
+        os.makedirs(folder, exist_ok=True)
+        tujuan = os.path.join(folder, f"{int(id_surat)}_{os.path.basename(file_path or 'berkas')}")
+        with self._buka("GET", f"berkas/{int(id_surat)}") as resp, open(tujuan, "wb") as f:
+            shutil.copyfileobj(resp, f, 64 * 1024)
+        return tujuan
+
+
+class KodeSuratRepositoryRemote(_KlienApi):
+    """Sama seperti KodeSuratRepository, tetapi lewat API server arsip."""
+
+    def list_all(self, urut="kode"):
+        return [KodeSuratRecord(**r) for r in self._minta("GET", "kode_surat", [("urut", urut)])]
+
+    def cari(self, keyword, limit=BATAS_HASIL_GLOBAL):
+        hasil = self._minta("GET", "kode_surat/cari", [("keyword", keyword), ("limit", limit)])
+        return hasil["jumlah"], [KodeSuratRecord(**r) for r in hasil["rows"]]
+
+    def keterangan_dipakai(self, keterangan, kecuali_id=None):
+        return self._minta("GET", "kode_surat/cek", [("keterangan", keterangan), ("kecuali_id", kecuali_id)])["dipakai"]
+
+    def insert(self, kode, keterangan):
+        return self._minta("POST", "kode_surat", data={"kode": kode, "keterangan": keterangan})["id"]
+
+    def update(self, id_kode, kode, keterangan):
+        self._minta("PUT", f"kode_surat/{int(id_kode)}", data={"kode": kode, "keterangan": keterangan})
+
+    def delete(self, id_kode):
+        self._minta("DELETE", f"kode_surat/{int(id_kode)}")
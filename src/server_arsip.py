@@ -0,0 +1,331 @@
+import hmac
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, quote, unquote
+from .audit_log import atas_nama
+from .repository import SuratRepository, KodeSuratRepository, FilterSurat, KOLOM_TULIS, nomor_hari
+from .pencarian import BATAS_HASIL_GLOBAL
+from .settings import di_folder_penyimpanan
+
+# =====================================================================
+# SERVER ARSIP (MODE SERVER, OPSIONAL)
+# ---------------------------------------------------------------------
+# SQLite di network share (SMB) tidak cocok untuk banyak pengguna. Dalam
+# mode server, SATU proses ini yang membuka arsip_digital.db, dan aplikasi
+# desktop di komputer lain memakai API HTTP/JSON-nya (repository_remote.py)
+# dengan mengisi "server_url" di config.json.
+#
+#   - Setiap request dilayani thread dari pool tetap; setiap thread memakai
+#     koneksi SQLite miliknya sendiri, jadi pool thread = pool koneksi.
+#   - Hasil query daftar yang sering diminta disimpan di cache LRU, yang
+#     dikosongkan setiap ada penulisan lewat server (dan kedaluwarsa sendiri
+#     untuk menangkap perubahan dari luar server).
+#   - Berkas surat dikirim bertahap (streaming), tidak dibaca utuh ke memori.
+#     file_path dari klien & berkas yang dikirim wajib berada di dalam folder
+#     penyimpanan (settings.di_folder_penyimpanan).
+#   - Setiap request wajib membawa token bersama ("server_token" di
+#     config.json) di header Authorization: Bearer <token>.
+#   - Penulisan dicatat di audit_log atas nama pengguna yang DIAKU klien
+#     (header X-Pengguna) beserta alamat IP pengirimnya.
+#
+# Menjalankan server: python tools/server_arsip.py --port 8765
+# =====================================================================
+
+UKURAN_POTONGAN_BERKAS = 64 * 1024
+
+
+class CacheQuery:
+    """Cache LRU hasil query baca, kunci = alamat + parameter request."""
+
+    def __init__(self, ukuran=256, umur=5.0):
+        self.ukuran = ukuran
+        self.umur = umur                # detik
+        self._data = OrderedDict()      # kunci -> (waktu_simpan, isi)
+        self._generasi = 0
+        self._lock = threading.Lock()
+        self.hit = 0
+        self.miss = 0
+
+    def ambil(self, kunci, buat):
+        """Isi dari cache, atau panggil buat() lalu simpan hasilnya."""
+        with self._lock:
+            simpanan = self._data.get(kunci)
+            if simpanan and time.monotonic() - simpanan[0] < self.umur:
+                self._data.move_to_end(kunci)
+                self.hit += 1
+                return simpanan[1]
+            self.miss += 1
+            generasi = self._generasi
+
+        isi = buat()
+        with self._lock:
+            # Jangan simpan hasil yang dihitung sebelum ada penulisan (sudah basi)
+            if generasi == self._generasi:
+                self._data[kunci] = (time.monotonic(), isi)
+                self._data.move_to_end(kunci)
+                while len(self._data) > self.ukuran:
+                    self._data.popitem(last=False)
+        return isi
+
+    def kosongkan(self):
+        with self._lock:
+            self._data.clear()
+            self._generasi += 1
+
+
+class GagalPermintaan(Exception):
+    def __init__(self, status, pesan):
+        super().__init__(pesan)
+        self.status = status
+
+
+def _int(params, nama, default=None):
+    nilai = params.get(nama, [""])[0]
+    if nilai == "": return default
+    try:
+        return int(nilai)
+    except ValueError:
+        raise GagalPermintaan(400, f"Parameter '{nama}' harus berupa angka")
+
+
+def _teks(params, nama, default=""):
+    return params.get(nama, [default])[0]
+
+
+def _filter(params):
+    kategori = _teks(params, "kategori")
+    if not kategori:
+        raise GagalPermintaan(400, "Parameter 'kategori' wajib diisi")
+    rentang = [_teks(params, nama) or None for nama in ("dari", "sampai", "surat_dari", "surat_sampai")]
+    for tanggal in rentang:
+        try:
+            if tanggal: nomor_hari(tanggal)
+        except ValueError:
+            raise GagalPermintaan(400, f"Tanggal '{tanggal}' harus berformat yyyy-MM-dd")
+    return FilterSurat(kategori, _teks(params, "keyword"), _int(params, "tahun"), *rentang[:2],
+                       mirip=bool(_int(params, "mirip", 0)),
+                       tanggal_surat_dari=rentang[2], tanggal_surat_sampai=rentang[3])
+
+
+def _rekam(rows):
+    return [r._asdict() for r in rows]
+
+
+def _hasil(jumlah_rows):
+    jumlah, rows = jumlah_rows
+    return {"jumlah": jumlah, "rows": _rekam(rows)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "ServerArsip/1.0"
+
+    # --- Routing ---------------------------------------------------------
+    def do_GET(self):
+        self._layani("GET")
+
+    def do_POST(self):
+        self._layani("POST")
+
+    def do_PUT(self):
+        self._layani("PUT")
+
+    def do_PATCH(self):
+        self._layani("PATCH")
+
+    def do_DELETE(self):
+        self._layani("DELETE")
+
+    def _layani(self, metode):
+        url = urlsplit(self.path)
+        bagian = [b for b in url.path.split("/") if b]
+        params = parse_qs(url.query)
+        try:
+            if bagian[:1] != ["api"]:
+                raise GagalPermintaan(404, "Alamat tidak dikenal")
+            self._cek_token()
+            if metode == "GET" and bagian[1:2] == ["berkas"] and len(bagian) == 3:
+                return self._kirim_berkas(bagian[2])
+            # Nama pengguna hanya pengakuan klien; alamat IP dicatat dari koneksinya sendiri
+            pengguna = unquote(self.headers.get("X-Pengguna") or "") or "?"
+            with atas_nama(f"{pengguna} (via server dari {self.client_address[0]})"):
+                hasil = self._proses(metode, bagian[1:], params)
+            self._kirim_json(200, hasil)
+        except GagalPermintaan as e:
+            self._kirim_json(e.status, {"error": str(e)})
+        except Exception as e:
+            print(f"Error Server Arsip: {e}")
+            self._kirim_json(500, {"error": str(e)})
+
+    def _proses(self, metode, bagian, params):
+        repo = self.server.repo
+        repo_kode = self.server.repo_kode
+        cache = self.server.cache
+        kunci = (tuple(bagian), tuple(sorted((k, tuple(v)) for k, v in params.items())))
+
+        if metode == "GET":
+            if bagian == ["surat"]:
+                return cache.ambil(kunci, lambda: _rekam(repo.list_page(
+                    _filter(params), _int(params, "after_id"), _int(params, "limit", 10))))
+            if bagian == ["surat", "semua"]:
+                return cache.ambil(kunci, lambda: _rekam(repo.list_all(_filter(params))))
+            if bagian == ["surat", "jumlah"]:
+                return cache.ambil(kunci, lambda: {"jumlah": repo.count(_filter(params))})
+            if bagian == ["surat", "fitur"]:
+                return {"trigram": repo.pakai_trigram(), "mirip": repo.pakai_mirip()}
+            if bagian == ["surat", "mirip"]:
+                return cache.ambil(kunci, lambda: repo.cari_mirip(_teks(params, "kategori"), _teks(params, "keyword")))
+            if bagian == ["surat", "global"]:
+                return cache.ambil(kunci, lambda: _hasil(repo.cari_global(
+                    _teks(params, "kategori"), _teks(params, "keyword"), _int(params, "limit", BATAS_HASIL_GLOBAL))))
+            if bagian == ["surat", "lokasi"]:
+                return cache.ambil(kunci, lambda: repo.lokasi(
+                    _filter(params), _int(params, "id", 0), _int(params, "per_halaman", 10)))
+            if bagian == ["surat", "kandidat"]:
+                return cache.ambil(kunci, lambda: repo.list_kandidat(_filter(params)))
+            if bagian == ["surat", "tahun"]:
+                return cache.ambil(kunci, lambda: repo.list_tahun(_teks(params, "kategori")))
+            if bagian == ["surat", "ambil"]:
+                return _rekam(repo.get_many(int(i) for i in params.get("id", []) if i.isdigit()))
+            if bagian == ["statistik"]:
+                return cache.ambil(kunci, lambda: repo.stats(_int(params, "tahun", 0), _int(params, "bulan", 0)))
+            if bagian == ["kode_surat"]:
+                return cache.ambil(kunci, lambda: _rekam(repo_kode.list_all(_teks(params, "urut", "kode"))))
+            if bagian == ["kode_surat", "cari"]:
+                return cache.ambil(kunci, lambda: _hasil(repo_kode.cari(
+                    _teks(params, "keyword"), _int(params, "limit", BATAS_HASIL_GLOBAL))))
+            if bagian == ["kode_surat", "cek"]:
+                return {"dipakai": repo_kode.keterangan_dipakai(_teks(params, "keterangan"),
+                                                                _int(params, "kecuali_id"))}
+            raise GagalPermintaan(404, "Alamat tidak dikenal")
+
+        hasil = self._tulis(metode, bagian, self._baca_json())
+        # Penulisan yang berhasil membuat isi cache basi
+        cache.kosongkan()
+        return hasil
+
+    def _tulis(self, metode, bagian, data):
+        repo = self.server.repo
+        repo_kode = self.server.repo_kode
+        if metode == "POST" and bagian == ["surat"]:
+            kolom = self._kolom_surat(data)
+            if not kolom.get("kategori") or not kolom.get("tanggal"):
+                raise GagalPermintaan(400, "Kolom 'kategori' dan 'tanggal' wajib diisi")
+            return {"id": repo.insert(**kolom)}
+        if metode == "PATCH" and bagian[:1] == ["surat"] and len(bagian) == 2:
+            repo.update(self._id(bagian[1]), **self._kolom_surat(data))
+            return {"ok": True}
+        if metode == "POST" and bagian == ["surat", "hapus"]:
+            return {"jumlah": repo.tandai_dihapus(self._ids(data))}
+        if metode == "POST" and bagian == ["surat", "pulihkan"]:
+            return {"jumlah": repo.pulihkan(self._ids(data))}
+        if metode == "POST" and bagian == ["kode_surat"]:
+            return {"id": repo_kode.insert(data.get("kode", ""), data.get("keterangan", ""))}
+        if metode == "PUT" and bagian[:1] == ["kode_surat"] and len(bagian) == 2:
+            repo_kode.update(self._id(bagian[1]), data.get("kode", ""), data.get("keterangan", ""))
+            return {"ok": True}
+        if metode == "DELETE" and bagian[:1] == ["kode_surat"] and len(bagian) == 2:
+            repo_kode.delete(self._id(bagian[1]))
+            return {"ok": True}
+        raise GagalPermintaan(404, "Alamat tidak dikenal")
+
+    # --- Helper ----------------------------------------------------------
+    def _cek_token(self):
+        jenis, _, token = (self.headers.get("Authorization") or "").partition(" ")
+        if jenis.lower() != "bearer" or not hmac.compare_digest(token.strip().encode("utf-8"),
+                                                                self.server.token.encode("utf-8")):
+            raise GagalPermintaan(401, "Token server arsip tidak valid (cek server_token di config.json)")
+
+    def _id(self, teks):
+        if not teks.isdigit():
+            raise GagalPermintaan(400, "id tidak valid")
+        return int(teks)
+
+    def _ids(self, data):
+        ids = data.get("ids", [])
+        if not isinstance(ids, list) or not all(isinstance(i, int) or str(i).isdigit() for i in ids):
+            raise GagalPermintaan(400, "'ids' harus berupa daftar angka")
+        return [int(i) for i in ids]
+
+    def _kolom_surat(self, data):
+        """Hanya kolom KOLOM_TULIS; file_path wajib berada di dalam folder penyimpanan server."""
+        kolom = {k: data[k] for k in KOLOM_TULIS if k in data}
+        path = kolom.get("file_path")
+        if path and not (isinstance(path, str) and di_folder_penyimpanan(path)):
+            raise GagalPermintaan(400, "file_path harus berada di dalam folder penyimpanan arsip")
+        return kolom
+
+    def _baca_json(self):
+        panjang = int(self.headers.get("Content-Length") or 0)
+        if not panjang: return {}
+        try:
+            data = json.loads(self.rfile.read(panjang).decode("utf-8"))
+        except ValueError:
+            raise GagalPermintaan(400, "Body harus berupa JSON")
+        if not isinstance(data, dict):
+            raise GagalPermintaan(400, "Body harus berupa objek JSON")
+        return data
+
+    def _kirim_json(self, status, isi):
+        badan = json.dumps(isi).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(badan)))
+        self.end_headers()
+        self.wfile.write(badan)
+
+    def _kirim_berkas(self, teks_id):
+        """Berkas dicari lewat id surat (bukan path dari klien), lalu dikirim bertahap."""
+        rows = self.server.repo.get_many([self._id(teks_id)])
+        path = rows[0].file_path if rows else ""
+        # Baris lama / dari luar server bisa berisi path sembarang: hanya kirim isi folder penyimpanan
+        if not path or not di_folder_penyimpanan(path) or not os.path.isfile(path):
+            raise GagalPermintaan(404, "Berkas tidak ditemukan")
+        with open(path, "rb") as f:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+            self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(os.path.basename(path))}")
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile, UKURAN_POTONGAN_BERKAS)
+
+    def log_message(self, format, *args):
+        # Log per request dimatikan agar console tidak banjir saat banyak klien
+        pass
+
+
+class ServerArsip(HTTPServer):
+    """HTTP server dengan pool thread tetap (sekaligus pool koneksi SQLite)."""
+
+    # Antrean koneksi TCP yang belum diterima (default 5 terlalu kecil untuk banyak klien)
+    request_queue_size = 128
+
+    def __init__(self, alamat, token, jumlah_worker=8, ukuran_cache=256, umur_cache=5.0):
+        if not token:
+            raise ValueError("Token server arsip wajib diisi (server_token di config.json)")
+        super().__init__(alamat, _Handler)
+        self.token = token
+        self.repo = SuratRepository()
+        self.repo_kode = KodeSuratRepository()
+        self.cache = CacheQuery(ukuran_cache, umur_cache)
+        self.pool = ThreadPoolExecutor(max_workers=jumlah_worker, thread_name_prefix="server-arsip")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._proses_request, request, client_address)
+
+    def _proses_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
@@ -51,4 +51,121 @@ def set_folder_path(kategori, new_path):
     data[f"path_{kategori}"] = new_path
     
     with open(config_path, 'w') as f:
-        json.dump(data, f, indent=4)
\ No newline at end of file
+        json.dump(data, f, indent=4)
+
+def di_folder_penyimpanan(path):
+    """
+    True jika `path` (setelah symlink & '..' diselesaikan) berada DI DALAM salah
+    satu folder penyimpanan surat (uploads/ atau path_masuk/keluar/dokumen).
+    Folder-folder penyimpanan itu sendiri tidak termasuk.
+    """
+    if not path:
+        return False
+    asli = os.path.realpath(path)
+    akar = [os.path.realpath(f) for f in (DEFAULT_BASE, *(get_folder_path(k) for k in ("masuk", "keluar", "dokumen")))]
+    return asli not in akar and any(os.path.commonpath([asli, a]) == a for a in akar)
+
+# --- PROFIL PERFORMA DATABASE (SQLite PRAGMA) ---
+# Bisa di-override lewat config.json, contoh:
+#   "db_profile": {"cache_size": -32000, "journal_mode": "WAL"}
+# WAL (pembaca tidak memblokir penulis) hanya boleh dipakai jika database
+# dibuka dari SATU komputer saja; untuk database bersama di network share
+# (\\server\folder atau drive Z:\) tetap DELETE (lihat db_manager._journal_mode).
+DEFAULT_DB_PROFILE = {
+    "journal_mode": "DELETE",    # Aman untuk database bersama; WAL opsional (opt-in)
+    "synchronous": "NORMAL",     # Hanya berlaku dengan WAL; mode lain selalu FULL
+    "mmap_size": 268435456,      # 256 MB memory-mapped I/O
+    "cache_size": -65536,        # Negatif = KiB, jadi 64 MB page cache per koneksi
+    "temp_store": "MEMORY",      # Tabel/indeks sementara (ORDER BY, GROUP BY) di RAM
+    "busy_timeout": 5000,        # ms menunggu jika database sedang dikunci pengguna lain
+}
+
+def get_db_profile():
+    """
+    Mengambil profil PRAGMA database: nilai default ditimpa oleh
+    'db_profile' di config.json (jika ada).
+    """
+    profile = dict(DEFAULT_DB_PROFILE)
+    config_path = os.path.join(base_dir, CONFIG_FILE)
+
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, 'r') as f:
+                data = json.load(f)
+                custom = data.get("db_profile")
+                if isinstance(custom, dict):
+                    profile.update({k: v for k, v in custom.items() if k in DEFAULT_DB_PROFILE})
+        except Exception:
+            pass
+    return profile
+
+def set_db_profile(profile):
+    """
+    Menyimpan profil PRAGMA database ke config.json.
+    Hanya kunci yang dikenal (lihat DEFAULT_DB_PROFILE) yang disimpan.
+    """
+    config_path = os.path.join(base_dir, CONFIG_FILE)
+    data = {}
+
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, 'r') as f:
+                data = json.load(f)
+        except:
+            data = {}
+
+    data["db_profile"] = {k: v for k, v in profile.items() if k in DEFAULT_DB_PROFILE}
+
+    with open(config_path, 'w') as f:
+        json.dump(data, f, indent=4)
+
+# --- MODE SERVER (OPSIONAL) ---
+# Jika "server_url" diisi di config.json (mis. "http://192.168.1.10:8765"),
+# halaman-halaman membaca & menulis data lewat server arsip (server_arsip.py),
+# bukan langsung membuka arsip_digital.db. "server_token" wajib sama dengan
+# token di config.json komputer server.
+def get_server_url():
+    """URL server arsip, atau string kosong jika memakai database lokal."""
+    config_path = os.path.join(base_dir, CONFIG_FILE)
+
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, 'r') as f:
+                data = json.load(f)
+                return str(data.get("server_url") or "").strip().rstrip("/")
+        except Exception:
+            return ""
+    return ""
+
+# Token bersama antara server arsip & semua komputer klien ("server_token" di
+# config.json). Server menolak permintaan tanpa token yang sama.
+def get_server_token():
+    """Token server arsip, atau string kosong jika belum diatur."""
+    config_path = os.path.join(base_dir, CONFIG_FILE)
+
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, 'r') as f:
+                data = json.load(f)
+                return str(data.get("server_token") or "").strip()
+        except Exception:
+            return ""
+    return ""
+
+# --- PENCARIAN ---
+# Jeda (ms) setelah berhenti mengetik sebelum pencarian dijalankan, bisa diubah
+# lewat "jeda_pencarian_ms" di config.json (0 = langsung di setiap ketukan).
+DEFAULT_JEDA_PENCARIAN_MS = 300
+
+def get_jeda_pencarian():
+    """Jeda debounce kotak pencarian dalam milidetik."""
+    config_path = os.path.join(base_dir, CONFIG_FILE)
+
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, 'r') as f:
+                data = json.load(f)
+                return max(0, int(data.get("jeda_pencarian_ms", DEFAULT_JEDA_PENCARIAN_MS)))
+        except Exception:
+            return DEFAULT_JEDA_PENCARIAN_MS
+    return DEFAULT_JEDA_PENCARIAN_MS
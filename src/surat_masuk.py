@@ -6,15 +6,19 @@ from datetime import datetime
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QTableWidget, QTableWidgetItem, 
                              QLineEdit, QHeaderView, QMessageBox, QAbstractItemView,
-                             QFileDialog, QDialog, QCheckBox, QComboBox, 
+                             QFileDialog, QDialog, QCheckBox, QComboBox, QDateEdit,
                              QStyledItemDelegate, QStyleOptionViewItem)
 from PyQt6.QtCore import Qt, QDate
-from send2trash import send2trash
 # --- IMPORT KHUSUS UNTUK STYLING EXCEL ---
 from openpyxl.styles import Border, Side, Alignment, Font, PatternFill
 from openpyxl.utils import get_column_letter
 # -----------------------------------------
-from .db_manager import connect_db
+from .repository import FilterSurat
+from .repository_remote import surat_repository
+from .query_worker import QueryExecutor, PencarianTertunda
+from .pencarian import muat_awal, urai_query, BANTUAN_SINTAKS
+from .db_manager import versi_data
+from .trash_worker import antrean_sampah
 from .form_surat import FormTambahSurat
 from .settings import get_folder_path, set_folder_path
 
@@ -37,19 +41,29 @@ class NumericTableWidgetItem(QTableWidgetItem):
         except ValueError: return super().__lt__(other)
 
 class DateTableWidgetItem(QTableWidgetItem):
+    # Sorting memakai nomor hari dari database, tanpa parse teks tanggal di setiap perbandingan
+    def __init__(self, teks, hari=None):
+        super().__init__(teks)
+        self.hari = hari
+
     def __lt__(self, other):
-        try:
-            d1 = QDate.fromString(self.text(), "dd/MM/yyyy")
-            d2 = QDate.fromString(other.text(), "dd/MM/yyyy")
-            return d1 < d2
-        except: return super().__lt__(other)
+        hari_lain = getattr(other, "hari", None)
+        if self.hari is None or hari_lain is None: return super().__lt__(other)
+        return self.hari < hari_lain
 # ---------------------
 
 class SuratMasuk(QWidget):
     def __init__(self):
         super().__init__()
-        self.all_data = []      
-        self.filtered_data = [] 
+        self.repo = surat_repository()
+        self.executor = QueryExecutor(self)
+        self._versi_tampil = None   # versi_data() saat halaman terakhir dimuat
+        self._kandidat = None       # Hasil pencarian terakhir, untuk dipersempit (pencarian.py)
+        self._dituju = None         # id surat dari pencarian global, dicari halamannya saat filter_data
+        antrean_sampah().laporan.connect(self.laporan_sampah)
+        self.page_data = []     # Hanya baris halaman yang sedang tampil
+        self.page_anchors = [None]
+        self.total_rows = 0
         self.current_page = 1
         self.rows_per_page = 10
         self.create_check_icon()
@@ -119,7 +133,21 @@ class SuratMasuk(QWidget):
         # [UPDATE] Placeholder diperbarui
         self.search_input.setPlaceholderText("🔍 Cari Pengirim (Dari), Nomor, Perihal, atau Keterangan...")
         self.search_input.setStyleSheet("padding: 12px; border: 1px solid #dcdde1; border-radius: 8px; background: white; color: black; font-size: 13px;")
-        self.search_input.textChanged.connect(self.filter_data)
+        self.search_input.setToolTip(BANTUAN_SINTAKS)
+        # Query dijalankan setelah berhenti mengetik; query lama dibatalkan di setiap ketukan
+        self.pencarian = PencarianTertunda(self.search_input, self.filter_data,
+                                           batalkan=lambda: self.executor.batalkan("data"))
+        # Pencarian mirip: pengirim & perihal, toleran salah ketik (pencarian.py)
+        self.chk_mirip = QCheckBox("Mirip")
+        self.chk_mirip.setToolTip("Cari pengirim / perihal yang mirip, toleran salah ketik\n"
+                                  "(mis. 'pendidkan' atau singkatan 'disdik')")
+        self.chk_mirip.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.chk_mirip.setStyleSheet(f"""
+            QCheckBox {{ color: #2c3e50; font-size: 13px; spacing: 6px; }}
+            QCheckBox::indicator {{ width: 18px; height: 18px; border: 1px solid #bdc3c7; background-color: white; border-radius: 3px; }}
+            QCheckBox::indicator:checked {{ background-color: #27ae60; border: 1px solid #27ae60; image: url({self.check_icon_path}); }}
+        """)
+        self.chk_mirip.toggled.connect(lambda *args: self.pencarian.jalankan_sekarang())
         
         self.combo_tahun = QComboBox()
         self.combo_tahun.addItem("Semua Tahun")
@@ -133,10 +161,51 @@ class SuratMasuk(QWidget):
         """)
         self.combo_tahun.currentTextChanged.connect(self.filter_data)
 
+        # Rentang tanggal (mis. laporan bulanan), disaring lewat indeks rentang tanggal
+        self.combo_rentang = QComboBox()
+        self.combo_rentang.addItems(["Semua Tanggal", "Tgl Terima", "Tgl Surat"])
+        self.combo_rentang.setFixedWidth(150)
+        self.combo_rentang.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.combo_rentang.setStyleSheet(self.combo_tahun.styleSheet())
+        self.combo_rentang.currentIndexChanged.connect(self.ubah_rentang)
+
+        hari_ini = QDate.currentDate()
+        self.tgl_dari = QDateEdit(QDate(hari_ini.year(), hari_ini.month(), 1))
+        self.tgl_sampai = QDateEdit(QDate(hari_ini.year(), hari_ini.month(), hari_ini.daysInMonth()))
+        for tgl in (self.tgl_dari, self.tgl_sampai):
+            tgl.setCalendarPopup(True)
+            tgl.setDisplayFormat("dd/MM/yyyy")
+            tgl.setFixedWidth(140)
+            tgl.setEnabled(False)
+            tgl.setStyleSheet("""
+                QDateEdit { padding: 9px; border: 1px solid #dcdde1; border-radius: 8px; background-color: white; color: black; font-size: 13px; }
+                QDateEdit:disabled { background-color: #f0f0f0; color: #95a5a6; }
+                QCalendarWidget QWidget { background-color: white; color: black; }
+                QCalendarWidget QAbstractItemView { selection-background-color: #3498db; selection-color: white; }
+            """)
+            # Tanggal diketik per angka: ditunggu dulu seperti kotak pencarian
+            tgl.dateChanged.connect(self.pencarian.tunda)
+
         search_filter_layout.addWidget(self.search_input)
+        search_filter_layout.addWidget(self.chk_mirip)
         search_filter_layout.addWidget(self.combo_tahun)
         self.main_layout.addLayout(search_filter_layout)
 
+        rentang_layout = QHBoxLayout()
+        rentang_layout.addWidget(self.combo_rentang)
+        rentang_layout.addWidget(self.tgl_dari)
+        rentang_layout.addWidget(QLabel("s/d"))
+        rentang_layout.addWidget(self.tgl_sampai)
+        rentang_layout.addStretch()
+        self.main_layout.addLayout(rentang_layout)
+
+        # Nilai pengirim / perihal yang cocok saat pencarian mirip aktif
+        self.lbl_mirip = QLabel()
+        self.lbl_mirip.setStyleSheet("color: #7f8c8d; font-style: italic;")
+        self.lbl_mirip.setWordWrap(True)
+        self.lbl_mirip.hide()
+        self.main_layout.addWidget(self.lbl_mirip)
+
         # --- TABLE ---
         self.table = QTableWidget()
         self.table.setColumnCount(9)
@@ -175,6 +244,10 @@ class SuratMasuk(QWidget):
         self.btn_next = QPushButton("▶")
         self.label_page = QLabel("Halaman 1 of 1")
         self.label_page.setStyleSheet("color: black; font-weight: bold;")
+        self.lbl_memuat = QLabel("⏳ Memuat data...")
+        self.lbl_memuat.setStyleSheet("color: #7f8c8d; font-style: italic;")
+        self.lbl_memuat.hide()
+        self.executor.sedang_memuat.connect(self.set_memuat)
         style_nav = "QPushButton { color: black; background:#dfe4ea; border-radius:5px; padding:5px 15px; font-weight:bold; }"
         self.btn_prev.setStyleSheet(style_nav)
         self.btn_next.setStyleSheet(style_nav)
@@ -185,6 +258,7 @@ class SuratMasuk(QWidget):
         pagination_layout.addWidget(self.btn_prev)
         pagination_layout.addWidget(self.label_page)
         pagination_layout.addWidget(self.btn_next)
+        pagination_layout.addWidget(self.lbl_memuat)
         pagination_layout.addStretch()
         self.main_layout.addLayout(pagination_layout)
 
@@ -226,29 +300,21 @@ class SuratMasuk(QWidget):
             self.update_label_folder()
             self.notifikasi_custom("Sukses", "Lokasi penyimpanan Surat Masuk berhasil diubah!", QMessageBox.Icon.Information)
 
+    def muat_jika_berubah(self):
+        """Dipanggil saat halaman dibuka dari sidebar: muat ulang hanya jika data sudah berubah."""
+        versi = versi_data()
+        if versi is None or versi != self._versi_tampil:
+            self.load_data()
+
     def load_data(self):
-        try:
-            db = connect_db()
-            if db:
-                cursor = db.cursor()
-                # Kolom: 0:id, 1:tgl_terima, 2:asal_surat(DARI), 3:nomor, 4:tgl_surat, 5:judul, 6:ket, 7:path
-                cursor.execute("SELECT id, tanggal, asal_surat, nomor_surat, tanggal_surat, judul_surat, keterangan, file_path FROM surat WHERE kategori='masuk' ORDER BY id DESC")
-                self.all_data = cursor.fetchall()
-                self.populate_tahun_filter()
-                self.current_page = 1
-                self.filter_data() 
-                db.close()
-        except Exception as e: print(f"Error Load: {e}")
-
-    def populate_tahun_filter(self):
+        # Semua pembacaan database berjalan di background (query_worker.py)
+        self._versi_tampil = versi_data()
+        # Data mungkin sudah berubah: pencarian berikutnya dibaca ulang dari database
+        self._kandidat = None
+        self.executor.jalankan(self.repo.list_tahun, 'masuk', on_selesai=self.populate_tahun_filter, kanal="tahun")
+
+    def populate_tahun_filter(self, list_tahun):
         current_selection = self.combo_tahun.currentText()
-        tahun_set = set()
-        for row in self.all_data:
-            val_tgl = str(row[1]) if row[1] else ""
-            if val_tgl and "-" in val_tgl:
-                try: tahun_set.add(val_tgl.split("-")[0])
-                except: pass
-        list_tahun = sorted(list(tahun_set), reverse=True)
         self.combo_tahun.blockSignals(True)
         self.combo_tahun.clear()
         self.combo_tahun.addItem("Semua Tahun")
@@ -257,38 +323,132 @@ class SuratMasuk(QWidget):
         if index >= 0: self.combo_tahun.setCurrentIndex(index)
         else: self.combo_tahun.setCurrentIndex(0)
         self.combo_tahun.blockSignals(False)
+        self.filter_data()
 
-    def filter_data(self, *args):
-        keyword = self.search_input.text().lower()
+    def buat_filter(self):
+        """Filter sesuai kata kunci, tahun & rentang tanggal yang sedang dipilih."""
         selected_tahun = self.combo_tahun.currentText()
-        self.filtered_data = []
-        for row in self.all_data:
-            # [MODIFIKASI PENCARIAN DI SINI]
-            # row[2] = asal_surat (DARI), row[3] = nomor, row[5] = perihal, row[6] = ket
-            text_data = f"{row[2]} {row[3]} {row[5]} {row[6]}".lower() 
-            
-            row_tahun = ""
-            val_tgl = str(row[1]) if row[1] else ""
-            if val_tgl and "-" in val_tgl:
-                try: row_tahun = val_tgl.split("-")[0]
-                except: pass
-            if (keyword in text_data) and ((selected_tahun == "Semua Tahun") or (selected_tahun == row_tahun)):
-                self.filtered_data.append(row)
+        rentang = {}
+        if self.combo_rentang.currentIndex() > 0:
+            dari, sampai = sorted([self.tgl_dari.date(), self.tgl_sampai.date()])
+            awalan = "tanggal" if self.combo_rentang.currentIndex() == 1 else "tanggal_surat"
+            rentang = {f"{awalan}_dari": dari.toString("yyyy-MM-dd"), f"{awalan}_sampai": sampai.toString("yyyy-MM-dd")}
+        return FilterSurat('masuk', self.search_input.text().strip(),
+                           None if selected_tahun == "Semua Tahun" else int(selected_tahun),
+                           mirip=self.chk_mirip.isChecked(), **rentang)
+
+    def ubah_rentang(self, *args):
+        aktif = self.combo_rentang.currentIndex() > 0
+        self.tgl_dari.setEnabled(aktif)
+        self.tgl_sampai.setEnabled(aktif)
+        self.pencarian.jalankan_sekarang()
+
+    def muat_halaman(self):
+        """
+        Keyset pagination: hanya membaca baris halaman aktif.
+        page_anchors[n] = id terakhir di halaman n (batas awal halaman n+1).
+        """
+        after_id = self.page_anchors[self.current_page - 1]
+        self.executor.jalankan(self.repo.list_page, self.buat_filter(), after_id, self.rows_per_page,
+                               on_selesai=self.display_data, kanal="data")
+
+    def ambil_semua(self, pakai_filter=True):
+        """Semua baris sesuai filter (untuk export), tanpa paging."""
+        return self.repo.list_all(self.buat_filter() if pakai_filter else FilterSurat('masuk'))
+
+    def filter_data(self, *args):
         self.current_page = 1
-        self.display_data(self.filtered_data)
+        self.page_anchors = [None]
+        dituju, self._dituju = self._dituju, None
+        if dituju is not None:
+            # Dari pencarian global: langsung ke halaman yang memuat surat itu
+            self.executor.jalankan(self.repo.lokasi, self.buat_filter(), dituju, self.rows_per_page,
+                                   on_selesai=lambda hasil: self.buka_lokasi(dituju, hasil), kanal="data")
+            return
+        # Jumlah baris + halaman pertama; kata kunci lanjutan cukup disaring dari hasil sebelumnya
+        self.executor.jalankan(muat_awal, self.repo, self.buat_filter(), self.rows_per_page, self._kandidat,
+                               on_selesai=self.tampilkan_awal, kanal="data")
+
+    def tampilkan_awal(self, hasil):
+        self.total_rows, data, self._kandidat, mirip = hasil
+        self.tampilkan_mirip(mirip)
+        self.display_data(data)
+
+    def tampilkan_rekaman(self, id_surat):
+        """Dipanggil pencarian global: filter dikosongkan, lalu buka halaman yang memuat surat `id_surat`."""
+        widget = [self.search_input, self.chk_mirip, self.combo_tahun, self.combo_rentang]
+        for w in widget: w.blockSignals(True)
+        self.search_input.clear()
+        self.chk_mirip.setChecked(False)
+        self.combo_tahun.setCurrentIndex(0)
+        self.combo_rentang.setCurrentIndex(0)
+        self.tgl_dari.setEnabled(False)
+        self.tgl_sampai.setEnabled(False)
+        for w in widget: w.blockSignals(False)
+        self._dituju = id_surat
+        # Daftar tahun ikut dimuat ulang; filter_data setelahnya mencari halaman surat itu
+        self.load_data()
+
+    def buka_lokasi(self, id_surat, hasil):
+        if hasil is None:
+            self.notifikasi_custom("Info", "Surat tidak ditemukan, mungkin sudah dihapus.", QMessageBox.Icon.Warning)
+            self.filter_data()
+            return
+        self.total_rows, self.current_page, anchors = hasil
+        self.page_anchors = list(anchors)
+        self._kandidat = None
+        self.tampilkan_mirip(None)
+        self.executor.jalankan(self.repo.list_page, self.buat_filter(), self.page_anchors[-1], self.rows_per_page,
+                               on_selesai=lambda data: self.sorot_rekaman(id_surat, data), kanal="data")
+
+    def sorot_rekaman(self, id_surat, data):
+        self.display_data(data)
+        for i in range(self.table.rowCount()):
+            widget = self.table.cellWidget(i, 0)
+            chk = widget.findChild(QCheckBox) if widget else None
+            if chk and chk.property("db_id") == id_surat:
+                self.table.selectRow(i)
+                self.table.scrollToItem(self.table.item(i, 1))
+                break
+
+    def tampilkan_mirip(self, mirip):
+        """Pengirim / perihal yang cocok pada pencarian mirip, paling mirip dulu."""
+        teks_cari = self.search_input.text().strip()
+        if mirip is None:
+            # Bukan pencarian mirip: tampilkan bagian sintaks pencarian yang diabaikan
+            peringatan = urai_query(teks_cari).peringatan
+            self.lbl_mirip.setText("⚠ " + "; ".join(peringatan) if peringatan else "")
+            self.lbl_mirip.setVisible(bool(peringatan))
+            return
+        if not teks_cari:
+            self.lbl_mirip.hide()
+            return
+        if mirip:
+            teks = ", ".join(f"{m.nilai} ({m.jumlah})" for m in mirip[:5])
+            lainnya = f" dan {len(mirip) - 5} lainnya" if len(mirip) > 5 else ""
+            self.lbl_mirip.setText(f"≈ Mirip dengan: {teks}{lainnya}")
+        else:
+            self.lbl_mirip.setText("≈ Tidak ada pengirim / perihal yang mirip")
+        self.lbl_mirip.show()
+
+    def set_memuat(self, memuat):
+        """Indikator loading; navigasi halaman dikunci selama query berjalan."""
+        self.lbl_memuat.setVisible(memuat)
+        total_pages = max(1, (self.total_rows + self.rows_per_page - 1) // self.rows_per_page)
+        self.btn_prev.setEnabled(not memuat and self.current_page > 1)
+        self.btn_next.setEnabled(not memuat and self.current_page < total_pages)
 
     def display_data(self, data):
-        self.filtered_data = data
+        self.page_data = data
         self.table.setSortingEnabled(False)
         self.table.setRowCount(0)
         start_idx = (self.current_page - 1) * self.rows_per_page
-        page_data = data[start_idx : start_idx + self.rows_per_page]
-        total_pages = max(1, (len(data) + self.rows_per_page - 1) // self.rows_per_page)
+        total_pages = max(1, (self.total_rows + self.rows_per_page - 1) // self.rows_per_page)
         self.label_page.setText(f"Halaman {self.current_page} dari {total_pages}")
         self.btn_prev.setEnabled(self.current_page > 1)
         self.btn_next.setEnabled(self.current_page < total_pages)
 
-        for i, row in enumerate(page_data):
+        for i, row in enumerate(data):
             self.table.insertRow(i)
             
             dummy_item = QTableWidgetItem()
@@ -302,7 +462,7 @@ class SuratMasuk(QWidget):
             chk_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
             
             chk_box = QCheckBox()
-            chk_box.setProperty("db_id", row[0])
+            chk_box.setProperty("db_id", row.id)
             chk_box.setCursor(Qt.CursorShape.PointingHandCursor)
             chk_box.setFocusPolicy(Qt.FocusPolicy.NoFocus)
             chk_box.setStyleSheet(f"""
@@ -313,18 +473,16 @@ class SuratMasuk(QWidget):
             self.table.setCellWidget(i, 0, chk_container)
 
             no_item = NumericTableWidgetItem(str(start_idx + i + 1))
-            no_item.setData(Qt.ItemDataRole.UserRole, row[0])
+            no_item.setData(Qt.ItemDataRole.UserRole, row.id)
             no_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignTop) 
             self.table.setItem(i, 1, no_item)
 
-            for j in range(1, 7):
-                val = str(row[j]) if row[j] else ""
-                if j in [1, 4]: 
-                    try:
-                        d = QDate.fromString(val, "yyyy-MM-dd")
-                        if d.isValid(): val = d.toString("dd/MM/yyyy")
-                    except: pass
-                if j in [1, 4]: item = DateTableWidgetItem(val)
+            # Teks tanggal dd/MM/yyyy & nomor hari sudah disiapkan repository (sekali per baris)
+            kolom = [row.tanggal_tampil, row.asal_surat, row.nomor_surat, row.tanggal_surat_tampil, row.judul_surat, row.keterangan]
+            hari = {1: row.tanggal_hari, 4: row.tanggal_surat_hari}
+            for j, nilai in enumerate(kolom, start=1):
+                val = str(nilai) if nilai else ""
+                if j in hari: item = DateTableWidgetItem(val, hari[j])
                 else: item = QTableWidgetItem(val)
                 item.setTextAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
                 item.setToolTip(val)
@@ -340,7 +498,7 @@ class SuratMasuk(QWidget):
             btn_view = QPushButton("Lihat")
             btn_view.setCursor(Qt.CursorShape.PointingHandCursor)
             btn_view.setStyleSheet("QPushButton { background: #5c7cfa; color: white; border-radius: 4px; padding: 5px 10px; font-weight: bold; font-size: 11px; } QPushButton:hover { background: #4263eb; }")
-            btn_view.clicked.connect(lambda checked, p=row[7]: self.buka_berkas(p))
+            btn_view.clicked.connect(lambda checked, r=row: self.buka_berkas(r.file_path, r.id))
             
             btn_edit = QPushButton("✏️ Edit")
             btn_edit.setCursor(Qt.CursorShape.PointingHandCursor)
@@ -357,16 +515,18 @@ class SuratMasuk(QWidget):
     def prev_page(self):
         if self.current_page > 1:
             self.current_page -= 1
-            self.display_data(self.filtered_data)
+            self.muat_halaman()
 
     def next_page(self):
-        total_pages = (len(self.filtered_data) + self.rows_per_page - 1) // self.rows_per_page
-        if self.current_page < total_pages:
+        total_pages = (self.total_rows + self.rows_per_page - 1) // self.rows_per_page
+        if self.current_page < total_pages and self.page_data:
+            # Simpan id terakhir halaman ini sebagai batas awal halaman berikutnya
+            self.page_anchors[self.current_page:] = [self.page_data[-1].id]
             self.current_page += 1
-            self.display_data(self.filtered_data)
+            self.muat_halaman()
 
     def export_to_excel(self):
-        data_exp = self.filtered_data if self.filtered_data else self.all_data
+        data_exp = self.ambil_semua() or self.ambil_semua(pakai_filter=False)
         if not data_exp: return
         default_name = f"Laporan_Surat_Masuk_{datetime.now().strftime('%d%m%Y_%H%M')}.xlsx"
         path, _ = QFileDialog.getSaveFileName(self, "Simpan Laporan", default_name, "Excel Files (*.xlsx)")
@@ -376,7 +536,7 @@ class SuratMasuk(QWidget):
                 list_data_rapi = []
                 for index, row in enumerate(data_exp, start=1):
                     list_data_rapi.append([
-                        index, row[1], row[2], row[3], row[4], row[5], row[6], row[7]
+                        index, row.tanggal, row.asal_surat, row.nomor_surat, row.tanggal_surat, row.judul_surat, row.keterangan, row.file_path
                     ])
 
                 cols = ["No", "Tgl Terima", "Dari", "Nomor Surat", "Tgl Surat", "Perihal", "Keterangan", "Lokasi File"]
@@ -447,12 +607,8 @@ class SuratMasuk(QWidget):
                 path_dest = os.path.join(up_dir, f"IN_{datetime.now().strftime('%Y%m%d_%H%M%S')}{ext}")
                 shutil.copy(path_asal, path_dest)
                 
-                db = connect_db()
-                cursor = db.cursor()
-                cursor.execute("INSERT INTO surat (nomor_surat, judul_surat, asal_surat, kategori, tanggal, tanggal_surat, keterangan, file_path) VALUES (?, ?, ?, 'masuk', ?, ?, ?, ?)", 
-                               (nomor, perihal, dari, tgl_terima, tgl_surat, ket, path_dest))
-                db.commit()
-                db.close()
+                self.repo.insert('masuk', tanggal=tgl_terima, asal_surat=dari, nomor_surat=nomor, tanggal_surat=tgl_surat,
+                                 judul_surat=perihal, keterangan=ket, file_path=path_dest)
                 self.load_data()
                 self.notifikasi_custom("Berhasil", "Data berhasil diarsipkan!", QMessageBox.Icon.Information)
             except Exception as e: self.notifikasi_custom("Error", str(e), QMessageBox.Icon.Critical)
@@ -460,13 +616,13 @@ class SuratMasuk(QWidget):
     def aksi_edit(self, data):
         dialog = FormTambahSurat(self, kategori="Masuk")
         dialog.setWindowTitle("Edit Surat Masuk")
-        path_lama = data[7] 
-        dialog.ent_tanggal.setDate(QDate.fromString(data[1], "yyyy-MM-dd"))
-        dialog.ent_pihak.setText(str(data[2]))
-        dialog.ent_nomor.setText(str(data[3]))
-        dialog.ent_tgl_surat.setDate(QDate.fromString(data[4], "yyyy-MM-dd"))
-        dialog.ent_perihal.setCurrentText(str(data[5])) 
-        dialog.ent_keterangan.setText(str(data[6]))
+        path_lama = data.file_path 
+        dialog.ent_tanggal.setDate(QDate.fromString(data.tanggal, "yyyy-MM-dd"))
+        dialog.ent_pihak.setText(str(data.asal_surat))
+        dialog.ent_nomor.setText(str(data.nomor_surat))
+        dialog.ent_tgl_surat.setDate(QDate.fromString(data.tanggal_surat, "yyyy-MM-dd"))
+        dialog.ent_perihal.setCurrentText(str(data.judul_surat)) 
+        dialog.ent_keterangan.setText(str(data.keterangan))
         dialog.file_path = path_lama
 
         if dialog.exec():
@@ -483,12 +639,9 @@ class SuratMasuk(QWidget):
                     final_path = os.path.join(up_dir, f"IN_EDIT_{datetime.now().strftime('%Y%m%d_%H%M%S')}{ext}")
                     shutil.copy(path_baru_input, final_path)
 
-                db = connect_db()
-                cursor = db.cursor()
-                cursor.execute("UPDATE surat SET tanggal=?, asal_surat=?, nomor_surat=?, tanggal_surat=?, judul_surat=?, keterangan=?, file_path=? WHERE id=?", 
-                               (dialog.ent_tanggal.date().toString("yyyy-MM-dd"), dialog.ent_pihak.text(), dialog.ent_nomor.text(), dialog.ent_tgl_surat.date().toString("yyyy-MM-dd"), perihal, dialog.ent_keterangan.text(), final_path, data[0]))
-                db.commit()
-                db.close()
+                self.repo.update(data.id, tanggal=dialog.ent_tanggal.date().toString("yyyy-MM-dd"), asal_surat=dialog.ent_pihak.text(),
+                                 nomor_surat=dialog.ent_nomor.text(), tanggal_surat=dialog.ent_tgl_surat.date().toString("yyyy-MM-dd"),
+                                 judul_surat=perihal, keterangan=dialog.ent_keterangan.text(), file_path=final_path)
                 self.load_data()
                 self.notifikasi_custom("Sukses", "Data berhasil diperbarui!", QMessageBox.Icon.Information)
             except Exception as e: self.notifikasi_custom("Error", str(e), QMessageBox.Icon.Critical)
@@ -525,7 +678,7 @@ class SuratMasuk(QWidget):
         lbl_judul.setStyleSheet("font-size: 22px; font-weight: 900; color: #c0392b; border: none; background: transparent; margin-top: 5px;")
         layout.addWidget(lbl_judul)
         
-        lbl_pesan = QLabel(f"Anda akan menghapus <b>{len(ids_to_delete)} data</b> terpilih.<br>File akan dipindahkan ke Recycle Bin.")
+        lbl_pesan = QLabel(f"Anda akan menghapus <b>{len(ids_to_delete)} data</b> terpilih.<br>Data masih bisa diurungkan, lalu file dipindahkan ke Recycle Bin beberapa menit kemudian.")
         lbl_pesan.setAlignment(Qt.AlignmentFlag.AlignCenter)
         lbl_pesan.setWordWrap(True)
         lbl_pesan.setStyleSheet("font-size: 14px; color: #57606f; line-height: 1.4; border: none; background: transparent;")
@@ -559,60 +712,36 @@ class SuratMasuk(QWidget):
 
         if dialog.exec(): 
             try:
-                db = connect_db()
-                cursor = db.cursor()
-                deleted_count = 0
-                error_occurred = False
-                files_locked = []
-
-                for db_id in ids_to_delete:
-                    cursor.execute("SELECT file_path FROM surat WHERE id=?", (db_id,))
-                    result = cursor.fetchone()
-                    file_deleted_physically = False 
-
-                    if result and result[0]:
-                        path_file = os.path.abspath(result[0])
-                        if os.path.exists(path_file):
-                            try:
-                                send2trash(path_file)
-                                file_deleted_physically = True
-                            except OSError as e:
-                                if hasattr(e, 'winerror') and e.winerror == 32:
-                                    files_locked.append(os.path.basename(path_file))
-                                    error_occurred = True
-                                    continue 
-                                else:
-                                    error_occurred = True
-                                    continue 
-                        else:
-                            file_deleted_physically = True
-                    else:
-                        file_deleted_physically = True
-
-                    if file_deleted_physically:
-                        cursor.execute("DELETE FROM surat WHERE id=?", (db_id,))
-                        deleted_count += 1
-
-                db.commit()
-                db.close()
+                # Hapus lunak: baris hanya ditandai, berkas dibuang belakangan oleh
+                # pembersihan berkala (trash_worker.py) sehingga masih bisa diurungkan
+                deleted_count = self.repo.tandai_dihapus(ids_to_delete)
                 self.load_data()
 
-                if files_locked:
-                    msg_files = "<br>".join([f"• <b>{f}</b>" for f in files_locked])
-                    self.notifikasi_custom("Gagal Menghapus Sebagian", f"File berikut sedang dibuka oleh aplikasi lain (PDF Reader/Word):<br>{msg_files}<br><br>Mohon tutup aplikasi tersebut dan coba lagi.", QMessageBox.Icon.Warning)
-                elif error_occurred:
-                    self.notifikasi_custom("Peringatan", "Terjadi kesalahan sistem saat menghapus beberapa file.", QMessageBox.Icon.Critical)
-                elif deleted_count > 0:
-                    self.notifikasi_custom("Berhasil", f"{deleted_count} data berhasil dihapus dan dipindahkan ke Recycle Bin!", QMessageBox.Icon.Information)
+                if deleted_count > 0:
+                    if self.notifikasi_custom("Berhasil", f"{deleted_count} data berhasil dihapus.", QMessageBox.Icon.Information, urungkan=True):
+                        self.repo.pulihkan(ids_to_delete)
+                        self.load_data()
 
             except Exception as e:
                 self.notifikasi_custom("Error Sistem", str(e), QMessageBox.Icon.Critical)
 
-    def buka_berkas(self, path):
+    def laporan_sampah(self, sumber, jumlah_berhasil, gagal):
+        """Hasil antrean Recycle Bin (trash_worker.py): laporkan berkas yang gagal dibuang."""
+        if sumber != 'masuk' or not gagal: return
+        msg_files = "<br>".join([f"• <b>{f}</b>" for f in gagal])
+        self.notifikasi_custom("Gagal Menghapus Sebagian", f"Data sudah dihapus, tetapi file berikut sedang dibuka oleh aplikasi lain (PDF Reader/Word) atau gagal dipindahkan:<br>{msg_files}<br><br>Mohon tutup aplikasi tersebut lalu hapus file secara manual.", QMessageBox.Icon.Warning)
+
+    def buka_berkas(self, path, id_surat=None):
+        if path and id_surat is not None:
+            # Mode server: berkas yang tidak terjangkau dari komputer ini diunduh dulu
+            try: path = self.repo.berkas_lokal(id_surat, path)
+            except Exception as e:
+                self.notifikasi_custom("Error", f"Gagal membuka berkas: {e}", QMessageBox.Icon.Critical)
+                return
         if path and os.path.exists(path): os.startfile(os.path.abspath(path))
         else: self.notifikasi_custom("Error", "File tidak ditemukan!", QMessageBox.Icon.Critical)
 
-    def notifikasi_custom(self, judul, pesan, ikon):
+    def notifikasi_custom(self, judul, pesan, ikon, urungkan=False):
         dialog = QDialog(self)
         dialog.setWindowTitle("Pemberitahuan")
         dialog.setWindowFlags(Qt.WindowType.Dialog | Qt.WindowType.CustomizeWindowHint | Qt.WindowType.WindowTitleHint)
@@ -647,5 +776,16 @@ class SuratMasuk(QWidget):
         btn = QPushButton("OK")
         btn.clicked.connect(dialog.accept)
         btn.setStyleSheet("QPushButton { background-color: #34495e; color: white; border: none; border-radius: 6px; font-weight: bold; font-size: 14px; height: 45px; } QPushButton:hover { background-color: #2c3e50; }")
-        layout.addWidget(btn)
-        dialog.exec()
\ No newline at end of file
+        if urungkan:
+            # Tombol kedua untuk membatalkan aksi barusan (mis. hapus)
+            btn_urungkan = QPushButton("↩ Urungkan")
+            btn_urungkan.setCursor(Qt.CursorShape.PointingHandCursor)
+            btn_urungkan.clicked.connect(lambda: dialog.done(2))
+            btn_urungkan.setStyleSheet("QPushButton { background-color: #ecf0f1; color: #2c3e50; border: 1px solid #bdc3c7; border-radius: 6px; font-weight: bold; font-size: 14px; height: 45px; } QPushButton:hover { background-color: #dfe6e9; }")
+            baris_tombol = QHBoxLayout()
+            baris_tombol.addWidget(btn_urungkan)
+            baris_tombol.addWidget(btn)
+            layout.addLayout(baris_tombol)
+        else:
+            layout.addWidget(btn)
+        return dialog.exec() == 2
\ No newline at end of file
@@ -0,0 +1,231 @@
+import os
+import queue
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from PyQt6.QtCore import QObject, pyqtSignal
+from send2trash import send2trash
+from .repository import SuratRepository
+from .db_manager import close_connection
+from .settings import di_folder_penyimpanan
+
+# =====================================================================
+# ANTREAN RECYCLE BIN DI BACKGROUND
+# ---------------------------------------------------------------------
+# Baris database dihapus lebih dulu (satu transaksi), lalu berkas/folder
+# fisiknya dipindahkan ke Recycle Bin oleh SATU thread worker di sini,
+# sehingga GUI tidak menunggu send2trash untuk setiap berkas.
+# Berkas yang terkunci (WinError 32, mis. sedang dibuka PDF Reader) dicoba
+# ulang beberapa kali, lalu dilaporkan lewat sinyal `laporan`.
+#
+# Surat yang dihapus dari halaman hanya ditandai (hapus lunak, lihat
+# SuratRepository.tandai_dihapus). Thread yang sama menjalankan pembersihan
+# berkala: berkas surat yang sudah lewat MASA_URUNGKAN dibuang per batch,
+# lalu barisnya dihapus permanen dalam satu transaksi per batch.
+# =====================================================================
+
+# Percobaan ulang untuk berkas yang sedang dibuka aplikasi lain
+MAKS_PERCOBAAN = 3
+JEDA_PERCOBAAN = 1.0    # detik
+
+# Pembersihan surat yang ditandai terhapus
+MASA_URUNGKAN = 10 * 60             # detik: selama ini surat terhapus masih bisa dipulihkan
+INTERVAL_PEMBERSIHAN = 5 * 60       # detik
+UKURAN_BATCH_PEMBERSIHAN = 200
+
+_BERSIHKAN = object()   # Penanda tugas pembersihan di antrean
+
+
+def _winerror(e):
+    return getattr(e, 'winerror', None)
+
+
+def _normalisasi(path):
+    if path and path.startswith("\\\\?\\"): path = path[4:]
+    return os.path.normpath(path) if path else None
+
+
+class AntreanSampah(QObject):
+    """Satu worker untuk semua halaman. Gunakan antrean_sampah() untuk mengambilnya."""
+
+    # laporan(sumber, jumlah_berhasil, daftar_gagal) - daftar_gagal: list "nama (alasan)"
+    laporan = pyqtSignal(str, int, list)
+
+    def __init__(self):
+        super().__init__()
+        self._antrean = queue.Queue()
+        self._kerja_lock = threading.Lock()     # Dipegang selama satu tugas diproses
+        self._thread = threading.Thread(target=self._loop, name="antrean-sampah", daemon=True)
+        self._thread.start()
+        self._jadwal = None
+
+    def tambah(self, sumber, items):
+        """
+        sumber: penanda halaman pengirim ('masuk', 'keluar', 'dokumen').
+        items: list (nama_tampilan, path) berkas atau folder yang akan dibuang.
+        """
+        items = [(nama, path) for nama, path in items if path]
+        if items:
+            self._antrean.put((sumber, items))
+
+    def bersihkan(self):
+        """Menjadwalkan satu kali pembersihan surat terhapus (dijalankan di thread worker)."""
+        self._antrean.put((_BERSIHKAN, None))
+
+    def mulai_pembersihan_berkala(self, interval=INTERVAL_PEMBERSIHAN):
+        """Menjalankan bersihkan() setiap `interval` detik selama aplikasi berjalan."""
+        if self._jadwal is not None: return
+
+        def _jadwal():
+            while True:
+                time.sleep(interval)
+                self.bersihkan()
+
+        self._jadwal = threading.Thread(target=_jadwal, name="jadwal-pembersihan", daemon=True)
+        self._jadwal.start()
+
+    def tunggu_selesai(self, timeout=None):
+        """Menunggu antrean kosong (dipakai saat aplikasi ditutup)."""
+        batas = None if timeout is None else time.monotonic() + timeout
+        while self._antrean.unfinished_tasks:
+            if batas is not None and time.monotonic() > batas:
+                return False
+            time.sleep(0.05)
+        return True
+
+    @contextmanager
+    def dijeda(self):
+        """
+        Menunggu tugas yang sedang berjalan selesai, lalu menahan tugas
+        berikutnya (termasuk pembersihan berkala) selama blok berjalan.
+        """
+        with self._kerja_lock:
+            yield
+
+    def _loop(self):
+        while True:
+            sumber, items = self._antrean.get()
+            with self._kerja_lock:
+                self._jalankan(sumber, items)
+
+    def _jalankan(self, sumber, items):
+        try:
+            if sumber is _BERSIHKAN:
+                try:
+                    self._bersihkan_terhapus()
+                finally:
+                    # Jangan menahan file database terbuka di antara jadwal (mis. saat restore backup)
+                    close_connection()
+                return
+            berhasil, gagal = self._proses(items)
+            self.laporan.emit(sumber, berhasil, gagal)
+        except Exception as e:
+            print(f"Error Antrean Sampah: {e}")
+        finally:
+            self._antrean.task_done()
+
+    def _proses(self, items):
+        berhasil = 0
+        gagal = []
+        terkunci = []
+        for nama, path in items:
+            hasil = self._buang(_normalisasi(path))
+            if hasil is None: berhasil += 1
+            elif hasil == 32: terkunci.append((nama, path))
+            else: gagal.append(f"{nama} ({hasil})")
+
+        # Berkas terkunci dicoba lagi: pengguna mungkin baru saja menutupnya
+        for _ in range(MAKS_PERCOBAAN - 1):
+            if not terkunci: break
+            time.sleep(JEDA_PERCOBAAN)
+            masih = []
+            for nama, path in terkunci:
+                hasil = self._buang(_normalisasi(path))
+                if hasil is None: berhasil += 1
+                elif hasil == 32: masih.append((nama, path))
+                else: gagal.append(f"{nama} ({hasil})")
+            terkunci = masih
+
+        gagal += [f"{nama} (Sedang dibuka)" for nama, _ in terkunci]
+        return berhasil, gagal
+
+    def _bersihkan_terhapus(self):
+        repo = SuratRepository()
+        batas = (datetime.now() - timedelta(seconds=MASA_URUNGKAN)).strftime('%Y-%m-%d %H:%M:%S')
+        after_id = 0
+        while True:
+            rows = repo.list_terhapus(batas, after_id, UKURAN_BATCH_PEMBERSIHAN)
+            if not rows: break
+            after_id = rows[-1].id
+
+            # Path di luar folder penyimpanan (mis. diisi lewat server arsip) tidak pernah dibuang,
+            # barisnya saja yang dihapus permanen
+            hasil = self._buang_batch([_normalisasi(os.path.abspath(r.file_path))
+                                       if r.file_path and di_folder_penyimpanan(r.file_path) else None for r in rows])
+            selesai = []
+            laporan = {}    # kategori -> [jumlah_berhasil, daftar_gagal]
+            for row, status in zip(rows, hasil):
+                # Masih dibuka aplikasi lain: tetap ditandai, dicoba lagi di pembersihan berikutnya
+                if status == 32: continue
+                selesai.append(row.id)
+                catatan = laporan.setdefault(row.kategori, [0, []])
+                if status is None:
+                    catatan[0] += 1
+                else:
+                    nama = row.judul_surat if row.kategori == 'dokumen' else os.path.basename(row.file_path)
+                    catatan[1].append(f"{nama} ({status})")
+
+            repo.hapus_permanen(selesai)
+            for kategori, (berhasil, gagal) in laporan.items():
+                self.laporan.emit(kategori, berhasil, gagal)
+
+    def _buang_batch(self, paths):
+        """
+        Status _buang() untuk setiap path. Dicoba dulu dengan SATU panggilan
+        send2trash (Windows: satu operasi Recycle Bin untuk semua berkas);
+        jika gagal, berkas dibuang satu per satu untuk tahu mana yang bermasalah.
+        """
+        ada = [p for p in paths if p and os.path.exists(p)]
+        if ada:
+            try:
+                send2trash(ada)
+                return [None] * len(paths)
+            except Exception:
+                pass
+        return [self._buang(p) for p in paths]
+
+    def _buang(self, path):
+        """None jika sukses, 32 jika terkunci, selain itu pesan error."""
+        # Berkas fisik sudah tidak ada, anggap sukses
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            send2trash(path)
+            return None
+        except OSError as e:
+            if _winerror(e) == 32:
+                return 32
+            if _winerror(e) == 13:
+                return "Akses ditolak"
+            if os.path.isdir(path):
+                # Gagal karena alasan lain: folder dokumen dihapus paksa
+                try:
+                    shutil.rmtree(path, ignore_errors=False)
+                    return None
+                except Exception as e_force:
+                    return f"Error: {e_force}"
+            return f"Error: {e}"
+
+
+_antrean = None
+_antrean_lock = threading.Lock()
+
+
+def antrean_sampah():
+    global _antrean
+    with _antrean_lock:
+        if _antrean is None:
+            _antrean = AntreanSampah()
+    return _antrean
@@ -0,0 +1,75 @@
+"""
+Bagian bersama skrip benchmark tools/uji_*.py: argumen --ukuran / --ulang,
+pengukuran waktu, database sementara berisi surat sintetis, dan perulangan
+per ukuran data di satu folder sementara.
+"""
+import argparse
+import shutil
+import sqlite3
+import tempfile
+import time
+
+from src.db_manager import set_db_path, init_db, close_connection
+
+
+def argumen(deskripsi, ukuran="10000,100000,500000"):
+    """Parser dengan --ukuran (list int) & --ulang; skrip boleh menambah argumen sendiri."""
+    parser = argparse.ArgumentParser(description=deskripsi)
+    parser.add_argument("--ukuran", default=ukuran, type=lambda teks: [int(u) for u in teks.split(",") if u.strip()],
+                        help="Jumlah surat, dipisah koma")
+    parser.add_argument("--ulang", type=int, default=3, help="Pengulangan per query (diambil yang tercepat)")
+    return parser
+
+
+def ada_trigram():
+    """False (dengan pesan) jika SQLite belum mendukung tokenizer trigram."""
+    if sqlite3.sqlite_version_info < (3, 34, 0):
+        print(f"SQLite {sqlite3.sqlite_version} belum mendukung tokenizer trigram (butuh 3.34+).")
+        return False
+    return True
+
+
+def ukur(fungsi, ulang):
+    """Waktu terbaik (ms) dari `ulang` kali, beserta hasilnya."""
+    terbaik, hasil = None, None
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        hasil = fungsi()
+        durasi = (time.perf_counter() - mulai) * 1000
+        terbaik = durasi if terbaik is None else min(terbaik, durasi)
+    return terbaik, hasil
+
+
+def isi_database(path_db, sql_insert, baris):
+    """
+    Database baru dengan skema terbaru (init_db) di `path_db`, lalu `baris`
+    dimasukkan dalam satu transaksi. Mengembalikan lama pengisian (detik).
+    """
+    set_db_path(path_db)
+    init_db()
+    conn = sqlite3.connect(path_db)
+    try:
+        mulai = time.perf_counter()
+        conn.executemany(sql_insert, baris)
+        conn.commit()
+        return time.perf_counter() - mulai
+    finally:
+        conn.close()
+
+
+def per_ukuran(daftar_ukuran, uji):
+    """
+    Menjalankan uji(folder, jumlah) untuk setiap ukuran di satu folder
+    sementara. Mengembalikan total kegagalan (uji mengembalikan jumlah gagal).
+    """
+    folder = tempfile.mkdtemp()
+    gagal = 0
+    try:
+        for jumlah in daftar_ukuran:
+            try:
+                gagal += uji(folder, jumlah) or 0
+            finally:
+                close_connection()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return gagal
@@ -0,0 +1,185 @@
+"""
+Cek regresi query plan untuk query-query utama aplikasi.
+
+Membuat database sementara dengan skema terbaru (lewat migrasi) berisi
+beberapa surat contoh, lalu menjalankan setiap SKENARIO: method
+SuratRepository / KodeSuratRepository / AuditLogRepository yang dipakai
+halaman-halaman aplikasi. SQL yang benar-benar dijalankan method tersebut
+ditangkap lewat set_trace_callback, lalu diperiksa dengan EXPLAIN QUERY PLAN,
+sehingga yang dicek selalu sama dengan query di src/repository.py.
+
+Skrip GAGAL (exit code 1) jika ada query yang jatuh ke full table SCAN atau
+butuh sorting tambahan (TEMP B-TREE) padahal seharusnya dilayani indeks.
+Skenario bertanda URUT_RENTANG memang menyortir hasil pencarian indeks rentang
+tanggal (sebanyak baris di rentang), dan URUT_RELEVANSI menyortir hasil FTS
+menurut bm25 (pencarian global), tetapi keduanya tetap tidak boleh full scan.
+
+Jalankan dari root project:
+    python tools/cek_query_plan.py
+"""
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db_manager import set_db_path, init_db, get_connection, close_connection
+from src.repository import (SuratRepository, KodeSuratRepository, AuditLogRepository, AuditRecord,
+                            FilterSurat)
+
+# Sorting yang diizinkan: hanya jika hasilnya dicari lewat indeks yang memuat teks ini
+URUT_RENTANG = "tanggal"
+URUT_RELEVANSI = "VIRTUAL TABLE"
+
+SURAT_CONTOH = [
+    ("masuk", "2025-01-10", "Bupati Garut", "005/III/2025", "2025-01-08", "Undangan Rapat", "rapat koordinasi"),
+    ("masuk", "2025-02-03", "Dinas Pendidikan", "421/II/2025", "2025-02-01", "Laporan Kegiatan", "segera"),
+    ("masuk", "2024-11-20", "Camat Sukamaju", "800/XI/2024", "2024-11-18", "Permohonan Cuti", "arsip"),
+    ("keluar", "2025-01-15", "Dinas Kesehatan", "090/I/2025", "2025-01-15", "Nota Dinas", "tindak lanjut"),
+    ("dokumen", "2025-03-01", "", "", None, "Rapat Evaluasi", ""),
+]
+KODE_CONTOH = [("800.1.1", "Cuti Tahunan"), ("800.1.2", "Cuti Sakit"), ("005", "Undangan Rapat")]
+
+repo, repo_kode, repo_audit = SuratRepository(), KodeSuratRepository(), AuditLogRepository()
+AUDIT_TERAKHIR = AuditRecord(100, "2025-01-15 08:00:00", "", "", "surat", 1, "")
+
+# (nama, fungsi[, URUT_RENTANG / URUT_RELEVANSI])
+SKENARIO = [
+    ("Daftar surat (export)", lambda: repo.list_all(FilterSurat("masuk"))),
+    ("Halaman surat pertama", lambda: repo.list_page(FilterSurat("masuk"))),
+    ("Halaman surat (keyset)", lambda: repo.list_page(FilterSurat("masuk"), 1000)),
+    ("Hapus/ambil beberapa surat", lambda: repo.get_many([1, 2, 3])),
+    ("Halaman surat + kata kunci pendek (kata saja)", lambda: repo.list_page(FilterSurat("masuk", "ra"), 1000)),
+    ("Halaman surat + kata kunci (kata ATAU substring)",
+     lambda: repo.list_page(FilterSurat("masuk", "/III/2025"), 1000)),
+    ("Jumlah surat + kata kunci", lambda: repo.count(FilterSurat("masuk", "rapat"))),
+    ("Halaman surat + sintaks pencarian (kolom, tanggal, pengecualian)",
+     lambda: repo.list_page(FilterSurat("masuk", "dari:bupati tgl:2025-01..2025-03 -nomor:005"), 1000), URUT_RENTANG),
+    ("Jumlah surat + sintaks pencarian",
+     lambda: repo.count(FilterSurat("masuk", 'perihal:undangan ket:"rapat koordinasi" tahun:2025'))),
+    ("Kandidat pencarian (dipersempit di memori)", lambda: repo.list_kandidat(FilterSurat("masuk", "rap"))),
+    ("Halaman surat + pengirim / perihal mirip",
+     lambda: repo.list_page(FilterSurat("masuk", "dinas pendidkan", mirip=True), 1000)),
+    ("Halaman surat + tahun", lambda: repo.list_page(FilterSurat("masuk", tahun=2025), 1000)),
+    ("Jumlah surat per tahun", lambda: repo.count(FilterSurat("masuk", tahun=2025))),
+    ("Daftar tahun", lambda: repo.list_tahun("masuk")),
+    ("Statistik dashboard", lambda: repo.stats()),
+    ("Jumlah surat per kategori", lambda: repo.count(FilterSurat("masuk"))),
+    ("Jumlah surat per rentang tanggal",
+     lambda: repo.count(FilterSurat("masuk", tanggal_dari="2025-01-01", tanggal_sampai="2025-12-31"))),
+    ("Jumlah surat per rentang tanggal surat",
+     lambda: repo.count(FilterSurat("masuk", tanggal_surat_dari="2025-01-01", tanggal_surat_sampai="2025-01-31"))),
+    ("Halaman surat + rentang tanggal (keyset +id)",
+     lambda: repo.list_page(FilterSurat("masuk", tanggal_dari="2025-01-01", tanggal_sampai="2025-01-31"), 1000),
+     URUT_RENTANG),
+    ("Halaman surat + rentang tanggal surat + kata kunci (keyset +id)",
+     lambda: repo.list_page(FilterSurat("masuk", "rapat", tanggal_surat_dari="2025-01-01",
+                                        tanggal_surat_sampai="2025-01-31"), 1000), URUT_RENTANG),
+    ("Pencarian global surat (urut relevansi)", lambda: repo.cari_global("masuk", "rapat"), URUT_RELEVANSI),
+    ("Pencarian global kode surat (urut relevansi)", lambda: repo_kode.cari("cuti"), URUT_RELEVANSI),
+    ("Letak halaman surat (pencarian global)", lambda: repo.lokasi(FilterSurat("masuk"), 1)),
+    ("Antrean pembersihan surat terhapus", lambda: repo.list_terhapus("2025-01-01 00:00:00")),
+    ("Referensi kode surat", lambda: repo_kode.list_all()),
+    ("Dropdown perihal", lambda: repo_kode.list_all(urut="keterangan")),
+    ("Validasi keterangan unik", lambda: repo_kode.keterangan_dipakai("x")),
+    ("Validasi keterangan unik (edit)", lambda: repo_kode.keterangan_dipakai("x", kecuali_id=1)),
+    ("Riwayat audit satu surat", lambda: repo_audit.riwayat(1)),
+    ("Audit log per rentang tanggal (keyset)",
+     lambda: repo_audit.list_rentang("2025-01-01", "2025-01-31", setelah=AUDIT_TERAKHIR)),
+]
+
+# "SCAN surat" tanpa "USING ... INDEX" berarti membaca seluruh tabel
+POLA_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+# Hanya query baca milik aplikasi (bukan PRAGMA, INSERT audit log, cek sqlite_master,
+# atau query internal FTS5 ke shadow table 'main'.'xxx_config')
+POLA_QUERY_BACA = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+POLA_BUKAN_APLIKASI = re.compile(r"sqlite_master|last_insert_rowid|'main'\.")
+# Nilai parameter yang sudah terisi, agar query yang sama dengan nilai berbeda dicek sekali
+POLA_NILAI = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def query_dari(conn, fungsi):
+    """SQL baca (dengan parameter sudah terisi) yang dijalankan `fungsi` lewat koneksi `conn`."""
+    tertangkap = []
+    conn.set_trace_callback(tertangkap.append)
+    try:
+        fungsi()
+    finally:
+        conn.set_trace_callback(None)
+    hasil, bentuk = [], set()
+    for sql in tertangkap:
+        if not POLA_QUERY_BACA.match(sql) or POLA_BUKAN_APLIKASI.search(sql):
+            continue
+        kunci = POLA_NILAI.sub("?", sql)
+        if kunci not in bentuk:
+            bentuk.add(kunci)
+            hasil.append(sql)
+    return hasil
+
+
+def cek_plan(conn, sql, urut=None):
+    masalah = []
+    detail = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+    for langkah in detail:
+        if POLA_FULL_SCAN.match(langkah.strip()):
+            masalah.append(f"full scan: {langkah}")
+        if "USE TEMP B-TREE FOR ORDER BY" in langkah and urut:
+            if not any(urut in l and "INDEX" in l for l in detail):
+                masalah.append(f"sorting tanpa indeks ({urut}): {langkah}")
+        elif "USE TEMP B-TREE" in langkah:
+            masalah.append(f"sorting tanpa indeks: {langkah}")
+    return detail, masalah
+
+
+def siapkan_database(path_db):
+    set_db_path(path_db)
+    init_db()
+    conn = sqlite3.connect(path_db)
+    try:
+        conn.executemany("INSERT INTO surat (kategori, tanggal, asal_surat, nomor_surat, tanggal_surat, judul_surat, "
+                         "keterangan) VALUES (?, ?, ?, ?, ?, ?, ?)", SURAT_CONTOH)
+        conn.execute("UPDATE surat SET dihapus_pada = '2024-12-31 00:00:00' WHERE id = 3")
+        conn.executemany("INSERT INTO kode_surat (kode, keterangan) VALUES (?, ?)", KODE_CONTOH)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def main():
+    folder = tempfile.mkdtemp()
+    gagal = jumlah = 0
+    try:
+        siapkan_database(os.path.join(folder, "cek_plan.db"))
+        conn = get_connection()
+        for nama, fungsi, *urut in SKENARIO:
+            daftar_sql = query_dari(conn, fungsi)
+            if not daftar_sql:
+                print(f"[GAGAL] {nama}\n     !! tidak ada query yang tertangkap")
+                gagal += 1
+                jumlah += 1
+                continue
+            for sql in daftar_sql:
+                detail, masalah = cek_plan(conn, sql, urut[0] if urut else None)
+                status = "GAGAL" if masalah else "OK"
+                print(f"[{status}] {nama}")
+                print(f"        {' '.join(sql.split())[:150]}")
+                for langkah in detail:
+                    print(f"        {langkah}")
+                for m in masalah:
+                    print(f"     !! {m}")
+                jumlah += 1
+                if masalah:
+                    gagal += 1
+    finally:
+        close_connection()
+        shutil.rmtree(folder, ignore_errors=True)
+
+    print(f"\n{jumlah - gagal}/{jumlah} query memakai indeks.")
+    return 1 if gagal else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
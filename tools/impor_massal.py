@@ -0,0 +1,78 @@
+"""
+Impor massal surat hasil scan dari file CSV (digitalisasi arsip lama).
+
+Kolom CSV (baris pertama = header):
+    nomor_surat, file, tanggal, asal_surat, tanggal_surat, judul_surat, keterangan
+Hanya nomor_surat dan file yang wajib. Tanggal berformat yyyy-MM-dd (dd/MM/yyyy
+juga diterima); baris dengan tanggal yang tidak dikenali ditolak.
+Path di kolom `file` boleh relatif terhadap --folder-berkas.
+
+Semua baris valid disimpan dalam SATU transaksi database.
+
+Jalankan dari root project:
+    python tools/impor_massal.py masuk daftar_surat.csv --folder-berkas D:/scan
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db_manager import set_db_path, close_connection
+from src.impor_massal import ItemImpor, impor_surat
+
+
+def baca_csv(path_csv, kategori, folder_berkas):
+    items = []
+    with open(path_csv, newline="", encoding="utf-8-sig") as f:
+        for baris in csv.DictReader(f):
+            baris = {k.strip().lower(): (v or "").strip() for k, v in baris.items() if k}
+            file_sumber = baris.get("file", "")
+            if file_sumber and folder_berkas and not os.path.isabs(file_sumber):
+                file_sumber = os.path.join(folder_berkas, file_sumber)
+            items.append(ItemImpor(
+                kategori=kategori,
+                nomor_surat=baris.get("nomor_surat", ""),
+                file_sumber=file_sumber,
+                tanggal=baris.get("tanggal", ""),
+                asal_surat=baris.get("asal_surat", ""),
+                tanggal_surat=baris.get("tanggal_surat", ""),
+                judul_surat=baris.get("judul_surat", ""),
+                keterangan=baris.get("keterangan", ""),
+            ))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Impor massal surat dari CSV")
+    parser.add_argument("kategori", choices=["masuk", "keluar"])
+    parser.add_argument("csv", help="File CSV daftar surat")
+    parser.add_argument("--folder-berkas", default="", help="Folder dasar untuk path berkas relatif")
+    parser.add_argument("--db", help="Path database lain (default: arsip_digital.db aplikasi)")
+    parser.add_argument("--semua-atau-tidak", action="store_true",
+                        help="Batalkan seluruh impor jika ada satu item yang gagal")
+    args = parser.parse_args()
+
+    if args.db: set_db_path(args.db)
+    items = baca_csv(args.csv, args.kategori, args.folder_berkas)
+    if not items:
+        print("CSV kosong, tidak ada yang diimpor.")
+        return 0
+
+    mulai = time.perf_counter()
+    hasil = impor_surat(items, batal_jika_ada_gagal=args.semua_atau_tidak)
+    durasi = time.perf_counter() - mulai
+    close_connection()
+
+    gagal = [h for h in hasil if not h.sukses]
+    for h in gagal:
+        # +2: baris header & indeks mulai dari 0
+        print(f"[GAGAL] baris {h.indeks + 2} ({items[h.indeks].nomor_surat or '-'}): {h.pesan}")
+    print(f"\n{len(hasil) - len(gagal)}/{len(hasil)} surat diimpor dalam {durasi:.1f} detik.")
+    return 1 if gagal else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Cek & hitung ulang tabel statistik_surat (counter Dashboard).
+
+Counter dijaga otomatis oleh trigger di tabel surat. Jika database pernah
+diubah dari luar aplikasi (mis. diedit manual / restore sebagian) dan
+angka di Dashboard tidak cocok, jalankan skrip ini.
+
+Jalankan dari root project:
+    python tools/rebuild_statistik.py          # cek lalu perbaiki jika ada selisih
+    python tools/rebuild_statistik.py --cek    # hanya cek (exit code 1 jika ada selisih)
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db_manager import set_db_path, close_connection
+from src.repository import SuratRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cek & rebuild tabel statistik_surat")
+    parser.add_argument("--cek", action="store_true", help="Hanya cek, jangan ubah database")
+    parser.add_argument("--db", help="Path database lain (default: arsip_digital.db aplikasi)")
+    args = parser.parse_args()
+
+    if args.db: set_db_path(args.db)
+    repo = SuratRepository()
+    try:
+        selisih = repo.cek_statistik()
+        for kategori, tahun, bulan, counter, sebenarnya in selisih:
+            periode = "semua" if not tahun else (f"{tahun}" if not bulan else f"{tahun}-{bulan:02d}")
+            print(f"[SELISIH] {kategori or '-'} {periode}: counter={counter}, sebenarnya={sebenarnya}")
+
+        if not selisih:
+            print("Statistik sudah sinkron.")
+            return 0
+        if args.cek:
+            print(f"\n{len(selisih)} baris statistik tidak sinkron.")
+            return 1
+
+        repo.rebuild_statistik()
+        print(f"\n{len(selisih)} baris tidak sinkron, statistik sudah dihitung ulang.")
+        return 0
+    finally:
+        close_connection()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
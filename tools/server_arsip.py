@@ -0,0 +1,59 @@
+"""
+Menjalankan server arsip (mode server, lihat src/server_arsip.py).
+
+Server hanya melayani permintaan yang membawa token bersama. Isi token yang
+sama di config.json komputer server dan semua komputer klien:
+    server:  {"server_token": "<token-rahasia>"}
+    klien:   {"server_url": "http://<ip-server>:8765", "server_token": "<token-rahasia>"}
+Token bisa dibuat dengan: python -c "import secrets; print(secrets.token_urlsafe(32))"
+
+Jalankan dari root project:
+    python tools/server_arsip.py                         # hanya localhost (uji coba)
+    python tools/server_arsip.py --host <ip-lan-server> --port 8765 --worker 16
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db_manager import set_db_path, init_db, get_db_path
+from src.server_arsip import ServerArsip
+from src.settings import get_server_token
+from src.trash_worker import antrean_sampah
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server arsip HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1", help="Alamat yang didengarkan (default: localhost)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--worker", type=int, default=8, help="Jumlah thread (= koneksi database)")
+    parser.add_argument("--cache", type=int, default=256, help="Jumlah hasil query yang disimpan di cache")
+    parser.add_argument("--umur-cache", type=float, default=5.0, help="Detik sebelum isi cache kedaluwarsa")
+    parser.add_argument("--db", help="Path database lain (default: arsip_digital.db aplikasi)")
+    args = parser.parse_args()
+
+    token = get_server_token()
+    if not token:
+        print("server_token belum diisi di config.json; server tidak dijalankan tanpa token.")
+        return 1
+    if args.db: set_db_path(args.db)
+    if not init_db():
+        return 1
+    server = ServerArsip((args.host, args.port), token, args.worker, args.cache, args.umur_cache)
+    # Surat yang dihapus klien dibersihkan permanen (beserta berkasnya) oleh server
+    antrean_sampah().mulai_pembersihan_berkala()
+    print(f"Server arsip berjalan di http://{args.host}:{args.port} (database: {get_db_path()})")
+    print("Tekan Ctrl+C untuk berhenti.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Cache: {server.cache.hit} hit, {server.cache.miss} miss")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Benchmark biaya audit log (audit_log.py) per aksi tulis.
+
+Di database sementara, aksi yang sama (tambah, ubah, hapus lunak surat)
+dijalankan dua kali: tanpa audit dan dengan audit. Buffer audit lalu
+ditulis (flush) dan waktunya ikut dihitung. Selisihnya dibagi jumlah aksi,
+dan hasilnya harus di bawah --batas-ms (default 1 ms).
+
+Jalankan dari root project:
+    python tools/uji_audit_log.py                   # 2000 aksi per putaran
+    python tools/uji_audit_log.py --jumlah 10000 --mode-jurnal DELETE
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import audit_log, repository
+from src.db_manager import set_db_path, init_db, close_connection
+from src.repository import SuratRepository, AuditLogRepository
+from src.settings import DEFAULT_DB_PROFILE
+
+
+def putaran(repo, jumlah):
+    """Menjalankan `jumlah` aksi tulis campuran, mengembalikan (durasi, id_surat)."""
+    ids = []
+    mulai = time.perf_counter()
+    for i in range(jumlah):
+        if i % 3 == 0:
+            ids.append(repo.insert('masuk', '2024-01-01', nomor_surat=f"A-{i}", judul_surat="Uji audit"))
+        elif i % 3 == 1:
+            repo.update(ids[-1], keterangan=f"ubah {i}")
+        else:
+            repo.tandai_dihapus([ids[-1]])
+    return time.perf_counter() - mulai, ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark overhead audit log per aksi")
+    parser.add_argument("--jumlah", type=int, default=2000, help="Aksi tulis per putaran")
+    parser.add_argument("--mode-jurnal", choices=["DELETE", "WAL"], default="WAL")
+    parser.add_argument("--batas-ms", type=float, default=1.0, help="Overhead maksimal per aksi (ms)")
+    args = parser.parse_args()
+
+    folder_sementara = tempfile.mkdtemp()
+    db_path = os.path.join(folder_sementara, "uji_audit.db")
+    catat_asli = repository.catat
+    try:
+        DEFAULT_DB_PROFILE["journal_mode"] = args.mode_jurnal
+        set_db_path(db_path)
+        init_db()
+        repo = SuratRepository()
+        # Flush otomatis praktis dimatikan agar waktu flush diukur di sini (bukan di thread lain)
+        pencatat = audit_log._pencatat = audit_log.PencatatAudit(ukuran_buffer=float("inf"), interval=3600)
+
+        putaran(repo, 60)   # Pemanasan (koneksi, statement cache)
+        pencatat.flush()
+
+        repository.catat = lambda *a, **k: None
+        tanpa, _ = putaran(repo, args.jumlah)
+        repository.catat = catat_asli
+
+        dengan, ids = putaran(repo, args.jumlah)
+        mulai = time.perf_counter()
+        ditulis = pencatat.flush()
+        durasi_flush = time.perf_counter() - mulai
+
+        # Sekadar memastikan catatan benar-benar tersimpan & bisa di-query lewat indeks
+        riwayat = AuditLogRepository().riwayat(ids[-1])
+        conn = sqlite3.connect(db_path)
+        total_audit = conn.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
+        conn.close()
+
+        overhead_ms = (dengan + durasi_flush - tanpa) * 1000 / args.jumlah
+        print(f"Mode jurnal {args.mode_jurnal}, {args.jumlah} aksi per putaran")
+        print(f"  Tanpa audit : {tanpa * 1000 / args.jumlah:.3f} ms/aksi")
+        print(f"  Dengan audit: {dengan * 1000 / args.jumlah:.3f} ms/aksi "
+              f"+ flush {ditulis} catatan dalam {durasi_flush * 1000:.1f} ms (satu transaksi)")
+        print(f"  Overhead    : {overhead_ms:.3f} ms/aksi (batas {args.batas_ms} ms)")
+        print(f"  audit_log berisi {total_audit} catatan; riwayat surat #{ids[-1]}: "
+              f"{', '.join(r.aksi for r in riwayat)}")
+
+        if overhead_ms >= args.batas_ms:
+            print("HASIL: overhead audit log MELEBIHI batas")
+            return 1
+        print("HASIL: overhead audit log di bawah batas")
+        return 0
+    finally:
+        repository.catat = catat_asli
+        close_connection()
+        shutil.rmtree(folder_sementara, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+Uji beban server arsip: banyak klien bersamaan (masing-masing satu thread)
+membuka halaman daftar, mencari, melihat statistik, mengunduh berkas, dan
+sesekali menambah / menghapus surat.
+
+Tanpa --url, server dijalankan otomatis di localhost (proses terpisah) dengan
+database sementara yang diisi --isi surat contoh.
+
+Jalankan dari root project:
+    python tools/uji_beban_server.py --klien 50 --durasi 20
+    python tools/uji_beban_server.py --url http://127.0.0.1:8765 --token <token> --klien 20
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import secrets
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db_manager import set_db_path, init_db, close_connection
+from src.repository import SuratRepository, FilterSurat, KOLOM_TULIS
+from src.repository_remote import SuratRepositoryRemote
+
+KATA = ["undangan", "rapat", "anggaran", "laporan", "kegiatan", "pengadaan", "dinas", "pendidikan"]
+
+
+def siapkan_database(folder, jumlah):
+    db_path = os.path.join(folder, "uji_server.db")
+    berkas = os.path.join(folder, "contoh.pdf")
+    with open(berkas, "wb") as f:
+        f.write(os.urandom(256 * 1024))
+    set_db_path(db_path)
+    init_db()
+    acak = random.Random(1)
+    baris = []
+    for i in range(jumlah):
+        data = dict(kategori=acak.choice(["masuk", "keluar"]),
+                    tanggal=f"{acak.randint(2019, 2025)}-{acak.randint(1, 12):02d}-{acak.randint(1, 28):02d}",
+                    asal_surat="Instansi", nomor_surat=f"{i}/UJI", tanggal_surat=None,
+                    judul_surat=" ".join(acak.sample(KATA, 3)), keterangan="", file_path=berkas)
+        baris.append(tuple(data[k] for k in KOLOM_TULIS))
+    SuratRepository().insert_many(baris)
+    close_connection()
+    return db_path
+
+
+def jalankan_server(db_path, port, worker, token):
+    from src import settings
+    from src.server_arsip import ServerArsip
+    set_db_path(db_path)
+    # Berkas contoh ada di folder sementara; server hanya mengirim berkas di folder penyimpanan
+    settings.DEFAULT_BASE = os.path.dirname(db_path)
+    server = ServerArsip(("127.0.0.1", port), token, worker)
+    server.serve_forever()
+
+
+def port_kosong():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def tunggu_server(repo, batas=15):
+    akhir = time.monotonic() + batas
+    while time.monotonic() < akhir:
+        try:
+            repo.stats()
+            return True
+        except Exception:
+            time.sleep(0.2)
+    return False
+
+
+def klien(repo, sampai, catatan, lock, nomor):
+    acak = random.Random(nomor)
+    while time.monotonic() < sampai:
+        kategori = acak.choice(["masuk", "keluar"])
+        pilihan = acak.random()
+        mulai = time.perf_counter()
+        try:
+            if pilihan < 0.40:
+                jenis = "daftar"
+                rows = repo.list_page(FilterSurat(kategori), None, 10)
+                if rows and acak.random() < 0.5:
+                    repo.list_page(FilterSurat(kategori), rows[-1].id, 10)
+            elif pilihan < 0.60:
+                jenis = "cari"
+                repo.count(FilterSurat(kategori, acak.choice(KATA), acak.choice([None, 2023, 2024])))
+            elif pilihan < 0.75:
+                jenis = "statistik"
+                repo.stats()
+            elif pilihan < 0.85:
+                jenis = "tahun"
+                repo.list_tahun(kategori)
+            elif pilihan < 0.95:
+                jenis = "berkas"
+                # Surat sementara dari klien "tulis" tidak punya berkas
+                rows = [r for r in repo.list_page(FilterSurat(kategori), None, 10) if r.file_path]
+                if rows:
+                    with repo._buka("GET", f"berkas/{rows[0].id}") as resp:
+                        while resp.read(64 * 1024):
+                            pass
+            else:
+                jenis = "tulis"
+                id_baru = repo.insert(kategori, "2024-06-01", nomor_surat=f"K{nomor}", judul_surat="uji beban")
+                repo.tandai_dihapus([id_baru])
+            hasil = (jenis, (time.perf_counter() - mulai) * 1000, None)
+        except Exception as e:
+            hasil = ("gagal", (time.perf_counter() - mulai) * 1000, str(e))
+        with lock:
+            catatan.append(hasil)
+
+
+def persentil(data, p):
+    data = sorted(data)
+    return data[min(len(data) - 1, int(len(data) * p))] if data else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uji beban server arsip dengan banyak klien")
+    parser.add_argument("--url", help="Server yang sudah berjalan (default: jalankan server uji di localhost)")
+    parser.add_argument("--token", help="Token server yang sudah berjalan (default: server_token di config.json)")
+    parser.add_argument("--klien", type=int, default=30, help="Jumlah klien bersamaan")
+    parser.add_argument("--durasi", type=float, default=10, help="Lama uji (detik)")
+    parser.add_argument("--worker", type=int, default=8, help="Thread server (jika server dijalankan otomatis)")
+    parser.add_argument("--isi", type=int, default=20000, help="Jumlah surat contoh di database uji")
+    args = parser.parse_args()
+
+    folder = proses_server = None
+    url, token = args.url, args.token
+    try:
+        if not url:
+            folder = tempfile.mkdtemp()
+            db_path = siapkan_database(folder, args.isi)
+            port = port_kosong()
+            token = secrets.token_urlsafe(16)
+            # spawn, bukan fork: proses anak hasil fork ikut mewarisi lock yang sedang dipegang
+            # thread lain (mis. thread audit log) dan bisa macet selamanya saat menulis
+            proses_server = multiprocessing.get_context("spawn").Process(
+                target=jalankan_server, args=(db_path, port, args.worker, token), daemon=True)
+            proses_server.start()
+            url = f"http://127.0.0.1:{port}"
+
+        repo = SuratRepositoryRemote(url, token)
+        if not tunggu_server(repo):
+            print(f"Server {url} tidak merespons.")
+            return 1
+
+        catatan = []
+        lock = threading.Lock()
+        sampai = time.monotonic() + args.durasi
+        threads = [threading.Thread(target=klien, args=(SuratRepositoryRemote(url, token), sampai, catatan, lock, n))
+                   for n in range(args.klien)]
+        mulai = time.perf_counter()
+        for t in threads: t.start()
+        for t in threads: t.join()
+        durasi = time.perf_counter() - mulai
+
+        print(f"{args.klien} klien, {durasi:.1f} detik, {len(catatan)} permintaan "
+              f"({len(catatan) / durasi:.0f} permintaan/detik)\n")
+        print(f"{'Jenis':<10} {'Jumlah':>7} {'p50 ms':>8} {'p95 ms':>8} {'maks ms':>8}")
+        for jenis in ["daftar", "cari", "statistik", "tahun", "berkas", "tulis", "gagal"]:
+            waktu = [ms for j, ms, _ in catatan if j == jenis]
+            if waktu:
+                print(f"{jenis:<10} {len(waktu):>7} {statistics.median(waktu):>8.1f} "
+                      f"{persentil(waktu, 0.95):>8.1f} {max(waktu):>8.1f}")
+        gagal = [pesan for j, _, pesan in catatan if j == "gagal"]
+        for pesan in sorted(set(gagal))[:5]:
+            print(f"[GAGAL] {pesan}")
+        return 1 if gagal else 0
+    finally:
+        if proses_server:
+            proses_server.terminate()
+            proses_server.join()
+        if folder:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
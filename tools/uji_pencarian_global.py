@@ -0,0 +1,133 @@
+"""
+Benchmark pencarian global (pencarian_global.py) & lompat ke halaman surat.
+
+Untuk setiap ukuran data dibuat database sementara berisi surat masuk,
+surat keluar & dokumen sintetis, ditambah kode surat. Setiap kata kunci lalu
+dicari di keempat sumber dengan:
+  - SuratRepository.cari_global() per kategori + KodeSuratRepository.cari():
+    jumlah + 10 hasil teratas (urut bm25) lewat indeks FTS / trigram;
+  - cara tanpa indeks: all_data setiap halaman dimuat (list_all() tanpa
+    filter, kode surat list_all()) lalu kata kunci disaring di Python.
+Jumlah hasil keduanya harus sama. Lalu untuk beberapa surat di posisi
+berbeda, SuratRepository.lokasi() (nomor halaman & page_anchors) dibandingkan
+dengan menekan Next halaman demi halaman sampai surat itu ketemu.
+
+Jalankan dari root project:
+    python tools/uji_pencarian_global.py                     # 10rb, 100rb surat
+    python tools/uji_pencarian_global.py --ukuran 10000,500000 --ulang 5
+"""
+import os
+import random
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.pencarian import token_fts
+from src.repository import SuratRepository, KodeSuratRepository, FilterSurat
+from tools._benchmark import argumen, ukur, isi_database, per_ukuran
+
+KATEGORI = ["masuk", "keluar", "dokumen"]
+KATA_KUNCI = ["rapat", "dinas pendidikan", "cuti", "/III/2024", "sukamaj", "xyzq"]
+# Posisi surat (urutan di daftar, terbaru dulu) yang dicari halamannya
+POSISI = [0, 95, 2500, 25000]
+
+PENGIRIM = ["Dinas Pendidikan", "Bupati Garut", "Camat Sukamaju", "Puskesmas Mawar", "PT Sinar Jaya", "Kantor Pos"]
+PERIHAL = ["Undangan Rapat", "Laporan Kegiatan", "Permohonan Cuti", "Surat Edaran", "Nota Dinas", "Rapat Koordinasi"]
+ROMAWI = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI", "XII"]
+KODE = [("800.1.1", "Cuti Tahunan"), ("800.1.2", "Cuti Sakit"), ("005", "Undangan Rapat"),
+        ("000.1", "Surat Edaran"), ("400.3", "Pendidikan Dasar"), ("900.1", "Laporan Keuangan")]
+
+
+def buat_baris(jumlah, acak):
+    for i in range(jumlah):
+        tahun = acak.choice([2023, 2024, 2025])
+        yield (acak.choice(KATEGORI), f"{tahun}-{acak.randint(1, 12):02d}-01", acak.choice(PENGIRIM),
+               f"{acak.randint(1, 999):03d}/{acak.choice(ROMAWI)}/{tahun}", acak.choice(PERIHAL), f"Catatan {i}")
+
+
+def cocok_surat(keyword, row):
+    """Acuan surat: setiap potongan kata kunci ada sebagai substring di salah satu kolom yang dicari."""
+    teks = "\n".join(k or "" for k in (row.asal_surat, row.nomor_surat, row.judul_surat, row.keterangan)).lower()
+    return all(p in teks for p in keyword.lower().split())
+
+
+def cocok_kode(keyword, row):
+    """Acuan kode surat: setiap kata kunci awalan salah satu token kode / keterangan."""
+    token = token_fts(f"{row.kode} {row.keterangan}")
+    return all(any(t.startswith(k) for t in token) for k in token_fts(keyword))
+
+
+def cari_per_halaman(jumlah_halaman, filter_surat, id_surat, repo):
+    """Tekan Next dari halaman 1 sampai surat ketemu: (nomor halaman, page_anchors)."""
+    anchors = [None]
+    for nomor in range(1, jumlah_halaman + 1):
+        rows = repo.list_page(filter_surat, anchors[-1], 10)
+        if any(r.id == id_surat for r in rows):
+            return nomor, anchors
+        anchors.append(rows[-1].id)
+    return None
+
+
+def uji_ukuran(folder, jumlah, ulang):
+    path_db = os.path.join(folder, f"global_{jumlah}.db")
+    isi_database(path_db, "INSERT INTO surat (kategori, tanggal, asal_surat, nomor_surat, judul_surat, keterangan) "
+                          "VALUES (?, ?, ?, ?, ?, ?)", buat_baris(jumlah, random.Random(jumlah)))
+    conn = sqlite3.connect(path_db)
+    try:
+        conn.executemany("INSERT INTO kode_surat (kode, keterangan) VALUES (?, ?)",
+                         [(f"{k}.{i}", f"{ket} {i}") for i in range(50) for k, ket in KODE])
+        conn.commit()
+    finally:
+        conn.close()
+
+    repo, repo_kode = SuratRepository(), KodeSuratRepository()
+    gagal = 0
+    print(f"\n=== {jumlah:,} surat, {50 * len(KODE)} kode surat")
+    print(f"  {'kata kunci':<20}{'hasil (masuk/keluar/dokumen/kode)':<36}{'global':>10}{'all_data':>14}{'percepatan':>12}")
+    for kata in KATA_KUNCI:
+        def global_():
+            return [repo.cari_global(k, kata) for k in KATEGORI] + [repo_kode.cari(kata)]
+        t_global, hasil = ukur(global_, ulang)
+
+        def semua():
+            return ([[r for r in repo.list_all(FilterSurat(k)) if cocok_surat(kata, r)] for k in KATEGORI]
+                    + [[r for r in repo_kode.list_all() if cocok_kode(kata, r)]])
+        t_semua, acuan = ukur(semua, ulang)
+
+        jumlah_hasil = [j for j, _ in hasil]
+        sama = jumlah_hasil == [len(a) for a in acuan] and all(
+            {r.id for r in rows} <= {r.id for r in a} for (_, rows), a in zip(hasil, acuan))
+        gagal += not sama
+        print(f"  {kata:<20}{'/'.join(str(j) for j in jumlah_hasil):<36}{t_global:>7.1f} ms{t_semua:>11.1f} ms"
+              f"{t_semua / max(t_global, 0.001):>11.1f}x{'' if sama else '   !! berbeda dari acuan'}")
+
+    print(f"\n  {'posisi surat':<20}{'halaman':>10}{'lokasi()':>12}{'Next berulang':>16}")
+    filter_surat = FilterSurat("masuk")
+    total = repo.count(filter_surat)
+    for posisi in [p for p in POSISI if p < total]:
+        id_surat = repo.list_page(filter_surat, None, posisi + 1)[-1].id if posisi < 1000 else \
+            repo.list_all(filter_surat)[posisi].id
+        t_lokasi, (_, halaman, anchors) = ukur(lambda: repo.lokasi(filter_surat, id_surat), ulang)
+        t_next, acuan = ukur(lambda: cari_per_halaman(total // 10 + 1, filter_surat, id_surat, repo), 1)
+        sama = acuan == (halaman, anchors)
+        gagal += not sama
+        print(f"  {posisi:<20}{halaman:>10}{t_lokasi:>9.1f} ms{t_next:>13.1f} ms"
+              f"{'' if sama else '   !! berbeda dari acuan'}")
+    return gagal
+
+
+def main():
+    args = argumen("Benchmark pencarian global vs memuat all_data setiap halaman", "10000,100000").parse_args()
+    gagal = per_ukuran(args.ukuran, lambda folder, jumlah: uji_ukuran(folder, jumlah, args.ulang))
+    print("\nglobal = jumlah + 10 teratas di keempat sumber (berurutan; di aplikasi hasil tiap sumber tampil")
+    print("begitu selesai); all_data = semua data setiap halaman dimuat lalu disaring; percepatan = all_data / global.")
+    if gagal:
+        print(f"HASIL: {gagal} pencarian / lokasi berbeda dari acuan")
+        return 1
+    print("HASIL: semua pencarian & lokasi sama dengan acuan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
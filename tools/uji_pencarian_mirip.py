@@ -0,0 +1,141 @@
+"""
+Benchmark pencarian mirip (toleran salah ketik) pengirim & perihal:
+kosakata_surat + indeks kosakata_trigram (migrasi v10).
+
+Untuk setiap ukuran data dibuat database sementara berisi surat sintetis
+(sebagian perihal dibuat unik agar kosakatanya ikut membesar). Setiap kata
+kunci bersalah ketik lalu dicari dengan:
+  - SuratRepository.cari_mirip(): kandidat dari indeks trigram, diberi
+    jarak edit, diurutkan (tanpa cache);
+  - count() + halaman pertama dengan FilterSurat(mirip=True);
+  - scan linear: jarak edit ke SEMUA nilai unik di kosakata (cara tanpa
+    indeks). Untuk kosakata besar diukur pada sebagian nilai lalu
+    diperkirakan (ditandai ~).
+Nilai yang dimaksud (kolom "dicari") harus ada di hasil cari_mirip. Biaya
+trigger per tambah / edit surat (pembaruan kosakata) juga diukur.
+
+Jalankan dari root project:
+    python tools/uji_pencarian_mirip.py                      # 10rb, 100rb, 500rb surat
+    python tools/uji_pencarian_mirip.py --ukuran 10000,50000 --ulang 5
+"""
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import repository
+from src.pencarian import jarak_substring, normalisasi_mirip
+from src.repository import SuratRepository, FilterSurat
+from tools._benchmark import argumen, ada_trigram, ukur, isi_database, per_ukuran
+
+# (kata kunci bersalah ketik / singkatan, nilai yang dimaksud)
+KATA_KUNCI = [("dinas pendidkan", "dinas pendidikan"), ("kecamatn sukamaju", "kecamatan sukamaju"),
+              ("puskesmas mawr", "puskesmas mawar"), ("disdik", "dinas pendidikan"),
+              ("ahmad fauzy", "ahmad fauzi"), ("undngan rapat", "undangan rapat"),
+              ("permohonan dta", "permohonan data"), ("kemenag", "kementerian agama")]
+
+DEPAN = ["Ahmad", "Siti", "Budi", "Dewi", "Rahmat", "Nur", "Agus", "Sri", "Eko", "Rina",
+         "Joko", "Fitri", "Hendra", "Wati", "Yusuf", "Lina", "Bambang", "Maya", "Andi", "Ratna"]
+BELAKANG = ["Fauzi", "Aminah", "Santoso", "Lestari", "Hidayat", "Saputra", "Wulandari", "Pratama",
+            "Setiawan", "Kurniawan", "Susanti", "Nugroho", "Rahayu", "Gunawan", "Permata"]
+INSTANSI = ["Dinas Pendidikan", "Dinas Kesehatan", "Dinas Perhubungan", "Kementerian Agama", "Kecamatan Sukamaju",
+            "Puskesmas Mawar", "Badan Pusat Statistik", "Kantor Pos", "PT Sinar Jaya", "Bappeda", "Dinas Sosial"]
+KOTA = ["Kota Bandung", "Kabupaten Garut", "Kota Bogor", "Kabupaten Cianjur", "Kota Depok", "Kabupaten Bekasi",
+        "Kota Cimahi", "Kabupaten Sumedang", "Kota Tasikmalaya", "Kabupaten Ciamis"]
+PERIHAL = ["Undangan Rapat", "Laporan Kegiatan", "Permohonan Data", "Surat Edaran", "Nota Dinas",
+           "Pemberitahuan Libur", "Undangan Sosialisasi", "Evaluasi Anggaran", "Peminjaman Aula"]
+TOPIK = ["Koordinasi", "Bulanan", "Triwulan", "Akhir Tahun", "Program Kerja", "Kepegawaian", "Keuangan",
+         "Pengadaan Barang", "Penerimaan Siswa", "Vaksinasi", "Bantuan Sosial", "Sensus"]
+
+
+def buat_baris(jumlah, acak):
+    for i in range(jumlah):
+        if acak.random() < 0.5:
+            asal = f"{acak.choice(DEPAN)} {acak.choice(BELAKANG)}"
+        else:
+            asal = f"{acak.choice(INSTANSI)} {acak.choice(KOTA)}" if acak.random() < 0.7 else acak.choice(INSTANSI)
+        judul = f"{acak.choice(PERIHAL)} {acak.choice(TOPIK)}"
+        if acak.random() < 0.3:
+            judul += f" No. {i}"        # Perihal unik: kosakata ikut membesar bersama jumlah surat
+        yield ("masuk", f"{acak.choice([2023, 2024, 2025])}-01-01", asal, f"{i:05d}/SM", judul)
+
+
+def cari_tanpa_cache(repo, keyword):
+    repository._cache_mirip.isi = {}
+    return repo.cari_mirip("masuk", keyword)
+
+
+def uji_ukuran(folder, jumlah, ulang, sampel_scan):
+    path_db = os.path.join(folder, f"mirip_{jumlah}.db")
+    durasi_isi = isi_database(path_db, "INSERT INTO surat (kategori, tanggal, asal_surat, nomor_surat, judul_surat) "
+                                       "VALUES (?, ?, ?, ?, ?)", buat_baris(jumlah, random.Random(jumlah)))
+    conn = sqlite3.connect(path_db)
+    try:
+        # Biaya memperbarui kosakata per baris (trigger) saat tambah & edit
+        mulai = time.perf_counter()
+        for i in range(200):
+            id_baru = conn.execute("INSERT INTO surat (kategori, tanggal, asal_surat, judul_surat) "
+                                   "VALUES ('masuk', '2025-01-01', 'Uji Trigger', ?)", (f"Uji {i}",)).lastrowid
+            conn.execute("UPDATE surat SET judul_surat = ? WHERE id = ?", (f"Uji edit {i}", id_baru))
+            conn.commit()
+        per_aksi = (time.perf_counter() - mulai) * 1000 / 400
+        conn.execute("DELETE FROM surat WHERE asal_surat = 'Uji Trigger'")
+        conn.commit()
+
+        kosakata = conn.execute("SELECT kolom, nilai, jumlah FROM kosakata_surat WHERE kategori = 'masuk'").fetchall()
+        sampel = kosakata[:sampel_scan]
+        skala = len(kosakata) / max(1, len(sampel))
+
+        repo = SuratRepository()
+        print(f"\n=== {jumlah:,} surat, {len(kosakata):,} nilai unik di kosakata (isi {durasi_isi:.1f} dtk; "
+              f"trigger tambah/edit {per_aksi:.3f} ms per aksi)")
+        print(f"  {'kata kunci':<20}{'dicari':<20}{'nilai':>6}{'surat':>8}{'cari_mirip':>12}"
+              f"{'+ halaman':>11}{'scan linear':>14}{'percepatan':>12}")
+        gagal = 0
+        for kata, dicari in KATA_KUNCI:
+            t_mirip, hasil = ukur(lambda: cari_tanpa_cache(repo, kata), ulang)
+            filter_surat = FilterSurat("masuk", kata, mirip=True)
+
+            def halaman_pertama():
+                repository._cache_mirip.isi = {}
+                return repo.count(filter_surat), repo.list_page(filter_surat, None, 10)
+            t_halaman, (total, _) = ukur(halaman_pertama, ulang)
+
+            kecil = normalisasi_mirip(kata)
+            t_scan, _ = ukur(lambda: [n for _, n, _ in sampel if jarak_substring(kecil, n) <= 3], 1)
+            t_scan *= skala
+            ketemu = any(dicari in h.nilai for h in hasil)
+            gagal += not ketemu
+            tanda = "~" if skala > 1 else " "
+            print(f"  {kata:<20}{dicari:<20}{len(hasil):>6}{total:>8}{t_mirip:>9.1f} ms{t_halaman:>8.1f} ms"
+                  f"{tanda}{t_scan:>10.0f} ms{t_scan / max(t_mirip, 0.001):>11.0f}x"
+                  f"{'' if ketemu else '   !! nilai yang dicari TIDAK ditemukan'}")
+        return gagal
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argumen("Benchmark pencarian mirip (kosakata + trigram) vs scan linear")
+    parser.add_argument("--sampel-scan", type=int, default=5000,
+                        help="Nilai kosakata yang benar-benar di-scan linear; sisanya diperkirakan")
+    args = parser.parse_args()
+
+    if not ada_trigram():
+        return 1
+
+    gagal = per_ukuran(args.ukuran, lambda folder, jumlah: uji_ukuran(folder, jumlah, args.ulang, args.sampel_scan))
+    print("\ncari_mirip = kandidat trigram + jarak edit; + halaman = count() + list_page() pencarian mirip;")
+    print("percepatan = scan linear / cari_mirip; ~ = diperkirakan dari --sampel-scan nilai.")
+    if gagal:
+        print(f"HASIL: {gagal} kata kunci tidak menemukan nilai yang dimaksud")
+        return 1
+    print("HASIL: semua nilai yang dimaksud ditemukan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Benchmark filter rentang tanggal (FilterSurat.tanggal_dari / _sampai dan
+tanggal_surat_dari / _sampai) lewat indeks rentang tanggal.
+
+Untuk setiap ukuran data dibuat database sementara berisi surat sintetis:
+80% diinput berurutan waktu (id baru = tanggal lebih baru), lalu 20% arsip
+lama diimpor belakangan (impor massal) dengan tanggal acak, sehingga surat
+satu rentang tersebar di seluruh id. Untuk beberapa rentang (satu bulan,
+satu hari):
+  - count() + halaman pertama + halaman ke-5 (keyset) lewat SuratRepository;
+  - cara lama: list_all() satu tahun penuh lalu disaring di Python
+    (seperti export setahun ke Excel lalu difilter di sana);
+  - keyset dengan urutan 'id' biasa (tanpa '+id'): SQLite menelusuri indeks
+    (kategori, id) mundur dari id terakhir halaman sebelumnya.
+Jumlah hasil & isi halaman harus sama dengan acuan.
+
+Jalankan dari root project:
+    python tools/uji_rentang_tanggal.py                      # 10rb, 100rb, 500rb surat
+    python tools/uji_rentang_tanggal.py --ukuran 10000,50000 --ulang 5
+"""
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.repository import SuratRepository, FilterSurat
+from tools._benchmark import argumen, ukur, isi_database, per_ukuran
+
+AWAL, LAMA_HARI = date(2023, 1, 1), 3 * 365
+PORSI_IMPOR = 0.2
+# (nama, kolom filter, dari, sampai)
+RENTANG = [("terima, bulan lama", "tanggal", "2023-02-01", "2023-02-28"),
+           ("terima, bulan tengah", "tanggal", "2024-06-01", "2024-06-30"),
+           ("terima, bulan terbaru", "tanggal", "2025-12-01", "2025-12-31"),
+           ("terima, satu hari", "tanggal", "2023-03-15", "2023-03-15"),
+           ("surat, bulan lama", "tanggal_surat", "2023-02-01", "2023-02-28"),
+           ("surat, satu hari", "tanggal_surat", "2023-03-15", "2023-03-15")]
+
+
+def buat_baris(jumlah, acak):
+    berurutan = int(jumlah * (1 - PORSI_IMPOR))
+    for i in range(jumlah):
+        if i < berurutan:
+            tanggal = AWAL + timedelta(days=i * LAMA_HARI // berurutan)
+        else:
+            tanggal = AWAL + timedelta(days=acak.randrange(LAMA_HARI))     # Arsip lama, diimpor belakangan
+        tanggal_surat = tanggal - timedelta(days=acak.randint(0, 14))
+        yield ("masuk", tanggal.isoformat(), f"Pengirim {acak.randint(1, 500)}", f"{i:06d}/SM",
+               tanggal_surat.isoformat(), f"Perihal {acak.randint(1, 50)}")
+
+
+def halaman(repo, filter_surat, nomor, limit=10):
+    """Halaman ke-`nomor` (keyset), seperti menekan tombol Next di halaman surat."""
+    rows, after_id = [], None
+    for _ in range(nomor):
+        rows = repo.list_page(filter_surat, after_id, limit)
+        if not rows:
+            break
+        after_id = rows[-1].id
+    return rows
+
+
+def uji_ukuran(folder, jumlah, ulang):
+    isi_database(os.path.join(folder, f"rentang_{jumlah}.db"),
+                 "INSERT INTO surat (kategori, tanggal, asal_surat, nomor_surat, tanggal_surat, judul_surat) "
+                 "VALUES (?, ?, ?, ?, ?, ?)", buat_baris(jumlah, random.Random(jumlah)))
+
+    repo = SuratRepository()
+    kolom_urut_asli = SuratRepository._kolom_urut
+    print(f"\n=== {jumlah:,} surat ({AWAL.year}-{AWAL.year + 2}, {PORSI_IMPOR:.0%} impor arsip lama)")
+    print(f"  {'rentang':<24}{'hasil':>7}{'count+hal.1+hal.5':>20}{'setahun+Python':>17}"
+          f"{'keyset id biasa':>18}{'percepatan':>12}")
+    gagal = 0
+    try:
+        for nama, kolom, dari, sampai in RENTANG:
+            filter_surat = FilterSurat("masuk", **{f"{kolom}_dari": dari, f"{kolom}_sampai": sampai})
+
+            def indeks():
+                return repo.count(filter_surat), halaman(repo, filter_surat, 1), halaman(repo, filter_surat, 5)
+            t_indeks, (total, hal_1, hal_5) = ukur(indeks, ulang)
+
+            def setahun():
+                rows = repo.list_all(FilterSurat("masuk", tahun=int(dari[:4])))
+                return [r for r in rows if dari <= (getattr(r, kolom) or "") <= sampai]
+            t_lama, acuan = ukur(setahun, ulang)
+
+            SuratRepository._kolom_urut = lambda self, f: "id"
+            try:
+                t_biasa, (_, _, hal_5_biasa) = ukur(indeks, 1)
+            finally:
+                SuratRepository._kolom_urut = kolom_urut_asli
+
+            sama = total == len(acuan) and [r.id for r in hal_1 + hal_5] == [r.id for r in acuan[:10] + acuan[40:50]] \
+                and [r.id for r in hal_5] == [r.id for r in hal_5_biasa]
+            gagal += not sama
+            print(f"  {nama:<24}{total:>7}{t_indeks:>17.1f} ms{t_lama:>14.1f} ms{t_biasa:>15.1f} ms"
+                  f"{t_lama / max(t_indeks, 0.001):>11.1f}x{'' if sama else '   !! berbeda dari acuan'}")
+    finally:
+        SuratRepository._kolom_urut = kolom_urut_asli
+    return gagal
+
+
+def main():
+    args = argumen("Benchmark filter rentang tanggal vs export setahun + filter").parse_args()
+    gagal = per_ukuran(args.ukuran, lambda folder, jumlah: uji_ukuran(folder, jumlah, args.ulang))
+    print("\ncount+hal.1+hal.5 = count() + halaman 1 + halaman 5 (keyset) dengan indeks rentang tanggal;")
+    print("percepatan = setahun+Python / indeks rentang.")
+    if gagal:
+        print(f"HASIL: {gagal} rentang berbeda dari acuan")
+        return 1
+    print("HASIL: semua rentang sama dengan acuan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Benchmark & cek kebenaran sintaks pencarian (urai_query / kompilasi_query).
+
+Untuk setiap ukuran data dibuat database sementara berisi surat sintetis.
+Setiap query bersintaks (dari:, nomor:, tgl:, -kata, "frasa", ...) lalu
+dijalankan dengan:
+  - SuratRepository.count() + list_page(): query dikompilasi menjadi SQL
+    ber-parameter (FTS dengan filter kolom, tanggal_hari, tahun);
+  - scan linear Python: setiap syarat dievaluasi ke semua baris yang sudah
+    dimuat ke memori (cara tanpa indeks, sebagai acuan).
+Jumlah hasil keduanya harus sama.
+
+Jalankan dari root project:
+    python tools/uji_sintaks_pencarian.py                    # 10rb, 100rb surat
+    python tools/uji_sintaks_pencarian.py --ukuran 10000,500000 --ulang 5
+"""
+import os
+import random
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.pencarian import urai_query, KOLOM_TANGGAL
+from src.repository import SuratRepository, FilterSurat
+from tools._benchmark import argumen, ada_trigram, ukur, isi_database, per_ukuran
+
+# Nilai sengaja >= 3 huruf & tanpa tanda baca di antara kata, agar acuan substring setara dengan FTS + trigram
+QUERIES = ["dari:bupati", "dari:bupati -nomor:005", "perihal:undangan tgl:2024-01..2024-03",
+           'ket:"rapat koordinasi"', "dari:dinas,camat tahun:2025", "sukamaju -perihal:laporan",
+           "nomor:/III/ tgl:2023", 'tglsurat:..2023-06-30 perihal:"nota dinas"', "xyzq dari:bupati",
+           # Hanya tanda baca & terlalu pendek untuk trigram: dicari dengan LIKE, bukan diabaikan
+           "nomor:/ tahun:2024", "-nomor:/ dari:bupati"]
+
+PENGIRIM = ["Bupati Garut", "Camat Sukamaju", "Dinas Pendidikan", "Dinas Kesehatan", "Kantor Pos",
+            "Puskesmas Mawar", "Kepala Desa Sukamaju", "PT Sinar Jaya"]
+PERIHAL = ["Undangan Rapat", "Laporan Kegiatan", "Permohonan Data", "Surat Edaran", "Nota Dinas", "Evaluasi Anggaran"]
+CATATAN = ["rapat koordinasi bulanan", "tindak lanjut", "segera", "arsip", "rapat evaluasi koordinasi"]
+ROMAWI = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI", "XII"]
+
+
+def buat_baris(jumlah, acak):
+    for i in range(jumlah):
+        tahun, bulan, hari = acak.choice([2023, 2024, 2025]), acak.randint(1, 12), acak.randint(1, 28)
+        tanggal = f"{tahun}-{bulan:02d}-{hari:02d}"
+        yield ("masuk", tanggal, acak.choice(PENGIRIM), f"{acak.randint(1, 999):03d}/{acak.choice(ROMAWI)}/{tahun}",
+               tanggal if acak.random() < 0.8 else None, f"{acak.choice(PERIHAL)} {i}", acak.choice(CATATAN))
+
+
+def cocok(syarat, baris):
+    """Acuan: satu syarat dievaluasi langsung ke satu baris (dict)."""
+    if syarat.kolom in KOLOM_TANGGAL:
+        hari = baris[syarat.kolom]
+        hasil = hari is not None and any((a is None or hari >= a) and (b is None or hari <= b) for a, b in syarat.nilai)
+    elif syarat.kolom in ("tahun", "kategori"):
+        hasil = baris[syarat.kolom] in syarat.nilai
+    else:
+        kolom = [syarat.kolom] if syarat.kolom else ["asal_surat", "nomor_surat", "judul_surat", "keterangan"]
+        hasil = any(n.lower() in (baris[k] or "").lower() for n in syarat.nilai for k in kolom)
+    return hasil != syarat.negasi
+
+
+def uji_ukuran(folder, jumlah, ulang):
+    path_db = os.path.join(folder, f"sintaks_{jumlah}.db")
+    isi_database(path_db, """
+        INSERT INTO surat (kategori, tanggal, asal_surat, nomor_surat, tanggal_surat, judul_surat, keterangan)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, buat_baris(jumlah, random.Random(jumlah)))
+    conn = sqlite3.connect(path_db)
+    conn.row_factory = sqlite3.Row
+    try:
+        semua = [dict(r) for r in conn.execute(
+            "SELECT id, kategori, tahun, tanggal_hari, tanggal_surat_hari, asal_surat, nomor_surat, judul_surat, keterangan "
+            "FROM surat WHERE dihapus_pada IS NULL")]
+
+        repo = SuratRepository()
+        print(f"\n=== {jumlah:,} surat")
+        print(f"  {'query':<48}{'hasil':>8}{'SQL (count+halaman)':>22}{'scan Python':>14}{'percepatan':>12}")
+        gagal = 0
+        for teks in QUERIES:
+            query = urai_query(teks)
+            filter_surat = FilterSurat("masuk", teks)
+            t_sql, (total, _) = ukur(lambda: (repo.count(filter_surat), repo.list_page(filter_surat, None, 10)), ulang)
+            t_scan, acuan = ukur(lambda: [b["id"] for b in semua if all(cocok(s, b) for s in query.syarat)], ulang)
+            sama = total == len(acuan)
+            gagal += not sama
+            print(f"  {teks:<48}{total:>8}{t_sql:>19.1f} ms{t_scan:>11.1f} ms{t_scan / max(t_sql, 0.001):>11.1f}x"
+                  f"{'' if sama else f'   !! acuan = {len(acuan)}'}")
+        return gagal
+    finally:
+        conn.close()
+
+
+def main():
+    args = argumen("Benchmark sintaks pencarian (SQL terkompilasi) vs scan linear", "10000,100000").parse_args()
+    if not ada_trigram():
+        return 1
+
+    gagal = per_ukuran(args.ukuran, lambda folder, jumlah: uji_ukuran(folder, jumlah, args.ulang))
+    print("\nSQL = count() + list_page() halaman pertama; percepatan = scan Python / SQL.")
+    if gagal:
+        print(f"HASIL: {gagal} query berbeda dari acuan")
+        return 1
+    print("HASIL: semua query sama dengan acuan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
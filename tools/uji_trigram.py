@@ -0,0 +1,102 @@
+"""
+Benchmark pencarian substring: indeks trigram (surat_trigram, migrasi v9)
+dibandingkan scan linear.
+
+Untuk setiap ukuran data dibuat database sementara berisi surat sintetis.
+Setiap kata kunci (potongan nomor surat / nama pengirim) lalu dicari dengan:
+  - scan linear Python: `keyword in teks` untuk setiap baris yang sudah dimuat
+    ke memori (cara filter_data lama);
+  - scan linear SQL: LIKE '%keyword%' di keempat kolom;
+  - indeks trigram: surat_trigram MATCH (irisan posting list trigram).
+Jumlah hasil ketiganya harus sama. Biaya trigger per insert / edit
+(pembaruan indeks per baris) juga diukur.
+
+Jalankan dari root project:
+    python tools/uji_trigram.py                              # 10rb, 100rb, 500rb baris
+    python tools/uji_trigram.py --ukuran 10000,50000 --ulang 5
+"""
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.pencarian import buat_query_trigram
+from tools._benchmark import argumen, ada_trigram, ukur, isi_database, per_ukuran
+
+KATA_KUNCI = ["/III/2025", "hmad", "ndanga", "042/", "Sukamaj", "9/XII/2024", "xyzq"]
+
+NAMA = ["Ahmad Fauzi", "Siti Aminah", "Budi Santoso", "Dewi Lestari", "Rahmat Hidayat",
+        "Dinas Pendidikan", "Kecamatan Sukamaju", "Kantor Kemenag", "Puskesmas Mawar", "PT Sinar Jaya"]
+PERIHAL = ["Undangan Rapat", "Laporan Kegiatan", "Permohonan Data", "Surat Edaran", "Nota Dinas",
+           "Pemberitahuan Libur", "Undangan Sosialisasi", "Evaluasi Anggaran", "Peminjaman Aula"]
+ROMAWI = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI", "XII"]
+
+
+def buat_baris(jumlah, acak):
+    for i in range(jumlah):
+        tahun = acak.choice([2023, 2024, 2025])
+        yield ("masuk", f"{tahun}-01-01", acak.choice(NAMA),
+               f"{acak.randint(1, 999):03d}/{acak.choice(ROMAWI)}/{tahun}", None,
+               f"{acak.choice(PERIHAL)} {acak.choice(NAMA)}", f"Catatan {i} {acak.choice(PERIHAL).lower()}", "")
+
+
+def uji_ukuran(folder, jumlah, ulang):
+    path_db = os.path.join(folder, f"trigram_{jumlah}.db")
+    durasi_isi = isi_database(path_db, """
+        INSERT INTO surat (kategori, tanggal, asal_surat, nomor_surat, tanggal_surat, judul_surat, keterangan, file_path)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, buat_baris(jumlah, random.Random(jumlah)))
+    conn = sqlite3.connect(path_db)
+    try:
+        # Biaya memperbarui indeks per baris (trigger) saat tambah & edit
+        mulai = time.perf_counter()
+        for i in range(200):
+            id_baru = conn.execute("INSERT INTO surat (kategori, tanggal, asal_surat, nomor_surat, judul_surat) "
+                                   "VALUES ('masuk', '2025-01-01', 'Uji', ?, 'Uji')", (f"U-{i}/XII/2099",)).lastrowid
+            conn.execute("UPDATE surat SET judul_surat = ? WHERE id = ?", (f"Uji edit {i}", id_baru))
+            conn.commit()
+        per_aksi = (time.perf_counter() - mulai) * 1000 / 400
+        conn.execute("DELETE FROM surat WHERE asal_surat = 'Uji'")
+        conn.commit()
+
+        # Scan linear Python butuh semua teks di memori lebih dulu
+        mulai = time.perf_counter()
+        teks = [(row[0], "\n".join(k or "" for k in row[1:]).lower()) for row in conn.execute(
+            "SELECT id, asal_surat, nomor_surat, judul_surat, keterangan FROM surat")]
+        durasi_muat = (time.perf_counter() - mulai) * 1000
+
+        print(f"\n=== {jumlah:,} baris (isi {durasi_isi:.1f} dtk termasuk kedua indeks FTS; "
+              f"trigger tambah/edit {per_aksi:.3f} ms per aksi; muat teks ke memori {durasi_muat:.0f} ms)")
+        print(f"  {'kata kunci':<16}{'hasil':>8}{'scan Python':>14}{'LIKE SQL':>12}{'trigram':>11}{'percepatan':>12}")
+        for kata in KATA_KUNCI:
+            kecil = kata.lower()
+            t_python, hasil_python = ukur(lambda: [i for i, t in teks if kecil in t], ulang)
+            t_like, hasil_like = ukur(lambda: conn.execute(
+                "SELECT id FROM surat WHERE asal_surat LIKE ?1 OR nomor_surat LIKE ?1 OR judul_surat LIKE ?1 "
+                "OR keterangan LIKE ?1", (f"%{kata}%",)).fetchall(), ulang)
+            t_trigram, hasil_trigram = ukur(lambda: conn.execute(
+                "SELECT rowid FROM surat_trigram WHERE surat_trigram MATCH ?", (buat_query_trigram(kata),)).fetchall(), ulang)
+            if not len(hasil_python) == len(hasil_like) == len(hasil_trigram):
+                raise AssertionError(f"Hasil berbeda untuk '{kata}': python={len(hasil_python)}, "
+                                     f"like={len(hasil_like)}, trigram={len(hasil_trigram)}")
+            print(f"  {kata:<16}{len(hasil_trigram):>8}{t_python:>11.1f} ms{t_like:>9.1f} ms{t_trigram:>8.1f} ms"
+                  f"{t_python / max(t_trigram, 0.001):>11.1f}x")
+    finally:
+        conn.close()
+
+
+def main():
+    args = argumen("Benchmark indeks trigram vs scan linear").parse_args()
+    if not ada_trigram():
+        return 1
+
+    per_ukuran(args.ukuran, lambda folder, jumlah: uji_ukuran(folder, jumlah, args.ulang))
+    print("\nPercepatan = scan Python / trigram.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Uji beban penulisan bersamaan: beberapa proses (mensimulasikan beberapa
+komputer staf) menulis ke SATU file database yang sama.
+
+Setiap proses menambah `--jumlah` surat, dan setiap 10 surat juga menambah
+lalu menghapus (hapus lunak) satu surat sementara (meniru aksi_tambah & aksi_hapus).
+Di akhir dicek: tidak ada penulisan yang hilang / gagal, dan throughput.
+
+Jalankan dari root project:
+    python tools/uji_tulis_bersamaan.py                     # 4 proses x 200 surat, DB sementara
+    python tools/uji_tulis_bersamaan.py --proses 8 --mode-jurnal WAL
+    python tools/uji_tulis_bersamaan.py --db \\\\server\\arsip\\uji.db   # uji langsung di network share
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.db_manager import set_db_path, init_db, close_connection
+from src.repository import SuratRepository, FilterSurat
+from src.settings import DEFAULT_DB_PROFILE
+
+
+def penulis(args):
+    nomor, db_path, jumlah, mode_jurnal = args
+    # Di Windows proses anak tidak mewarisi perubahan profil dari proses utama
+    DEFAULT_DB_PROFILE["journal_mode"] = mode_jurnal
+    set_db_path(db_path)
+    repo = SuratRepository()
+    gagal = []
+    mulai = time.perf_counter()
+    for i in range(jumlah):
+        try:
+            repo.insert('masuk', '2024-01-01', asal_surat=f"P{nomor}", nomor_surat=f"P{nomor}-{i}",
+                        judul_surat="Uji tulis bersamaan")
+            if i % 10 == 9:
+                id_sementara = repo.insert('keluar', '2024-01-01', asal_surat=f"P{nomor}",
+                                           nomor_surat=f"P{nomor}-hapus-{i}")
+                repo.tandai_dihapus([id_sementara])
+                repo.count(FilterSurat('masuk'))
+        except Exception as e:
+            gagal.append(f"P{nomor}-{i}: {e}")
+    durasi = time.perf_counter() - mulai
+    close_connection()
+    return nomor, durasi, gagal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uji beban penulisan dari beberapa proses sekaligus")
+    parser.add_argument("--proses", type=int, default=4, help="Jumlah proses penulis")
+    parser.add_argument("--jumlah", type=int, default=200, help="Surat yang ditambah per proses")
+    parser.add_argument("--db", help="File database uji (default: file sementara, dihapus setelah selesai)")
+    parser.add_argument("--mode-jurnal", choices=["DELETE", "WAL"], default="DELETE",
+                        help="DELETE = seperti database di network share (default)")
+    args = parser.parse_args()
+
+    folder_sementara = None if args.db else tempfile.mkdtemp()
+    db_path = args.db or os.path.join(folder_sementara, "uji_tulis.db")
+    try:
+        DEFAULT_DB_PROFILE["journal_mode"] = args.mode_jurnal
+        set_db_path(db_path)
+        init_db()
+        conn = sqlite3.connect(db_path)
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0].upper()
+        sebelum = conn.execute("SELECT COUNT(*) FROM surat WHERE dihapus_pada IS NULL").fetchone()[0]
+        conn.close()
+
+        mulai = time.perf_counter()
+        with multiprocessing.Pool(args.proses) as pool:
+            hasil = pool.map(penulis, [(n, db_path, args.jumlah, args.mode_jurnal) for n in range(args.proses)])
+        durasi = time.perf_counter() - mulai
+
+        conn = sqlite3.connect(db_path)
+        hilang = 0
+        for nomor, durasi_proses, gagal in hasil:
+            ada = conn.execute("SELECT COUNT(*) FROM surat WHERE asal_surat = ? AND kategori = 'masuk'",
+                               (f"P{nomor}",)).fetchone()[0]
+            sisa = conn.execute("SELECT COUNT(*) FROM surat WHERE asal_surat = ? AND kategori = 'keluar' AND dihapus_pada IS NULL",
+                                (f"P{nomor}",)).fetchone()[0]
+            hilang += args.jumlah - ada + sisa
+            print(f"Proses {nomor}: {ada}/{args.jumlah} tersimpan, sisa sementara {sisa}, "
+                  f"{len(gagal)} gagal, {durasi_proses:.1f} detik")
+            for pesan in gagal[:5]:
+                print(f"    [GAGAL] {pesan}")
+        total = conn.execute("SELECT COUNT(*) FROM surat WHERE dihapus_pada IS NULL").fetchone()[0] - sebelum
+        conn.close()
+
+        transaksi = args.proses * (args.jumlah + (args.jumlah // 10) * 2)
+        print(f"\nMode jurnal {mode}, {args.proses} proses: {transaksi} transaksi tulis "
+              f"dalam {durasi:.1f} detik ({transaksi / durasi:.0f} transaksi/detik), {total} surat baru.")
+        ada_gagal = any(gagal for _, _, gagal in hasil)
+        if hilang or ada_gagal:
+            print("HASIL: ADA PENULISAN YANG HILANG / GAGAL")
+            return 1
+        print("HASIL: semua penulisan tersimpan")
+        return 0
+    finally:
+        close_connection()
+        if folder_sementara:
+            shutil.rmtree(folder_sementara, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())